@@ -1,58 +1,532 @@
-"""Provides driver functionality for running the GitHub extractor."""
+"""
+Provides driver functionality for running the GitHub extractor.
+
+Work is split into subcommands. Those that never touch the network, e.g.
+validating a configuration or exporting an output, only import what they
+use; the modules that talk to GitHub, and PyGithub with them, are imported
+once mining begins. Keep it that way: scripts/bench_imports.py checks it.
+"""
 
 import argparse
-from repo_extractor import conf, extractor, schema, utils
+import os
+import sys
+from repo_extractor import (
+    budget,
+    conf,
+    export,
+    profiling,
+    progress,
+    reader,
+    schema,
+    utils,
+    writer,
+)
+
+COMMANDS: tuple = (
+    "mine",
+    "validate",
+    "estimate",
+    "export",
+    "compact",
+    "denormalize",
+    "inspect",
+    "serve",
+    "replay",
+)
 
 
 def main():
     """Driver function for GitHub Repo Extractor."""
-    tab: str = " " * 4
+    args = get_cli_args()
 
-    cfg_dict: dict = get_user_cfg()
+    cfg_dict: dict = get_user_cfg(args.extractor_cfg_file)
     cfg_obj = conf.Cfg(cfg_dict, schema.cfg_schema)
 
+    if args.command == "validate":
+        run_validate(cfg_obj, args)
+
+    elif args.command == "export":
+        run_export(cfg_obj, args)
+
+    elif args.command == "compact":
+        run_compact(cfg_obj)
+
+    elif args.command == "denormalize":
+        run_denormalize(cfg_obj, args)
+
+    elif args.command == "inspect":
+        run_inspect(cfg_obj)
+
+    elif args.command in ("serve", "replay"):
+        run_receiver(cfg_obj, args)
+
+    elif not args.profile:
+        run_extractor(cfg_obj, args, profiling.PhaseTimer(enabled=False))
+
+    else:
+        run_profiled_extractor(cfg_obj, args)
+
+
+def run_profiled_extractor(cfg_obj: conf.Cfg, args: argparse.Namespace) -> None:
+    """
+    Mine, or estimate the cost of mining, and report where the time went.
+
+    :param cfg_obj: validated configuration
+    :param args: arguments to program
+    """
+    import cProfile
+
+    timer = profiling.PhaseTimer()
+    profiler = cProfile.Profile() if args.profiler == "cprofile" else None
+
+    if profiler is not None:
+        profiler.enable()
+
+    # the report is written even if the run exits early, e.g. on an error
+    try:
+        run_extractor(cfg_obj, args, timer)
+
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+        run_info = {
+            "repo": cfg_obj.get_cfg_val("repo"),
+            "range": list(cfg_obj.get_cfg_val("range")),
+            "dry_run": args.command == "estimate",
+        }
+        profiling.write_report(args.profile_out, timer, run_info, profiler)
+        print(f"Profiling report written to {args.profile_out}\n")
+
+
+def run_extractor(
+    cfg_obj: conf.Cfg, args: argparse.Namespace, timer: profiling.PhaseTimer
+) -> None:
+    """
+    Initialize the extractor and mine, or estimate the cost of mining.
+
+    :param cfg_obj: validated configuration
+    :param args: arguments to program
+    :param timer: timer to record time spent in each phase of the run
+    """
+    from repo_extractor import estimate, extractor
+
+    tab: str = " " * 4
+
     print("\nInitializing extractor...")
-    gh_ext = extractor.Extractor(cfg_obj)
+    gh_ext = extractor.Extractor(cfg_obj, timer, args.progress)
     print(f"{tab}Extractor initialization complete!")
 
-    print("\nRunning extractor...")
-    gh_ext.get_repo_issues_data()
-    print(f"{tab}Issue data complete!")
+    try:
+        if args.command == "estimate":
+            print("\nEstimating run cost...")
+            cost = gh_ext.estimate_run_cost(args.sample)
+            print(estimate.format_cost_report(cost, tab))
+
+            print("\nDry run complete! No output was written.\n")
+            return
+
+        print("\nRunning extractor...")
+        gh_ext.get_repo_issues_data()
+        print(f"{tab}Issue data complete!")
+
+    finally:
+        gh_ext.close()
 
     print("\nExtraction complete!\n")
 
 
-def get_user_cfg() -> dict:
+def run_export(cfg_obj: conf.Cfg, args: argparse.Namespace) -> None:
+    """
+    Export the configured output file as flat tables.
+
+    :param cfg_obj: validated configuration
+    :param args: arguments to program
+    """
+    tab: str = " " * 4
+    in_path: str = get_existing_output(cfg_obj)
+
+    print(f"\nExporting {in_path} as {args.export_format} tables...")
+    table_schema = export.export_tables(in_path, args.export, args.export_format)
+
+    for table, info in table_schema.items():
+        print(f"{tab}{table}: {info['rows']} rows")
+
+    print(f"\nExport to {args.export} complete!\n")
+
+
+def run_validate(cfg_obj: conf.Cfg, args: argparse.Namespace) -> None:
+    """
+    Report the settings of a configuration that passed validation.
+
+    :param cfg_obj: validated configuration
+    :param args: arguments to program
+    """
+    tab: str = " " * 4
+    groups: list = [group for group in schema.cmd_tbl if cfg_obj.get_cfg_val(group)]
+
+    print(f"\n{args.extractor_cfg_file} is valid!")
+    print(f"{tab}repo: {cfg_obj.get_cfg_val('repo')}")
+    print(f"{tab}range: {list(cfg_obj.get_cfg_val('range'))}")
+    print(f"{tab}field groups: {', '.join(groups) or 'none'}")
+    print(f"{tab}output: {cfg_obj.get_cfg_val('output_path')}\n")
+
+
+def run_compact(cfg_obj: conf.Cfg) -> None:
+    """
+    Rewrite the configured output file to hold each issue once.
+
+    :param cfg_obj: validated configuration
+    """
+    tab: str = " " * 4
+    out_path: str = get_existing_output(cfg_obj)
+    size_before: int = os.path.getsize(out_path)
+
+    print(f"\nCompacting {out_path}...")
+    entries, issues = writer.compact_output(out_path)
+
+    print(f"{tab}entries: {entries} -> {issues}")
+    print(f"{tab}size: {size_before} -> {os.path.getsize(out_path)} bytes")
+    print("\nCompaction complete!\n")
+
+
+def run_denormalize(cfg_obj: conf.Cfg, args: argparse.Namespace) -> None:
+    """
+    Write a copy of the configured output file with its strings restored.
+
+    :param cfg_obj: validated configuration
+    :param args: arguments to program
+    """
+    tab: str = " " * 4
+    in_path: str = get_existing_output(cfg_obj)
+
+    print(f"\nDenormalizing {in_path} to {args.denormalize}...")
+    issues: int = writer.denormalize_output(in_path, args.denormalize)
+    print(f"{tab}issues: {issues}")
+
+    print("\nDenormalization complete!\n")
+
+
+def run_inspect(cfg_obj: conf.Cfg) -> None:
+    """
+    Describe the configured output file and the checkpoint left next to it.
+
+    :param cfg_obj: validated configuration
+    """
+    tab: str = " " * 4
+    out_path: str = get_existing_output(cfg_obj)
+    summary: dict = reader.OutputReader(out_path, write_index=False).summarize()
+
+    print(f"\n{out_path}:")
+    print(
+        f"{tab}format: {summary['format']}, compression: "
+        f"{summary['compression']}, size: {summary['size']} bytes, "
+        f"normalized: {'yes' if summary['normalized'] else 'no'}"
+    )
+
+    if summary["issues"]:
+        print(
+            f"{tab}issues: {summary['issues']} (#{summary['first_issue']} to "
+            f"#{summary['last_issue']}) in {summary['entries']} entries"
+        )
+
+    else:
+        print(f"{tab}issues: 0")
+
+    for group, counts in summary["groups"].items():
+        print(f"{tab}{group}: {counts['items']} items in {counts['issues']} issues")
+
+    checkpoint_path: str = budget.get_checkpoint_path(out_path)
+    checkpoint: dict = utils.read_jsonfile_into_dict(checkpoint_path)
+
+    if checkpoint:
+        print(
+            f"{tab}checkpoint: resumes pass {checkpoint['tier'] + 1} of "
+            f"{len(checkpoint['tiers'])} at #{checkpoint['next_issue']} "
+            f"({checkpoint_path})"
+        )
+
+    else:
+        print(f"{tab}checkpoint: none")
+
+    print()
+
+
+def get_existing_output(cfg_obj: conf.Cfg) -> str:
+    """
+    Get the path of the configured output file, which must exist.
+
+    :param cfg_obj: validated configuration
+    :return: path to output file
+    :rtype: str
+    """
+    out_path: str = cfg_obj.get_cfg_val("output_path")
+
+    if not os.path.isfile(out_path):
+        print(f"\nFile at {out_path} not found!")
+        sys.exit(1)
+
+    return out_path
+
+
+def run_receiver(cfg_obj: conf.Cfg, args: argparse.Namespace) -> None:
+    """
+    Update the output from webhook deliveries, received or replayed.
+
+    :param cfg_obj: validated configuration
+    :param args: arguments to program
+    """
+    from repo_extractor import extractor, webhook
+
+    tab: str = " " * 4
+
+    print("\nInitializing extractor...")
+    gh_ext = extractor.Extractor(
+        cfg_obj, profiling.PhaseTimer(enabled=False), args.progress, mine_range=False
+    )
+    print(f"{tab}Extractor initialization complete!")
+
+    handler = webhook.DeliveryHandler(gh_ext)
+
+    try:
+        if args.command == "replay":
+            print(f"\nReplaying deliveries from {args.replay}...")
+            amount = webhook.replay(handler, args.replay)
+            print(f"\nReplayed {amount} deliveries!\n")
+            return
+
+        secret = None
+        secret_path = cfg_obj.get_cfg_val("webhook_secret_path")
+
+        if secret_path is not None:
+            secret = utils.read_file_line(secret_path).encode()
+
+        else:
+            print(
+                f"{tab}No webhook_secret_path configured; deliveries are not verified!"
+            )
+
+        host, _, port = args.serve.rpartition(":")
+
+        print("\nReceiving deliveries...")
+        webhook.serve(handler, (host or "127.0.0.1", int(port)), secret, args.record)
+        print("\nReceiver stopped!\n")
+
+    finally:
+        gh_ext.close()
+
+
+def get_user_cfg(cfg_path: str) -> dict:
     """
-    Get path to and read from configuration file.
+    Read from configuration file.
 
+    :param cfg_path: path to JSON configuration file
     :return: dict of configuration values
     :rtype: dict
     """
-    cfg_path = get_cli_args()
-
     return utils.read_jsonfile_into_dict(cfg_path)
 
 
-def get_cli_args() -> str:
+def get_cli_args(argv: list | None = None) -> argparse.Namespace:
     """
     Get initializing arguments from CLI.
 
+    Calls without a command, e.g. "main.py [options] cfg.json", are taken
+    as "mine" so that existing scripts keep working, as do the options
+    that used to stand in for other commands, e.g. --dry-run.
+
+    Args:
+        argv (list|None): arguments to parse; None for those of the
+            program.
+
     Returns:
-        str: path to file with arguments to program
+        argparse.Namespace: arguments to program, with the "command" to run
     """
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] not in COMMANDS and argv[0] not in ("-h", "--help"):
+        argv = ["mine", *argv]
+
+    # options shared by commands
+    cfg_parser = argparse.ArgumentParser(add_help=False)
+    cfg_parser.add_argument(
+        "extractor_cfg_file",
+        help="Path to JSON configuration file",
+    )
+
+    progress_parser = argparse.ArgumentParser(add_help=False)
+    progress_parser.add_argument(
+        "--progress",
+        choices=progress.PROGRESS_MODES,
+        default="auto",
+        help="How to report mining progress; 'tty' redraws a status line, "
+        "'log' writes timestamped key=value lines (default: %(default)s)",
+    )
+
+    profile_parser = argparse.ArgumentParser(add_help=False)
+    profile_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record time spent in each phase of the run and write a report",
+    )
+    profile_parser.add_argument(
+        "--profile-out",
+        default="profile_report.json",
+        help="Path to write the profiling report to (default: %(default)s)",
+    )
+    profile_parser.add_argument(
+        "--profiler",
+        choices=["none", "cprofile"],
+        default="none",
+        help="Additionally run a deterministic profiler while profiling "
+        "(default: none)",
+    )
+
     # establish positional argument capability
     arg_parser = argparse.ArgumentParser(
         description="Mines data from GitHub repositories",
     )
+    commands = arg_parser.add_subparsers(
+        dest="command", metavar="command", required=True
+    )
 
-    # add repo input CLI arg
-    arg_parser.add_argument(
-        "extractor_cfg_file",
-        help="Path to JSON configuration file",
+    mine_parser = commands.add_parser(
+        "mine",
+        parents=[cfg_parser, progress_parser, profile_parser],
+        help="Mine the configured range into the output (default)",
+    )
+
+    # stand-ins for other commands, kept for existing scripts
+    mine_parser.add_argument("--dry-run", action="store_true", help=argparse.SUPPRESS)
+    mine_parser.add_argument("--sample", default=10, type=int, help=argparse.SUPPRESS)
+    mine_parser.add_argument("--export", help=argparse.SUPPRESS)
+    mine_parser.add_argument(
+        "--export-format",
+        choices=export.TABLE_FORMATS,
+        default="csv",
+        help=argparse.SUPPRESS,
+    )
+    mine_parser.add_argument("--serve", help=argparse.SUPPRESS)
+    mine_parser.add_argument("--record", help=argparse.SUPPRESS)
+    mine_parser.add_argument("--replay", help=argparse.SUPPRESS)
+
+    commands.add_parser(
+        "validate",
+        parents=[cfg_parser],
+        help="Check the configuration without mining",
+    )
+
+    estimate_parser = commands.add_parser(
+        "estimate",
+        parents=[cfg_parser, progress_parser, profile_parser],
+        help="Sample the configured range and estimate the cost of mining it",
+    )
+    estimate_parser.add_argument(
+        "--sample",
+        default=10,
+        type=int,
+        help="Amount of items to sample (default: %(default)s)",
     )
 
-    return arg_parser.parse_args().extractor_cfg_file
+    export_parser = commands.add_parser(
+        "export",
+        parents=[cfg_parser],
+        help="Export the configured output file as flat tables",
+    )
+    export_parser.add_argument(
+        "export",
+        metavar="DIR",
+        help="Directory to write tables to",
+    )
+    export_parser.add_argument(
+        "--format",
+        dest="export_format",
+        choices=export.TABLE_FORMATS,
+        default="csv",
+        help="Format of exported tables; parquet requires pyarrow "
+        "(default: %(default)s)",
+    )
+
+    commands.add_parser(
+        "compact",
+        parents=[cfg_parser],
+        help="Rewrite the configured output file to hold each issue once",
+    )
+
+    denormalize_parser = commands.add_parser(
+        "denormalize",
+        parents=[cfg_parser],
+        help="Write a copy of the configured output file with the strings "
+        "of a normalized output restored",
+    )
+    denormalize_parser.add_argument(
+        "denormalize",
+        metavar="OUT_PATH",
+        help="Path to write the copy to; may be the output itself",
+    )
+
+    commands.add_parser(
+        "inspect",
+        parents=[cfg_parser],
+        help="Describe the configured output file and its checkpoint",
+    )
+
+    serve_parser = commands.add_parser(
+        "serve",
+        parents=[cfg_parser, progress_parser],
+        help="Listen for GitHub webhook deliveries and update the output from them",
+    )
+    serve_parser.add_argument(
+        "serve",
+        metavar="[HOST:]PORT",
+        help="Address to listen on (host defaults to 127.0.0.1)",
+    )
+    serve_parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Append each delivery to a JSON Lines file",
+    )
+
+    replay_parser = commands.add_parser(
+        "replay",
+        parents=[cfg_parser, progress_parser],
+        help="Update the output from deliveries recorded with serve --record",
+    )
+    replay_parser.add_argument(
+        "replay",
+        metavar="PATH",
+        help="Path to JSON Lines file of recorded deliveries",
+    )
+
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "mine":
+        args.command = get_legacy_command(args)
+
+    return args
+
+
+def get_legacy_command(args: argparse.Namespace) -> str:
+    """
+    Get the command that the options of a "mine" call stand in for.
+
+    :param args: arguments to program
+    :return: command to run
+    :rtype: str
+    """
+    if args.export is not None:
+        return "export"
+
+    if args.serve is not None:
+        return "serve"
+
+    if args.replay is not None:
+        return "replay"
+
+    if args.dry_run:
+        return "estimate"
+
+    return "mine"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+"""
+Benchmark how quickly the commands of main.py that need no network start.
+
+Commands like validate and inspect should only import what they use;
+importing PyGithub and its dependency tree alone takes longer than such a
+command should. Each command is run several times in a fresh interpreter
+against a throwaway configuration and output, and its median wall-clock
+time is reported along with the time to import the modules that mining
+needs and the time to start a bare interpreter, for comparison.
+
+The benchmark fails if a command imports any of HEAVY_MODULES, or, when
+given --max-ms, if a command takes longer than that. Run it from anywhere:
+
+    $ python scripts/bench_imports.py [--runs N] [--max-ms MS]
+
+python -X importtime docs:
+    https://docs.python.org/3/using/cmdline.html#cmdoption-X
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# commands that must start without importing HEAVY_MODULES, and their
+# arguments after the configuration path; "{dir}" is a scratch directory
+LIGHT_COMMANDS: dict = {
+    "validate": [],
+    "inspect": [],
+    "compact": [],
+    "export": ["{dir}/tables"],
+    "denormalize": ["{dir}/plain.json"],
+}
+
+# top-level packages only needed to talk to GitHub
+HEAVY_MODULES: tuple = ("github", "requests", "urllib3", "jwt", "nacl")
+
+_EXAMPLE_ISSUE: dict = {
+    "title": "Example",
+    "userlogin": "octocat",
+    "comments": {"0": {"body": "Looks good", "userlogin": "octocat"}},
+}
+
+
+def main() -> None:
+    """Run the benchmark and exit nonzero if a command is too heavy."""
+    args = get_cli_args()
+    env = {**os.environ, "PYTHONPATH": os.path.join(REPO_ROOT, "src")}
+    failed = False
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cfg_path = write_scratch_files(tmp_dir)
+
+        print(f"Median of {args.runs} runs per command:")
+
+        for command, extra_args in LIGHT_COMMANDS.items():
+            cmd = [
+                sys.executable,
+                "-X",
+                "importtime",
+                os.path.join(REPO_ROOT, "main.py"),
+                command,
+                cfg_path,
+                *(arg.format(dir=tmp_dir) for arg in extra_args),
+            ]
+            secs, modules = time_command(cmd, env, args.runs)
+            heavy = sorted(modules & set(HEAVY_MODULES))
+
+            print(f"    {command}: {secs * 1000:.0f} ms")
+
+            if heavy:
+                print(f"        imports {', '.join(heavy)}!")
+                failed = True
+
+            if args.max_ms is not None and secs * 1000 > args.max_ms:
+                print(f"        over the limit of {args.max_ms} ms!")
+                failed = True
+
+        print("For comparison:")
+
+        secs, _ = time_command([sys.executable, "-c", "pass"], env, args.runs)
+        print(f"    starting the interpreter: {secs * 1000:.0f} ms")
+
+        cmd = [sys.executable, "-c", "import repo_extractor.extractor"]
+        secs, _ = time_command(cmd, env, args.runs)
+        print(f"    importing the extractor: {secs * 1000:.0f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+def write_scratch_files(tmp_dir: str) -> str:
+    """
+    Write a configuration and a small output for commands to work on.
+
+    Args:
+        tmp_dir (str): directory to write to.
+
+    Returns:
+        str: path to the configuration.
+    """
+    cfg_path = os.path.join(tmp_dir, "cfg.json")
+    out_path = os.path.join(tmp_dir, "output.jsonl")
+
+    cfg = {
+        "repo": "octocat/Hello-World",
+        "auth_path": os.path.join(tmp_dir, "token"),
+        "output_path": out_path,
+        "range": [1, 10],
+        "labels": [],
+        "state": "closed",
+        "comments": ["body", "userlogin"],
+    }
+
+    with open(cfg_path, "w", encoding="UTF-8") as cfg_file:
+        json.dump(cfg, cfg_file)
+
+    with open(out_path, "w", encoding="UTF-8") as out_file:
+        for number in range(1, 11):
+            out_file.write(json.dumps({str(number): _EXAMPLE_ISSUE}) + "\n")
+
+    return cfg_path
+
+
+def time_command(cmd: list, env: dict, runs: int) -> tuple[float, set]:
+    """
+    Run a command several times and find what it imported.
+
+    Args:
+        cmd (list): command to run.
+        env (dict): environment to run it in.
+        runs (int): amount of times to run it.
+
+    Returns:
+        tuple[float, set]: median seconds the command took, and top-level
+        names of the modules it imported, if run with -X importtime.
+    """
+    times: list = []
+    modules: set = set()
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            cmd, env=env, capture_output=True, text=True, check=False
+        )
+        times.append(time.perf_counter() - start)
+
+        if result.returncode != 0:
+            print(result.stdout + result.stderr)
+            sys.exit(f"{' '.join(cmd)} failed!")
+
+        # lines are "import time: self [us] | cumulative | imported package"
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and not line.endswith("package"):
+                modules.add(line.rsplit("|", 1)[-1].strip().split(".")[0])
+
+    return statistics.median(times), modules
+
+
+def get_cli_args() -> argparse.Namespace:
+    """
+    Get arguments to the benchmark.
+
+    Returns:
+        argparse.Namespace: arguments to program
+    """
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark the startup of commands that need no network",
+    )
+
+    arg_parser.add_argument(
+        "--runs",
+        default=5,
+        type=int,
+        help="Times to run each command (default: %(default)s)",
+    )
+
+    arg_parser.add_argument(
+        "--max-ms",
+        type=float,
+        help="Fail if a command takes longer than this many milliseconds",
+    )
+
+    return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,40 @@
-import repo_extractor.conf
-import repo_extractor.schema
-import repo_extractor.utils
-import repo_extractor.extractor
+"""
+Mine the GitHub REST API v3 for issue and PR data.
+
+Submodules are imported when first used rather than with the package, as
+the ones that talk to GitHub pull in PyGithub and its dependencies. This
+keeps commands that never touch the network, e.g. validating a
+configuration or exporting an output, quick to start.
+"""
+
+import importlib
+
+_SUBMODULES: tuple = (
+    "records",
+    "conf",
+    "schema",
+    "utils",
+    "dimensions",
+    "reader",
+    "writer",
+    "budget",
+    "cache",
+    "diff",
+    "estimate",
+    "export",
+    "profiling",
+    "progress",
+    "throttle",
+    "extractor",
+    "webhook",
+)
+
+__all__ = list(_SUBMODULES)
+
+
+def __getattr__(name: str):
+    """Import a submodule on first access to it as an attribute."""
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,172 @@
+"""
+Request and time budgets for extraction runs, and checkpoints to resume them.
+
+A run may be capped at an amount of API requests and at a wall-clock
+deadline, e.g. when sharing a token with other jobs. A run that reaches
+either cap stops cleanly and leaves a checkpoint next to its output file;
+a later run with the same configuration picks up where it left off.
+
+Checkpoints are small JSON files:
+
+    {
+        "repo": "owner/name",
+        "range": range as configured, e.g. [1, -1],
+        "tiers": [[field groups mined in each pass over the range]],
+        "tier": index of the pass to resume,
+        "next_issue": number of the issue to resume that pass at
+    }
+"""
+
+import json
+import os
+import time
+from repo_extractor import utils
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+
+class RunBudget:
+    """Track the requests and time spent by a run against its caps."""
+
+    def __init__(
+        self, max_requests: int | None = None, deadline_mins: float | None = None
+    ) -> None:
+        """
+        Initialize a run budget, starting the clock on the deadline.
+
+        Args:
+            max_requests (int|None): most requests the run may make, or
+                None for no cap.
+            deadline_mins (float|None): most minutes the run may take, or
+                None for no cap.
+
+        Attributes:
+            max_requests (int|None): most requests the run may make.
+            requests (int): requests made by the run so far.
+        """
+        self.max_requests = max_requests
+        self.requests: int = 0
+
+        self.__deadline: float | None = None
+        if deadline_mins is not None:
+            self.__deadline = time.monotonic() + deadline_mins * 60
+
+        self.__first_sent: int | None = None
+
+    @property
+    def is_capped(self) -> bool:
+        """bool: whether the run has any cap at all."""
+        return self.max_requests is not None or self.__deadline is not None
+
+    def record(self, requests_sent: int) -> None:
+        """
+        Count the requests made since the first call.
+
+        The first call only notes the requests sent so far.
+
+        Args:
+            requests_sent (int): requests sent by the session so far, as
+                counted by its limiter.
+        """
+        if self.__first_sent is None:
+            self.__first_sent = requests_sent
+
+        self.requests = requests_sent - self.__first_sent
+
+    def is_spent(self) -> bool:
+        """
+        Check whether the run has reached either of its caps.
+
+        Returns:
+            bool: True if the run should stop.
+        """
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            return True
+
+        return not self.can_wait(0)
+
+    def can_wait(self, secs: float) -> bool:
+        """
+        Check whether the run can wait for a while before its deadline.
+
+        Args:
+            secs (float): seconds to wait for, e.g. for a rate limit reset.
+
+        Returns:
+            bool: True if the deadline would not pass while waiting.
+        """
+        if self.__deadline is None:
+            return True
+
+        return time.monotonic() + secs < self.__deadline
+
+
+def get_checkpoint_path(output_path: str) -> str:
+    """
+    Get the path of the checkpoint kept for an output file.
+
+    Args:
+        output_path (str): path to output file.
+
+    Returns:
+        str: path to checkpoint file.
+    """
+    return output_path + CHECKPOINT_SUFFIX
+
+
+def read_checkpoint(checkpoint_path: str, run_info: dict) -> tuple[int, int]:
+    """
+    Get where to resume a run from its checkpoint, if it has one.
+
+    A checkpoint left by a run with different settings is ignored.
+
+    Args:
+        checkpoint_path (str): path to checkpoint file.
+        run_info (dict): "repo", "range", and "tiers" of this run.
+
+    Returns:
+        tuple[int, int]: index of the tier and number of the issue to
+        resume at, or (0, 0) to start from the beginning.
+    """
+    checkpoint: dict = utils.read_jsonfile_into_dict(checkpoint_path)
+
+    if not checkpoint:
+        return 0, 0
+
+    if any(checkpoint.get(key) != val for key, val in run_info.items()):
+        print(f"Ignoring checkpoint {checkpoint_path} left by a different run")
+        return 0, 0
+
+    return checkpoint["tier"], checkpoint["next_issue"]
+
+
+def write_checkpoint(
+    checkpoint_path: str, run_info: dict, tier: int, next_issue: int
+) -> None:
+    """
+    Write a checkpoint that a later run can resume from.
+
+    Args:
+        checkpoint_path (str): path to checkpoint file.
+        run_info (dict): "repo", "range", and "tiers" of this run.
+        tier (int): index of the tier to resume.
+        next_issue (int): number of the issue to resume the tier at.
+    """
+    checkpoint = {**run_info, "tier": tier, "next_issue": next_issue}
+
+    with open(checkpoint_path, "w", encoding="UTF-8") as checkpoint_file:
+        json.dump(checkpoint, checkpoint_file, indent=2)
+
+
+def remove_checkpoint(checkpoint_path: str) -> None:
+    """
+    Remove the checkpoint of a finished run, if there is one.
+
+    Args:
+        checkpoint_path (str): path to checkpoint file.
+    """
+    try:
+        os.remove(checkpoint_path)
+
+    except FileNotFoundError:
+        pass
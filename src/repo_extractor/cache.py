@@ -0,0 +1,172 @@
+"""
+Persistent cache of data mined from commits, keyed by SHA.
+
+Commits are immutable: once the data for a SHA has been gathered, it will
+never change. The same commit is nonetheless requested again for every PR
+that contains it, on every run, and across forks and repositories that
+share history. Caching the mined commit data locally lets the extractor
+skip the commit detail request entirely.
+
+Entries live in a single SQLite database. Each entry holds the mined
+fields for one SHA as zlib-compressed JSON. When the stored entries grow
+past the configured size limit, the least recently used ones are evicted.
+
+sqlite3 docs:
+    https://docs.python.org/3/library/sqlite3.html
+"""
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+from repo_extractor import records
+
+# after going over the size limit, evict down to this fraction of it so
+# that every insert past the limit does not trigger an eviction
+_EVICT_TO_RATIO = 0.9
+
+
+class CommitCache:
+    """Size-bounded, on-disk store of mined commit data."""
+
+    def __init__(self, db_path: str, max_size_mb: int) -> None:
+        """
+        Open, creating if necessary, a commit cache database.
+
+        Args:
+            db_path (str): path to the SQLite database file.
+            max_size_mb (int): size limit of stored entries, in MiB.
+
+        Attributes:
+            hits (int): amount of lookups answered by the cache.
+            misses (int): amount of lookups the cache could not answer.
+        """
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__max_size: int = max_size_mb * 1024 * 1024
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.__conn = sqlite3.connect(db_path, isolation_level=None)
+        self.__conn.execute("PRAGMA journal_mode=WAL")
+        self.__conn.execute("PRAGMA synchronous=NORMAL")
+        self.__conn.execute("""
+            CREATE TABLE IF NOT EXISTS commits (
+                sha TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        self.__conn.execute(
+            "CREATE INDEX IF NOT EXISTS commits_last_used ON commits (last_used)"
+        )
+
+        self.__size: int = self.__conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM commits"
+        ).fetchone()[0]
+
+    def get(self, sha: str, fields: list) -> dict | None:
+        """
+        Look up the data mined for a commit.
+
+        A cached entry only answers the lookup if it holds every field
+        asked for; an entry for a commit without files, stored as an
+        empty dict, answers any lookup.
+
+        Args:
+            sha (str): SHA of the commit.
+            fields (list): commit fields that are wanted.
+
+        Returns:
+            dict|None: {field: data} in the order of the given fields,
+            or None if the cache cannot answer.
+        """
+        row = self.__conn.execute(
+            "SELECT data FROM commits WHERE sha = ?", (sha,)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        commit_data: dict = self.__decode(row[0])
+
+        if commit_data and not all(field in commit_data for field in fields):
+            self.misses += 1
+            return None
+
+        self.__conn.execute(
+            "UPDATE commits SET last_used = ? WHERE sha = ?", (time.time(), sha)
+        )
+        self.hits += 1
+
+        return {field: commit_data[field] for field in fields if field in commit_data}
+
+    def put(self, sha: str, commit_data: dict) -> None:
+        """
+        Store the data mined for a commit.
+
+        Fields already cached for the SHA that are not in the given data
+        are kept, so that runs asking for different fields add up.
+
+        Args:
+            sha (str): SHA of the commit.
+            commit_data (dict): {field: data} mined from the commit.
+        """
+        row = self.__conn.execute(
+            "SELECT data, size FROM commits WHERE sha = ?", (sha,)
+        ).fetchone()
+
+        if row is not None:
+            commit_data = self.__decode(row[0]) | commit_data
+            self.__size -= row[1]
+
+        blob = zlib.compress(
+            json.dumps(
+                commit_data,
+                default=records.to_output,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode()
+        )
+        size = len(blob) + len(sha)
+
+        self.__conn.execute(
+            "INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?)",
+            (sha, blob, size, time.time()),
+        )
+        self.__size += size
+
+        if self.__size > self.__max_size:
+            self.__evict()
+
+    def close(self) -> None:
+        """Close the connection to the cache database."""
+        self.__conn.close()
+
+    def __evict(self) -> None:
+        """Delete least recently used entries until under the size limit."""
+        target = self.__max_size * _EVICT_TO_RATIO
+
+        rows = self.__conn.execute(
+            "SELECT sha, size FROM commits ORDER BY last_used ASC"
+        )
+
+        evicted: list = []
+        for sha, size in rows:
+            if self.__size <= target:
+                break
+
+            evicted.append((sha,))
+            self.__size -= size
+
+        rows.close()
+        self.__conn.executemany("DELETE FROM commits WHERE sha = ?", evicted)
+
+    @staticmethod
+    def __decode(blob: bytes) -> dict:
+        return json.loads(zlib.decompress(blob))
@@ -60,7 +60,8 @@ class Cfg:
         Use Cerberus to check all entries in the configuration
         dictionary for correctness of type and content. Fail
         stop is implemented if configuration does not meet schema
-        specification.
+        specification. Optional entries missing from the configuration
+        are filled in with the defaults given in the schema.
         """
         # init schema for validation
         validator = cerberus.Validator(self.cfg_schema, require_all=True)
@@ -70,3 +71,5 @@ class Cfg:
             # log an exception and print errors
             print(f"Validation error!\n{validator.errors}")
             sys.exit(1)
+
+        self.cfg_dict = validator.document
@@ -0,0 +1,317 @@
+"""
+Fetch and parse the changes a PR makes to files, in a single request.
+
+Getting the changed files of a PR through its commits costs one request
+per commit. GitHub will instead serve the whole diff of a PR, as plain
+text, in response to a single request for the PR with the diff media
+type. The diff is parsed here into the same shape of data that
+schema._get_commit_files produces for a commit.
+
+GitHub refuses to serve diffs over a certain size. For those PRs, the
+paginated listing of the PR's files is used instead, which costs one
+request per 100 files and lists at most 3000 files.
+
+Resources:
+
+    • media types for PRs:
+        https://docs.github.com/en/rest/pulls/pulls#get-a-pull-request
+
+    • git's diff output format:
+        https://git-scm.com/docs/git-diff#generate_patch_text_with_p
+"""
+
+import re
+import github
+from repo_extractor import records
+
+DIFF_MEDIA_TYPE = "application/vnd.github.diff"
+
+# statuses GitHub answers requests for diffs that are too large with
+_TOO_LARGE_STATUSES = (406, 422)
+
+_FILE_HEADER = "diff --git "
+
+# git quotes paths holding unusual chars, escaping them C-style
+_ESCAPE = re.compile(r"\\([0-7]{3}|.)")
+_ESCAPES: dict = {
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+
+
+class PullFiles:
+    """The files changed by a PR, with their changes fetched on first use."""
+
+    def __init__(self, pr_obj) -> None:
+        """
+        Initialize the files changed by a PR.
+
+        Nothing is fetched until file_changes is first used, so that
+        asking only for the totals in the PR payload costs no requests.
+
+        Args:
+            pr_obj (github.PullRequest): PR whose files to describe.
+
+        Attributes:
+            pr_obj (github.PullRequest): PR whose files to describe.
+        """
+        self.pr_obj = pr_obj
+        self.__file_changes: records.FileChanges | None = None
+
+    @property
+    def file_changes(self) -> records.FileChanges:
+        """records.FileChanges: changes the PR makes to files."""
+        if self.__file_changes is None:
+            self.__file_changes = fetch_pr_files(self.pr_obj)
+
+        return self.__file_changes
+
+
+def fetch_pr_files(pr_obj) -> records.FileChanges:
+    """
+    Get the changes a PR makes to files.
+
+    Args:
+        pr_obj (github.PullRequest): PR to get file changes of.
+
+    Raises:
+        github.GithubException: the request failed for any reason other
+            than the diff being too large, e.g. rate limiting.
+
+    Returns:
+        records.FileChanges: changes the PR makes to files.
+    """
+    try:
+        _, data = pr_obj.requester.requestJsonAndCheck(
+            "GET", pr_obj.url, headers={"Accept": DIFF_MEDIA_TYPE}
+        )
+
+    except github.GithubException as exc:
+        if exc.status not in _TOO_LARGE_STATUSES:
+            raise
+
+        return _list_pr_files(pr_obj)
+
+    # PyGithub hands back bodies that are not JSON as {"data": body}, and
+    # an empty body, i.e. a PR that changes nothing, as None
+    return parse_diff(data["data"] if data else "")
+
+
+def _list_pr_files(pr_obj) -> records.FileChanges:
+    """
+    Get the changes a PR makes to files from the listing of its files.
+
+    Args:
+        pr_obj (github.PullRequest): PR to get file changes of.
+
+    Returns:
+        records.FileChanges: changes the PR makes to files.
+    """
+    file_list: list = []
+    statuses: list = []
+    patches: list = []
+    additions: int = 0
+    deletions: int = 0
+
+    for file in pr_obj.get_files():
+        file_list.append(file.filename)
+        statuses.append(file.status)
+        patches.append(file.patch)
+        additions += int(file.additions)
+        deletions += int(file.deletions)
+
+    return records.FileChanges(
+        additions=additions,
+        deletions=deletions,
+        changes=additions + deletions,
+        file_list=tuple(file_list),
+        status=tuple(statuses),
+        patch_text=tuple(patches),
+    )
+
+
+def parse_diff(diff_text: str) -> records.FileChanges:
+    """
+    Parse a diff in git's format into changes made to files.
+
+    Statuses are given in the terms that the REST API uses for them,
+    and the patch of each file is its hunks, without the headers git
+    puts before them, as the REST API gives it. Files without hunks,
+    such as binary files, have no patch.
+
+    Args:
+        diff_text (str): diff of any amount of files.
+
+    Returns:
+        records.FileChanges: changes made to files by the diff.
+    """
+    file_list: list = []
+    statuses: list = []
+    patches: list = []
+    additions: int = 0
+    deletions: int = 0
+
+    lines = diff_text.split("\n")
+
+    # a diff ending in a newline leaves an empty line after the split
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    starts = [i for i, line in enumerate(lines) if line.startswith(_FILE_HEADER)]
+
+    for start, end in zip(starts, starts[1:] + [len(lines)]):
+        file_name, status, hunks = _parse_file_diff(lines[start:end])
+
+        file_list.append(file_name)
+        statuses.append(status)
+        patches.append("\n".join(hunks) if hunks else None)
+
+        # hunk lines are prefixed by " ", "+", "-", "@", or "\"
+        for line in hunks:
+            if line.startswith("+"):
+                additions += 1
+
+            elif line.startswith("-"):
+                deletions += 1
+
+    return records.FileChanges(
+        additions=additions,
+        deletions=deletions,
+        changes=additions + deletions,
+        file_list=tuple(file_list),
+        status=tuple(statuses),
+        patch_text=tuple(patches),
+    )
+
+
+def _parse_file_diff(lines: list) -> tuple:
+    """
+    Parse the diff of a single file.
+
+    Args:
+        lines (list): lines of the diff, starting at its "diff --git" line.
+
+    Returns:
+        tuple[str, str, list]: name of the file, its status, and the
+        lines of its hunks.
+    """
+    status = "modified"
+    old_path = None
+    new_path = None
+    mode_changed = False
+
+    pos = 1
+    while pos < len(lines) and not lines[pos].startswith("@@"):
+        line = lines[pos]
+
+        if line.startswith("new file mode"):
+            status = "added"
+
+        elif line.startswith("deleted file mode"):
+            status = "removed"
+
+        elif line.startswith("old mode"):
+            mode_changed = True
+
+        elif line.startswith("rename to "):
+            status = "renamed"
+            new_path = _unquote(line[len("rename to ") :])
+
+        elif line.startswith("copy to "):
+            status = "copied"
+            new_path = _unquote(line[len("copy to ") :])
+
+        elif line.startswith("--- "):
+            old_path = _get_diff_path(line[len("--- ") :])
+
+        elif line.startswith("+++ "):
+            new_path = _get_diff_path(line[len("+++ ") :]) or new_path
+
+        pos += 1
+
+    hunks = lines[pos:]
+
+    if mode_changed and status == "modified" and not hunks:
+        status = "changed"
+
+    file_name = new_path or old_path
+    if file_name is None:
+        file_name = _get_header_path(lines[0][len(_FILE_HEADER) :])
+
+    return file_name, status, hunks
+
+
+def _get_diff_path(path: str) -> str | None:
+    """
+    Get a file path from a "---" or "+++" line of a diff.
+
+    Args:
+        path (str): text after the "---" or "+++".
+
+    Returns:
+        str|None: path without its "a/" or "b/" prefix, or None if the
+        line names /dev/null, i.e. the file is added or removed.
+    """
+    # git ends paths that hold a space with a tab
+    path = path.rstrip("\t")
+
+    if path == "/dev/null":
+        return None
+
+    return _unquote(path)[2:]
+
+
+def _get_header_path(header: str) -> str:
+    """
+    Get the new path of a file from the "a/<old> b/<new>" of its header.
+
+    Only needed for files without "---" and "+++" lines, e.g. binary
+    files, which are never renamed at this point; renames are named by
+    their "rename to" line. Old and new path are therefore the same,
+    which makes the header splittable even when paths hold spaces.
+
+    Args:
+        header (str): text after "diff --git ".
+
+    Returns:
+        str: path of the file.
+    """
+    if header.endswith('"'):
+        return _unquote(header[header.rindex(' "') + 1 :])[2:]
+
+    return header[(len(header) - 1) // 2 + 1 :][2:]
+
+
+def _unquote(path: str) -> str:
+    """
+    Undo git's quoting of a path, if it is quoted.
+
+    Args:
+        path (str): path as written by git.
+
+    Returns:
+        str: path as it is named in the repository.
+    """
+    if len(path) < 2 or not path.startswith('"') or not path.endswith('"'):
+        return path
+
+    def unescape(match) -> str:
+        escaped = match.group(1)
+
+        if len(escaped) == 3:
+            return chr(int(escaped, 8))
+
+        return _ESCAPES.get(escaped, escaped)
+
+    # octal escapes are single bytes of UTF-8 and everything else is
+    # ASCII, so each char is a byte until the path is decoded
+    return (
+        _ESCAPE.sub(unescape, path[1:-1])
+        .encode("latin-1")
+        .decode("UTF-8", errors="replace")
+    )
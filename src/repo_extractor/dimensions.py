@@ -0,0 +1,280 @@
+"""
+Normalize outputs by moving repeated strings into dimension tables.
+
+The same few users open, comment on, and review most of the issues of a
+repository, and the same files are changed by commit after commit, yet
+every item of an output spells out its logins, names, and file paths in
+full. On large repositories this repetition makes up much of the size of
+the output.
+
+A normalized output instead refers to such strings by their position in
+a table of each kind, kept in a sidecar file next to the output:
+
+    - users: {"login", "id"} of each user, referred to by "userlogin",
+      "userid", "actor_login", "actor_id", "assignee", and
+      "requested_reviewer". The login and id of one item refer to the
+      same row
+    - names: names of commit authors and committers, referred to by
+      "author_name" and "committer"
+    - paths: paths of files, referred to by "path" and each entry of
+      "file_list"
+
+Only the fields are replaced; items keep all of their other fields, and
+their fields keep their order. Tables only ever grow, so positions stay
+valid across runs. Nulls are kept as they are.
+
+reader.OutputReader restores the strings of normalized outputs as it
+reads them, so readers see the same data as for plain outputs.
+"""
+
+import json
+import os
+from repo_extractor import records
+
+DIMS_SUFFIX = ".dims.json"
+
+# fields referring to users, with the column of the users table they
+# hold and the field of the same item holding the other column, if any
+_USER_FIELDS: dict = {
+    "userlogin": ("login", "userid"),
+    "userid": ("id", "userlogin"),
+    "actor_login": ("login", "actor_id"),
+    "actor_id": ("id", "actor_login"),
+    "assignee": ("login", None),
+    "requested_reviewer": ("login", None),
+}
+
+# fields holding strings that recur across items, with their table
+_STRING_FIELDS: dict = {
+    "author_name": "names",
+    "committer": "names",
+    "path": "paths",
+    "file_list": "paths",
+}
+
+
+def get_dims_path(output_path: str) -> str:
+    """
+    Get the path of the dimension tables kept for an output file.
+
+    Args:
+        output_path (str): path to output file.
+
+    Returns:
+        str: path to dimension tables.
+    """
+    return output_path + DIMS_SUFFIX
+
+
+class Dimensions:
+    """Dimension tables of a normalized output file."""
+
+    def __init__(self, dims_path: str) -> None:
+        """
+        Load the dimension tables of an output, if it has any yet.
+
+        Args:
+            dims_path (str): path to dimension tables, as from
+                get_dims_path.
+
+        Attributes:
+            dims_path (str): path to dimension tables.
+            users (list): {"login", "id"} of each user.
+            strings (dict): {table: list of strings} of the other tables.
+        """
+        self.dims_path = dims_path
+
+        try:
+            with open(dims_path, "r", encoding="UTF-8") as dims_file:
+                tables: dict = json.load(dims_file)
+
+        except FileNotFoundError:
+            tables = {}
+
+        self.users: list = tables.get("users", [])
+        self.strings: dict = {
+            table: tables.get(table, [])
+            for table in dict.fromkeys(_STRING_FIELDS.values())
+        }
+
+        self.__user_rows: dict = {"login": {}, "id": {}}
+        self.__string_ids: dict = {table: {} for table in self.strings}
+
+        for row_id, user in enumerate(self.users):
+            for column, value in user.items():
+                if value is not None:
+                    self.__user_rows[column].setdefault(value, row_id)
+
+        for table, strings in self.strings.items():
+            for string_id, string in enumerate(strings):
+                self.__string_ids[table].setdefault(string, string_id)
+
+    def normalize(self, data):
+        """
+        Replace repeated strings in mined data with their table positions.
+
+        Strings not yet in a table are added to it.
+
+        Args:
+            data (): issue data, or any part of it; may hold records.
+
+        Returns:
+            normalized copy of the data, made of plain dicts and lists.
+        """
+        if isinstance(data, records.RECORD_TYPES):
+            data = data.to_dict()
+
+        if isinstance(data, (list, tuple)):
+            return [self.normalize(value) for value in data]
+
+        if not isinstance(data, dict):
+            return data
+
+        normalized: dict = {}
+
+        for key, value in data.items():
+            if value is None:
+                normalized[key] = value
+
+            elif key in _USER_FIELDS:
+                column, other_key = _USER_FIELDS[key]
+                other_column = "id" if column == "login" else "login"
+
+                user: dict = {column: value, other_column: None}
+
+                if other_key is not None:
+                    user[other_column] = data.get(other_key)
+
+                normalized[key] = self.__get_user_row(user["login"], user["id"])
+
+            elif key in _STRING_FIELDS:
+                table = _STRING_FIELDS[key]
+
+                if isinstance(value, str):
+                    normalized[key] = self.__get_string_id(table, value)
+
+                else:
+                    normalized[key] = [
+                        self.__get_string_id(table, string) for string in value
+                    ]
+
+            else:
+                normalized[key] = self.normalize(value)
+
+        return normalized
+
+    def denormalize(self, data):
+        """
+        Restore the strings that normalized data refers to.
+
+        Args:
+            data (): normalized issue data, or any part of it.
+
+        Returns:
+            data as it would be in a plain output.
+        """
+        if isinstance(data, list):
+            return [self.denormalize(value) for value in data]
+
+        if not isinstance(data, dict):
+            return data
+
+        denormalized: dict = {}
+
+        for key, value in data.items():
+            if value is None:
+                denormalized[key] = value
+
+            elif key in _USER_FIELDS:
+                denormalized[key] = self.users[value][_USER_FIELDS[key][0]]
+
+            elif key in _STRING_FIELDS:
+                strings: list = self.strings[_STRING_FIELDS[key]]
+
+                if isinstance(value, int):
+                    denormalized[key] = strings[value]
+
+                else:
+                    denormalized[key] = [strings[string_id] for string_id in value]
+
+            else:
+                denormalized[key] = self.denormalize(value)
+
+        return denormalized
+
+    def save(self) -> None:
+        """Write the tables, replacing the file they were loaded from."""
+        tmp_path = f"{self.dims_path}.tmp"
+
+        with open(tmp_path, "w", encoding="UTF-8") as tmp_file:
+            json.dump(
+                {"users": self.users, **self.strings},
+                tmp_file,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+
+        os.replace(tmp_path, self.dims_path)
+
+    def __get_user_row(self, login: str | None, user_id: str | None) -> int:
+        """
+        Find the row of a user, adding one if there is none.
+
+        A row matches if it holds what is known of the user and nothing
+        that contradicts it, e.g. the same id with a different login, as
+        after a user renames their account. What the row lacks is filled
+        in.
+
+        Args:
+            login (str|None): login of the user, if known.
+            user_id (str|None): id of the user, if known.
+
+        Returns:
+            int: position of the row in the users table.
+        """
+        user: dict = {"login": login, "id": user_id}
+
+        for column, value in user.items():
+            row_id = self.__user_rows[column].get(value)
+
+            if row_id is None:
+                continue
+
+            row: dict = self.users[row_id]
+
+            if all(val is None or row[key] in (None, val) for key, val in user.items()):
+                for key, val in user.items():
+                    if val is not None and row[key] is None:
+                        row[key] = val
+                        self.__user_rows[key].setdefault(val, row_id)
+
+                return row_id
+
+        row_id = len(self.users)
+        self.users.append(user)
+
+        for column, value in user.items():
+            if value is not None:
+                self.__user_rows[column].setdefault(value, row_id)
+
+        return row_id
+
+    def __get_string_id(self, table: str, string: str) -> int:
+        """
+        Find the position of a string in a table, adding it if missing.
+
+        Args:
+            table (str): table of the string.
+            string (str): string to find.
+
+        Returns:
+            int: position of the string in the table.
+        """
+        string_id = self.__string_ids[table].get(string)
+
+        if string_id is None:
+            string_id = len(self.strings[table])
+            self.strings[table].append(string)
+            self.__string_ids[table][string] = string_id
+
+        return string_id
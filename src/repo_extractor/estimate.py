@@ -0,0 +1,148 @@
+"""
+Predict the cost of an extraction run from a small sample of it.
+
+The extractor can mine a handful of items spread across the configured
+range without writing any output. The measurements taken while doing so
+are extrapolated here to the whole range so that the user can plan token
+allocation and shard counts before committing to a long run.
+
+This module only does arithmetic and formatting; it does not talk to the
+GitHub API itself.
+"""
+
+import math
+
+# the REST API hands out its allotment of calls in windows of one hour
+RATE_LIMIT_WINDOW_SECS = 60 * 60
+
+
+def pick_sample(items: list, sample_len: int) -> list:
+    """
+    Choose items evenly spaced across a list.
+
+    Sampling across the whole range, rather than taking the first few
+    items, keeps old and new items represented; PRs late in a project's
+    history tend to touch more files than early ones.
+
+    Args:
+        items (list): items to choose from.
+        sample_len (int): maximum amount of items to choose.
+
+    Returns:
+        list: chosen items, in their original order.
+    """
+    if sample_len <= 0 or not items:
+        return []
+
+    if sample_len >= len(items):
+        return list(items)
+
+    step = len(items) / sample_len
+
+    return [items[int(i * step)] for i in range(sample_len)]
+
+
+def extrapolate_run_cost(
+    sample: dict,
+    num_items: int,
+    calls_left: int,
+    call_limit: int,
+    reset_secs: int,
+    fixed_requests: int = 0,
+    fixed_secs: float = 0.0,
+) -> dict:
+    """
+    Scale sample measurements up to the size of the whole run.
+
+    Args:
+        sample (dict): measurements from mining the sample. Must contain
+            "items", "requests", "seconds", "bytes", "prs", "commits",
+            and "comments".
+        num_items (int): amount of items in the configured range.
+        calls_left (int): calls left in the current rate limit window.
+        call_limit (int): calls allotted per rate limit window.
+        reset_secs (int): seconds until the current window resets.
+        fixed_requests (int): requests made once per run rather than per
+            item, e.g. to page repository-wide listings.
+        fixed_secs (float): seconds spent on the fixed requests.
+
+    Returns:
+        dict: estimated totals for the run.
+    """
+    sample_len = max(sample["items"], 1)
+    scale = num_items / sample_len
+
+    total_requests = math.ceil(sample["requests"] * scale) + fixed_requests
+    work_secs = sample["seconds"] * scale + fixed_secs
+
+    extra_windows = 0
+    if total_requests > calls_left and call_limit > 0:
+        extra_windows = math.ceil((total_requests - calls_left) / call_limit)
+
+    # time spent asleep waiting for rate limits to lift. Each exhausted
+    # window costs whatever part of it was not already spent working
+    sleep_secs = 0.0
+    if extra_windows and work_secs > 0:
+        req_per_sec = total_requests / work_secs
+        sleep_secs += max(0.0, reset_secs - calls_left / req_per_sec)
+        sleep_secs += (extra_windows - 1) * max(
+            0.0, RATE_LIMIT_WINDOW_SECS - call_limit / req_per_sec
+        )
+
+    return {
+        "items": num_items,
+        "sampled": sample["items"],
+        "prs": round(sample["prs"] * scale),
+        "commits": round(sample["commits"] * scale),
+        "comments": round(sample["comments"] * scale),
+        "requests": total_requests,
+        "requests_per_item": sample["requests"] / sample_len,
+        "rate_limit_windows": 1 + extra_windows,
+        "wall_secs": work_secs + sleep_secs,
+        "sleep_secs": sleep_secs,
+        "output_bytes": round(sample["bytes"] * scale),
+    }
+
+
+def format_cost_report(estimate: dict, indent: str) -> str:
+    """
+    Render an estimate from extrapolate_run_cost for the console.
+
+    Args:
+        estimate (dict): estimated totals for a run.
+        indent (str): string to prefix each line with.
+
+    Returns:
+        str: multi-line, human-readable report.
+    """
+    lines = [
+        f"Items in range: {estimate['items']} ({estimate['sampled']} sampled)",
+        f"Expected PRs: ~{estimate['prs']}",
+        f"Expected commits: ~{estimate['commits']}",
+        f"Expected comments: ~{estimate['comments']}",
+        f"API requests: ~{estimate['requests']} "
+        f"({estimate['requests_per_item']:.1f} per item)",
+        f"Rate limit windows: {estimate['rate_limit_windows']}",
+        f"Wall-clock time: ~{fmt_duration(estimate['wall_secs'])} "
+        f"(~{fmt_duration(estimate['sleep_secs'])} rate limited)",
+        f"Output size: ~{_fmt_bytes(estimate['output_bytes'])}",
+    ]
+
+    return "\n".join(f"{indent}{line}" for line in lines)
+
+
+def _fmt_bytes(num_bytes: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+
+        num_bytes /= 1024
+
+    return f"{num_bytes:.1f} TiB"
+
+
+def fmt_duration(secs: float) -> str:
+    hours, rem = divmod(int(secs), 3600)
+    minutes, seconds = divmod(rem, 60)
+
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
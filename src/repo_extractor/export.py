@@ -0,0 +1,458 @@
+"""
+Export extractor outputs as flat, typed tables for analysis.
+
+Outputs are nested, i.e. {issue: {"commits": {"0": {"files": {...}}}}},
+and dataframe tools want flat tables. The export here flattens an output
+into one table per kind of item:
+
+    - issues: one row per issue, with its scalar fields and the totals of
+      its PR-level "files"
+    - commits, comments, reviews, review_comments, events: one row per
+      child item, keyed by "issue_number" and "index"
+    - files: one row per file changed by a commit, keyed by
+      "issue_number", "commit_index", and "file_index"
+    - pr_files: one row per file changed by a PR as a whole, keyed by
+      "issue_number" and "file_index"
+
+Only tables with rows are written. Nested objects, such as the "rename"
+of an event, are flattened into "<key>_<subkey>" columns.
+
+Each column is given a type: int64, float64, bool, timestamp, or string.
+Timestamps are the columns whose values are all in schema.TIME_FMT, and
+their "NaN" placeholders become nulls. The types are written to a
+"schema.json" next to the tables so that loaders need not guess them.
+
+Tables may be written as:
+
+    1. csv: a "<table>.csv" per table. Nulls are empty fields, booleans
+       are "true" or "false", and timestamps are kept in TIME_FMT
+    2. parquet: a "<table>.parquet" per table, with the column types
+       built in. Requires pyarrow
+
+The output is streamed twice, one issue at a time: once to find the
+columns of each table and their types, and once to write the rows.
+"""
+
+import csv
+import datetime
+import json
+import os
+import re
+import sys
+from repo_extractor import reader, schema
+
+TABLE_FORMATS: list = ["csv", "parquet"]
+
+SCHEMA_FILE_NAME = "schema.json"
+
+# child items stored as {index: item} under an issue, each their own table
+_CHILD_TABLES = ("commits", "comments", "reviews", "review_comments", "events")
+
+# quick check for TIME_FMT, much cheaper than trying to parse every string
+_TIME_PATTERN = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ")
+_NULL_TIME = "NaN"
+
+# rows buffered per table before being written as a parquet row group
+_PARQUET_BATCH_LEN = 10_000
+
+
+def export_tables(in_path: str, out_dir: str, table_format: str = "csv") -> dict:
+    """
+    Export an output file as flat tables.
+
+    Args:
+        in_path (str): path to output file to export.
+        out_dir (str): directory to write tables to; made if missing.
+        table_format (str): one of TABLE_FORMATS.
+
+    Returns:
+        dict: schema of the written tables, as written to schema.json.
+    """
+    # fail before the first pass, not after it
+    pyarrow = _import_pyarrow() if table_format == "parquet" else None
+
+    output_reader = reader.OutputReader(in_path)
+
+    table_schema: dict = _find_schema(output_reader)
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    if pyarrow is not None:
+        _write_parquet(pyarrow, output_reader, table_schema, out_dir)
+
+    else:
+        _write_csv(output_reader, table_schema, out_dir)
+
+    schema_dict: dict = {
+        table: {
+            "path": f"{table}.{table_format}",
+            "rows": info["rows"],
+            "columns": {col: col_type.dtype for col, col_type in info["cols"].items()},
+        }
+        for table, info in table_schema.items()
+    }
+
+    with open(
+        os.path.join(out_dir, SCHEMA_FILE_NAME), "w", encoding="UTF-8"
+    ) as schema_file:
+        json.dump(schema_dict, schema_file, indent=2)
+
+    return schema_dict
+
+
+class _ColumnType:
+    """Type of a column, narrowed down from the values seen in it."""
+
+    __slots__ = ("kinds", "maybe_time")
+
+    def __init__(self) -> None:
+        self.kinds: set = set()
+        self.maybe_time: bool = True
+
+    def see(self, value) -> None:
+        """
+        Account for a value of the column.
+
+        Args:
+            value (): value in the column.
+        """
+        if value is None:
+            return
+
+        if isinstance(value, str):
+            if self.maybe_time and value != _NULL_TIME:
+                self.maybe_time = _TIME_PATTERN.fullmatch(value) is not None
+
+        self.kinds.add(type(value))
+
+    @property
+    def dtype(self) -> str:
+        """str: type of the column given the values seen so far."""
+        if self.kinds == {str} and self.maybe_time:
+            return "timestamp"
+
+        if self.kinds == {bool}:
+            return "bool"
+
+        if self.kinds and self.kinds <= {int}:
+            return "int64"
+
+        if self.kinds and self.kinds <= {int, float}:
+            return "float64"
+
+        return "string"
+
+
+def _find_schema(output_reader: reader.OutputReader) -> dict:
+    """
+    Find the columns of each table and their types.
+
+    Args:
+        output_reader (reader.OutputReader): reader of the output file.
+
+    Returns:
+        dict: {table: {"rows": amount of rows, "cols": {column: _ColumnType}}}
+        with columns in the order they were first seen.
+    """
+    table_schema: dict = {}
+
+    for number, issue_data in output_reader.iter_merged():
+        for table, rows in _flatten_issue(number, issue_data).items():
+            info = table_schema.setdefault(table, {"rows": 0, "cols": {}})
+            info["rows"] += len(rows)
+
+            for row in rows:
+                for col, value in row.items():
+                    col_type = info["cols"].get(col)
+
+                    if col_type is None:
+                        col_type = info["cols"][col] = _ColumnType()
+
+                    col_type.see(value)
+
+    return table_schema
+
+
+def _flatten_issue(number: str, issue_data: dict) -> dict:
+    """
+    Flatten the data of an issue into rows of each table.
+
+    Args:
+        number (str): issue number.
+        issue_data (dict): data of the issue from an output file.
+
+    Returns:
+        dict: {table: [row dicts]} of the tables that the issue has rows in.
+    """
+    issue_num = int(number)
+    issue_row: dict = {"issue_number": issue_num}
+    tables: dict = {"issues": [issue_row]}
+
+    for key, value in issue_data.items():
+        if key in _CHILD_TABLES:
+            child_rows = tables.setdefault(key, [])
+
+            for index, child_data in value.items():
+                child_row = {"issue_number": issue_num, "index": int(index)}
+
+                for child_key, child_value in child_data.items():
+                    # commits hold the changes they made to files
+                    if key == "commits" and child_key == "files":
+                        _add_file_changes(
+                            tables.setdefault("files", []),
+                            child_row,
+                            child_value,
+                            {"issue_number": issue_num, "commit_index": int(index)},
+                        )
+
+                    else:
+                        _add_value(child_row, child_key, child_value)
+
+                child_rows.append(child_row)
+
+        # PR-level changes to files
+        elif key == "files":
+            _add_file_changes(
+                tables.setdefault("pr_files", []),
+                issue_row,
+                value,
+                {"issue_number": issue_num},
+            )
+
+        else:
+            _add_value(issue_row, key, value)
+
+    # groups without items, e.g. "commits": {}, make no table of their own
+    return {table: rows for table, rows in tables.items() if rows}
+
+
+def _add_file_changes(
+    file_rows: list, parent_row: dict, changes: dict, keys: dict
+) -> None:
+    """
+    Flatten changes to files, e.g. as from schema._get_commit_files.
+
+    Totals go in the row of the item that made the changes; files get a
+    row each.
+
+    Args:
+        file_rows (list): rows of the table of files to add to.
+        parent_row (dict): row of the item that made the changes.
+        changes (dict): changes to files, with any of the fields of
+            records.FileChanges.
+        keys (dict): key columns identifying the parent item.
+    """
+    for total in ("additions", "deletions", "changes"):
+        if total in changes:
+            parent_row[total] = changes[total]
+
+    file_list: list = changes.get("file_list", [])
+    statuses: list = changes.get("status", [])
+    patches: list = changes.get("patch_text", [])
+
+    for file_index in range(max(len(file_list), len(statuses), len(patches))):
+        file_row = {**keys, "file_index": file_index}
+
+        if file_list:
+            file_row["file"] = file_list[file_index]
+
+        if statuses:
+            file_row["status"] = statuses[file_index]
+
+        if patches:
+            file_row["patch"] = patches[file_index]
+
+        file_rows.append(file_row)
+
+
+def _add_value(row: dict, key: str, value) -> None:
+    """
+    Add a value to a row, flattening nested objects into more columns.
+
+    Args:
+        row (dict): row to add to.
+        key (str): column of the value.
+        value (): value to add.
+    """
+    if isinstance(value, dict):
+        for sub_key, sub_value in value.items():
+            _add_value(row, f"{key}_{sub_key}", sub_value)
+
+    elif isinstance(value, list):
+        row[key] = json.dumps(value, ensure_ascii=False)
+
+    else:
+        row[key] = value
+
+
+def _convert_row(row: dict, cols: dict, to_time) -> list:
+    """
+    Convert a row to a list of values typed for its table's columns.
+
+    Args:
+        row (dict): row to convert.
+        cols (dict): {column: _ColumnType} of the table.
+        to_time (Callable): function converting TIME_FMT strings.
+
+    Returns:
+        list: values in column order; None for nulls.
+    """
+    values: list = []
+
+    for col, col_type in cols.items():
+        value = row.get(col)
+        dtype = col_type.dtype
+
+        if value is None:
+            pass
+
+        elif dtype == "timestamp":
+            value = None if value == _NULL_TIME else to_time(value)
+
+        elif dtype == "float64":
+            value = float(value)
+
+        elif dtype == "string" and not isinstance(value, str):
+            value = json.dumps(value)
+
+        values.append(value)
+
+    return values
+
+
+def _write_csv(output_reader: reader.OutputReader, table_schema: dict, out_dir: str):
+    """
+    Write each table to a CSV file.
+
+    Args:
+        output_reader (reader.OutputReader): reader of the output file.
+        table_schema (dict): columns and types found by _find_schema.
+        out_dir (str): directory to write tables to.
+    """
+
+    def to_csv_value(value) -> str:
+        if value is None:
+            return ""
+
+        if isinstance(value, bool):
+            return "true" if value else "false"
+
+        return value
+
+    csv_files: dict = {}
+    csv_writers: dict = {}
+
+    try:
+        for table, info in table_schema.items():
+            csv_files[table] = open(
+                os.path.join(out_dir, f"{table}.csv"),
+                "w",
+                encoding="UTF-8",
+                newline="",
+            )
+            csv_writers[table] = csv.writer(csv_files[table])
+            csv_writers[table].writerow(info["cols"])
+
+        for number, issue_data in output_reader.iter_merged():
+            for table, rows in _flatten_issue(number, issue_data).items():
+                cols: dict = table_schema[table]["cols"]
+
+                csv_writers[table].writerows(
+                    [to_csv_value(value) for value in _convert_row(row, cols, str)]
+                    for row in rows
+                )
+
+    finally:
+        for csv_file in csv_files.values():
+            csv_file.close()
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow, which is only needed for Parquet export.
+
+    Returns:
+        module: pyarrow, with its parquet module loaded.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+
+    except ImportError:
+        print("Parquet export requires pyarrow: pip install pyarrow")
+        sys.exit(1)
+
+    return pyarrow
+
+
+def _write_parquet(
+    pyarrow, output_reader: reader.OutputReader, table_schema: dict, out_dir: str
+) -> None:
+    """
+    Write each table to a Parquet file, in row groups of bounded size.
+
+    Args:
+        pyarrow (module): pyarrow, as from _import_pyarrow.
+        output_reader (reader.OutputReader): reader of the output file.
+        table_schema (dict): columns and types found by _find_schema.
+        out_dir (str): directory to write tables to.
+    """
+    arrow_types: dict = {
+        "int64": pyarrow.int64(),
+        "float64": pyarrow.float64(),
+        "bool": pyarrow.bool_(),
+        "timestamp": pyarrow.timestamp("s", tz="UTC"),
+        "string": pyarrow.string(),
+    }
+
+    def to_time(value: str) -> datetime.datetime:
+        return datetime.datetime.strptime(value, schema.TIME_FMT).replace(
+            tzinfo=datetime.timezone.utc
+        )
+
+    arrow_schemas: dict = {
+        table: pyarrow.schema(
+            [
+                (col, arrow_types[col_type.dtype])
+                for col, col_type in info["cols"].items()
+            ]
+        )
+        for table, info in table_schema.items()
+    }
+
+    batches: dict = {table: [] for table in table_schema}
+    parquet_writers: dict = {}
+
+    def write_batch(table: str) -> None:
+        columns = list(zip(*batches[table]))
+        arrow_table = pyarrow.Table.from_arrays(
+            [
+                pyarrow.array(col, type=field.type)
+                for col, field in zip(columns, arrow_schemas[table])
+            ],
+            schema=arrow_schemas[table],
+        )
+        parquet_writers[table].write_table(arrow_table)
+        batches[table].clear()
+
+    try:
+        for table in table_schema:
+            parquet_writers[table] = pyarrow.parquet.ParquetWriter(
+                os.path.join(out_dir, f"{table}.parquet"), arrow_schemas[table]
+            )
+
+        for number, issue_data in output_reader.iter_merged():
+            for table, rows in _flatten_issue(number, issue_data).items():
+                cols: dict = table_schema[table]["cols"]
+                batches[table].extend(_convert_row(row, cols, to_time) for row in rows)
+
+                if len(batches[table]) >= _PARQUET_BATCH_LEN:
+                    write_batch(table)
+
+        for table, batch in batches.items():
+            if batch:
+                write_batch(table)
+
+    finally:
+        for parquet_writer in parquet_writers.values():
+            parquet_writer.close()
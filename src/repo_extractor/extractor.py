@@ -1,17 +1,56 @@
 """Exposes functionality to mine GitHub repositories."""
 
+import concurrent.futures
+import datetime
+import json
+import math
+import queue
 import socket
 import sys
 import time
 import traceback
 import github
-from repo_extractor import conf, schema, utils
+from repo_extractor import (
+    budget,
+    cache,
+    conf,
+    diff,
+    estimate,
+    profiling,
+    progress,
+    records,
+    schema,
+    throttle,
+    utils,
+    writer,
+)
 
 # ANSI escape sequence for clearing a row in the console:
 # credit: https://stackoverflow.com/a/64245513
 CLR = "\x1b[K"
 TAB = " " * 4
 
+# connections kept open to the API, as many as requests allowed in flight
+# but no fewer than requests keeps by default
+_MIN_POOL_SIZE = 10
+
+# most results the search API gives for a single query
+_MAX_SEARCH_RESULTS = 1000
+
+# field groups whose getters are given the PR behind an issue
+_PR_GROUPS: tuple = ("commits", "files", "reviews")
+
+# field groups in the order that runs with a budget mine them in, one pass
+# over the range per tier. Cheap groups, which cost no requests beyond
+# shared listings or cost one per issue, come before costly ones, so that
+# a budget too small for everything still covers the most ground
+PRIORITY_TIERS: tuple = (
+    ("issues", "events", "review_comments"),
+    ("comments",),
+    ("files", "reviews"),
+    ("commits",),
+)
+
 
 def issues_in_range(issue_list, low: int, high: int):
     """Return issues whose number is between low and high (inclusive)."""
@@ -30,13 +69,31 @@ def issues_in_range(issue_list, low: int, high: int):
     return selected
 
 
+def is_listed_pr(issue) -> bool:
+    """
+    Tell whether an issue from an issues listing is a PR, without requests.
+
+    Listings only give the "pull_request" key of issues that are PRs, and
+    PyGithub requests the whole issue when a key is missing. The issue's
+    page on GitHub, however, is always given, and is a PR's page for PRs.
+
+    Args:
+        issue (github.Issue): issue from an issues listing.
+
+    Returns:
+        bool: True if the issue is a PR.
+    """
+    return "/pull/" in issue.html_url
+
+
 class GithubSession:
     """Functionality for verified connections to the GitHub API."""
 
     __page_len: int
     session: github.Github
+    limiter: throttle.AimdLimiter
 
-    def __init__(self, auth_path: str) -> None:
+    def __init__(self, auth_path: str, max_concurrency: int = 1) -> None:
         """
         Initialize GitHub session object.
 
@@ -49,15 +106,23 @@ class GithubSession:
         Args:
             auth_path (str): path to file containing personal
                 access token.
+            max_concurrency (int): most requests to ever have in flight
+                at once.
 
         Attributes:
             __page_len (int): amount of items per page in paginated
                 lists.
+            limiter (throttle.AimdLimiter): limiter that every request of
+                the session is sent through.
             session (github.Github): object containing connection to
                 GitHub.
+            __idle_requesters (queue.Queue): requesters cloned from that
+                of the session for threads of get_many, not in use.
         """
         self.__page_len: int = 100
+        self.limiter = throttle.AimdLimiter(max_concurrency)
         self.session = self.__get_gh_session(auth_path)
+        self.__idle_requesters: queue.Queue = queue.Queue()
 
     def __get_gh_session(self, auth_path: str) -> github.Github:
         """
@@ -81,8 +146,17 @@ class GithubSession:
         # retrieve token from auth file
         token = utils.read_file_line(auth_path)
 
-        # establish a session with token
-        session = github.Github(token, per_page=self.__page_len, retry=100, timeout=100)
+        # establish a session with token. Requests are paced by the
+        # limiter rather than by a fixed delay between them
+        session = github.Github(
+            token,
+            per_page=self.__page_len,
+            retry=100,
+            timeout=100,
+            pool_size=max(self.limiter.max_limit, _MIN_POOL_SIZE),
+            seconds_between_requests=None,
+        )
+        throttle.install_limiter(session.requester, self.limiter)
 
         try:
             # if name can be gathered from token, properly authenticated
@@ -98,6 +172,75 @@ class GithubSession:
 
         return session
 
+    def get_many(self, urls: list) -> list:
+        """
+        Request several API urls, as many at once as the limiter allows.
+
+        PyGithub's requesters and objects are not safe to share between
+        threads, so requests are sent from a pool of threads, each through
+        a requester of its own, and only the raw data of responses is
+        handed back.
+
+        Args:
+            urls (list): urls to GET.
+
+        Raises:
+            github.GithubException: a request failed. Requests not yet
+                sent are dropped.
+
+        Returns:
+            list: (headers, data) of the response to each url, in order.
+        """
+        if len(urls) < 2 or self.limiter.max_limit == 1:
+            return [
+                self.session.requester.requestJsonAndCheck("GET", url) for url in urls
+            ]
+
+        with concurrent.futures.ThreadPoolExecutor(self.limiter.max_limit) as pool:
+            futures: list = [pool.submit(self.__get_in_thread, url) for url in urls]
+
+            try:
+                return [future.result() for future in futures]
+
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def __get_in_thread(self, url: str) -> tuple:
+        """
+        Request an API url through a requester that no other thread uses.
+
+        Requesters are cloned from that of the session, with the same
+        settings and limiter, and kept for later calls so that their
+        connections are reused.
+
+        Args:
+            url (str): url to GET.
+
+        Returns:
+            tuple: (headers, data) of the response.
+        """
+        try:
+            requester = self.__idle_requesters.get_nowait()
+
+        except queue.Empty:
+            requester = github.Requester.Requester(**self.session.requester.kwargs)
+            throttle.install_limiter(requester, self.limiter)
+
+        try:
+            return requester.requestJsonAndCheck("GET", url)
+
+        finally:
+            # the session tells the rate limit of the latest response, which
+            # waits for rate limits to reset rely on
+            if requester.rate_limiting_resettime:
+                self.session.requester.rate_limiting = requester.rate_limiting
+                self.session.requester.rate_limiting_resettime = (
+                    requester.rate_limiting_resettime
+                )
+
+            self.__idle_requesters.put(requester)
+
     def get_remaining_calls(self) -> str:
         """Get remaining calls to REST API for this hour."""
         calls_left = self.session.rate_limiting[0]
@@ -123,7 +266,13 @@ class Extractor:
     # ----------------------------------------------------------------------
     # Initialization tools
     # ----------------------------------------------------------------------
-    def __init__(self, cfg_obj: conf.Cfg) -> None:
+    def __init__(
+        self,
+        cfg_obj: conf.Cfg,
+        timer: profiling.PhaseTimer | None = None,
+        progress_mode: str = "auto",
+        mine_range: bool = True,
+    ) -> None:
         """
         Extractor object initialization.
 
@@ -132,32 +281,106 @@ class Extractor:
 
         Args:
             cfg_obj (conf.Cfg): configuration object.
+            timer (profiling.PhaseTimer|None): timer to record the time
+                spent in each phase of the run with, if profiling.
+            progress_mode (str): how to report mining progress; one of
+                progress.PROGRESS_MODES.
+            mine_range (bool): whether to prepare to mine the configured
+                range. Extractors that only update single issues, e.g.
+                from webhooks, skip listing the issues in range.
 
         Attributes:
             cfg (conf.Cfg): configuration object.
             gh_sesh (github.Github): GitHub connection object.
-            issues_paged_list (github.PaginatedList of github.Issue): the
-                paginated list containing all issues of the chosen type
-                for the repository.
+            repo (github.Repository): repository being mined.
+            paged_list (list of github.Issue): the issues of the chosen
+                type in the configured range; empty if not mine_range.
+            commit_cache (cache.CommitCache|None): store of previously
+                mined commits, if one is configured.
+            timer (profiling.PhaseTimer): phase timer, disabled if not
+                profiling.
+            cmd_tbl (dict): schema.cmd_tbl, with getters timed if
+                profiling.
+            progress (progress.ProgressReporter): reporter of mining
+                progress and rate limit waits.
+            budget (budget.RunBudget): requests and time the run may
+                spend, started when the session is.
+            __bulk_data (dict): {group: {issue number: records}} for
+                groups gathered from repository-wide listings.
+            __cfg_range (list): range as configured, before sanitizing.
+            __issue_prs (dict): {issue number: (PR data, PR url)} of PRs
+                fetched in one pass over the range and needed again by a
+                later one.
+            __keep_prs (bool): whether to keep fetched PRs for a later
+                pass.
+            __paging_requests (int): requests spent listing the issues
+                in range.
+            __paging_secs (float): seconds spent listing the issues in
+                range.
         """
         self.cfg = cfg_obj
 
-        # initialize authenticated GitHub session so that we can
-        # interact with the API
-        self.gh_sesh = GithubSession(self.cfg.get_cfg_val("auth_path"))
+        self.progress = progress.ProgressReporter(progress_mode)
+
+        self.timer = timer if timer is not None else profiling.PhaseTimer(False)
+        self.cmd_tbl = self.timer.wrap_table(schema.cmd_tbl)
+        self.__bulk_data: dict = {}
+        self.__cfg_range: list = list(self.cfg.get_cfg_val("range"))
+        self.__issue_prs: dict = {}
+        self.__keep_prs: bool = False
+        self.__paging_requests: int = 0
+        self.__paging_secs: float = 0.0
+
+        self.commit_cache = None
+        if self.cfg.get_cfg_val("cache_path") is not None:
+            self.commit_cache = cache.CommitCache(
+                self.cfg.get_cfg_val("cache_path"),
+                self.cfg.get_cfg_val("cache_size_mb"),
+            )
 
-        repo = self.__get_repo_obj()
+        with self.timer.phase("startup"):
+            # initialize authenticated GitHub session so that we can
+            # interact with the API
+            self.gh_sesh = GithubSession(
+                self.cfg.get_cfg_val("auth_path"),
+                self.cfg.get_cfg_val("max_concurrency"),
+            )
 
-        paged_list = self.__get_issues_paged_list(
-            repo,
-            self.cfg.get_cfg_val("state"),
-            self.cfg.get_cfg_val("labels"),
-        )
+            self.budget = budget.RunBudget(
+                self.cfg.get_cfg_val("max_requests"),
+                self.cfg.get_cfg_val("deadline_mins"),
+            )
+            self.budget.record(self.gh_sesh.limiter.requests)
 
-        range = self.__get_sanitized_cfg_range(repo)
-        self.cfg.set_cfg_val("range", range)
+            self.repo = self.__get_repo_obj()
 
-        self.paged_list = issues_in_range(paged_list, range[0], range[-1])
+        self.paged_list: list = []
+
+        if not mine_range:
+            return
+
+        with self.timer.phase("range"):
+            range = self.__get_sanitized_cfg_range(self.repo)
+            self.cfg.set_cfg_val("range", range)
+
+        with self.timer.phase("paging"):
+            requests_before = self.gh_sesh.limiter.requests
+            start = time.perf_counter()
+
+            if self.cfg.get_cfg_val("search_query") is not None:
+                paged_list = self.__search_issues()
+
+            else:
+                paged_list = self.__get_issues_paged_list(
+                    self.repo,
+                    self.cfg.get_cfg_val("state"),
+                    self.cfg.get_cfg_val("labels"),
+                )
+
+            self.paged_list = issues_in_range(paged_list, range[0], range[-1])
+
+            self.__paging_requests = self.gh_sesh.limiter.requests - requests_before
+            self.__paging_secs = time.perf_counter() - start
 
     def __get_repo_obj(self):
         """
@@ -214,6 +437,151 @@ class Extractor:
             else:
                 return issues_paged_list
 
+    def __search_issues(self) -> list:
+        """
+        List the issues matching the configured search, by number.
+
+        The search API gives at most _MAX_SEARCH_RESULTS results for a
+        query, so the window of dates searched is halved until no part of
+        it matches more than that, and each part is searched on its own.
+
+        Returns:
+            list of github.Issue: issues matching the search, in order of
+            their numbers.
+        """
+        query: str = self.__get_search_query()
+        date_field: str = self.cfg.get_cfg_val("search_date_field")
+        one_sec = datetime.timedelta(seconds=1)
+
+        print(f"{TAB}Searching for: {query}")
+
+        found: dict = {}
+        windows: list = self.__get_search_windows()
+        searches: int = 0
+
+        while windows:
+            start, end = windows.pop()
+            results = self.gh_sesh.session.search_issues(
+                f"{query} {date_field}:"
+                f"{start.strftime(schema.TIME_FMT)}..{end.strftime(schema.TIME_FMT)}"
+            )
+
+            page = self.__get_search_page(results, 0)
+            searches += 1
+
+            if results.totalCount > _MAX_SEARCH_RESULTS:
+                if end - start > one_sec:
+                    mid = (start + (end - start) / 2).replace(microsecond=0)
+                    windows += [(mid + one_sec, end), (start, mid)]
+                    continue
+
+                print(
+                    f"{TAB * 2}Only the first {_MAX_SEARCH_RESULTS} of "
+                    f"{results.totalCount} items at {start} can be listed!"
+                )
+
+            wanted: int = min(results.totalCount, _MAX_SEARCH_RESULTS)
+            listed: int = 0
+            page_num: int = 0
+
+            while page:
+                found |= {issue.number: issue for issue in page}
+                listed += len(page)
+
+                if listed >= wanted:
+                    break
+
+                page_num += 1
+                page = self.__get_search_page(results, page_num)
+
+        print(f"{TAB * 2}Found {len(found)} items in {searches} searches")
+
+        return [found[number] for number in sorted(found)]
+
+    def __get_search_query(self) -> str:
+        """
+        Build the search query for the configured repo, state, and labels.
+
+        Returns:
+            str: configured search qualifiers, with those of the repo,
+            state, and labels added.
+        """
+        qualifiers: list = [
+            f"repo:{self.cfg.get_cfg_val('repo')}",
+            self.cfg.get_cfg_val("search_query"),
+        ]
+
+        if self.cfg.get_cfg_val("state") != "all":
+            qualifiers.append(f"state:{self.cfg.get_cfg_val('state')}")
+
+        qualifiers += [f'label:"{label}"' for label in self.cfg.get_cfg_val("labels")]
+
+        return " ".join(qualifier for qualifier in qualifiers if qualifier)
+
+    def __get_search_windows(self) -> list:
+        """
+        Get the windows of dates to search, from the configuration or repo.
+
+        Without a configured start, everything up to the end is searched.
+        Issues transferred or imported into the repo keep the dates they
+        had before, which may be older than the repo, so the time before
+        the repo was created is searched as a window of its own. It rarely
+        matches much, so it usually costs a single search.
+
+        Returns:
+            list of tuple[datetime.datetime, datetime.datetime]: first and
+            last moments of each window, in UTC. The end defaults to now.
+        """
+        since: str | None = self.cfg.get_cfg_val("search_since")
+        until: str | None = self.cfg.get_cfg_val("search_until")
+
+        def parse_date(date: str) -> datetime.datetime:
+            return datetime.datetime.strptime(date, schema.DATE_FMT).replace(
+                tzinfo=datetime.timezone.utc
+            )
+
+        end = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+
+        # the last day is searched as a whole
+        if until is not None:
+            end = parse_date(until) + datetime.timedelta(days=1, seconds=-1)
+
+        if since is not None:
+            return [(parse_date(since), end)]
+
+        epoch = datetime.datetime.fromtimestamp(0, datetime.timezone.utc)
+        created = self.repo.created_at.astimezone(datetime.timezone.utc)
+        before_repo = created - datetime.timedelta(seconds=1)
+
+        windows: list = [(created, end), (epoch, min(before_repo, end))]
+
+        return [(start, stop) for start, stop in windows if start <= stop]
+
+    def __get_search_page(self, results, page_num: int) -> list:
+        """
+        Get a page of search results, waiting out search rate limits.
+
+        Searches have a rate limit of their own, which resets every
+        minute, rather than sharing the hourly one.
+
+        Args:
+            results (github.PaginatedList): results of a search.
+            page_num (int): index of the page to get.
+
+        Returns:
+            list of github.Issue: the page.
+        """
+        while True:
+            try:
+                return results.get_page(page_num)
+
+            except github.RateLimitExceededException:
+                # the reset time is that of the last response: the search
+                with self.timer.phase("sleep"):
+                    self.progress.countdown(
+                        self.gh_sesh.get_remaining_ratelimit_time() + 1
+                    )
+
     def __get_sanitized_cfg_range(self, repo) -> tuple[int, int]:
         """
         Ensure that issue numbers to be mined exist.
@@ -277,7 +645,35 @@ class Extractor:
         # "body": cmd_tbl["body"](cur_PR)
         return {field: cmd_tbl[field](cur_item) for field in fields}
 
+    @staticmethod
+    def __get_item_record(record_type, fields: list, cmd_tbl: dict, cur_item):
+        """
+        Getter engine which stores data from an API item in a record.
+
+        This is the counterpart of __get_item_data for child items, e.g.
+        comments and commits, which are numerous enough that holding them
+        as dicts is costly. See the records module.
+
+        Args:
+            record_type (type): subclass of records.Record to create.
+            fields (list): a list of fields to gather from the item.
+            cmd_tbl (dict): dict of {field: function to get field}
+            cur_item (github.IssueComment/Commit): the current API item
+                to get data about.
+
+        Returns:
+            records.Record: record of API data values for param item
+        """
+        return record_type(
+            tuple(fields), tuple(cmd_tbl[field](cur_item) for field in fields)
+        )
+
     def __sleep_extractor(self) -> None:
+        """Sleep until the rate limit expires, timed as the "sleep" phase."""
+        with self.timer.phase("sleep"):
+            self.__wait_for_ratelimit_reset()
+
+    def __wait_for_ratelimit_reset(self) -> None:
         """
         Sleep until the rate limint on our Github account expires.
 
@@ -286,39 +682,21 @@ class Extractor:
               give an accurate amount of time until limit reset. Please
               check your system clock.
         """
-        print()
-
-        rate_limit = self.gh_sesh.get_remaining_ratelimit_time()
-        while rate_limit > 0:
-
-            # modulo function returns time tuple
-            minutes, seconds = divmod(rate_limit, 60)
-
-            # format the time string before printing
-            cntdown_str = f"{minutes:02d}:{seconds:02d}"
-
-            print(
-                f"{CLR}{TAB}Time until limit reset: {cntdown_str}",
-                end="\r",
-            )
-
-            time.sleep(1)
-            rate_limit -= 1
+        self.progress.countdown(self.gh_sesh.get_remaining_ratelimit_time())
 
         while True:
             try:
                 self.gh_sesh.session.get_user().id
 
             except github.RateLimitExceededException:
-                print(
-                    f"{CLR}{TAB}Waiting for rate limit to lift...",
-                    end="\r",
-                )
+                self.progress.status("Waiting for rate limit to lift...")
                 time.sleep(10)
 
             else:
                 cur_time = time.strftime("%I:%M:%S %p", time.localtime())
-                print(f"{CLR}{TAB}Rate limit lifted! The time is {cur_time}...")
+                self.progress.status(
+                    f"Rate limit lifted! The time is {cur_time}...", done=True
+                )
 
                 return None
 
@@ -336,46 +714,231 @@ class Extractor:
         This method is our access point into the GitHub API, the
         primary tool afforded by the Extractor class to the user.
 
+        If the run has a budget, the range is mined in several passes,
+        one per tier of PRIORITY_TIERS. A run that stops early, whether
+        because its budget is spent or because of an error, leaves a
+        checkpoint next to the output file; the next run with the same
+        settings resumes from it.
+
         Raises:
             github.RateLimitExceededException: if rate limited
                 by the GitHub REST API, dump collected data to
                 output file and sleep the program until calls
-                can be made again.
+                can be made again, then retry the current issue.
         """
-        func_schema = {
-            "issues": self.__get_item_data,
-            "commits": self.__get_issue_commits,
-            "comments": self.__get_issue_comments,
-        }.items()
+        output_file: str = self.cfg.get_cfg_val("output_path")
+        checkpoint_path: str = budget.get_checkpoint_path(output_file)
+
+        run_info: dict = self.__get_run_info()
+        tiers: list = run_info["tiers"]
+
+        first_tier, next_issue = budget.read_checkpoint(checkpoint_path, run_info)
+
+        for tier_num in range(first_tier, len(tiers)):
+            if len(tiers) > 1:
+                print(f"{TAB}Mining {', '.join(tiers[tier_num])}...")
 
+            # passes over the range each fetch the PRs they need; keep them
+            # for later passes rather than fetching them again
+            self.__keep_prs = any(
+                group in _PR_GROUPS for tier in tiers[tier_num + 1 :] for group in tier
+            )
+
+            stopped_at = self.__mine_tier(tiers[tier_num], next_issue)
+
+            if not self.__keep_prs:
+                self.__issue_prs.clear()
+
+            if stopped_at is not None:
+                budget.write_checkpoint(checkpoint_path, run_info, tier_num, stopped_at)
+                print(
+                    f"{TAB}Budget spent! Stopped at item #{stopped_at}; run "
+                    f"again to resume from {checkpoint_path}"
+                )
+
+                return
+
+            next_issue = 0
+
+        budget.remove_checkpoint(checkpoint_path)
+
+        if self.commit_cache is not None:
+            print(
+                f"{TAB}Commit cache: {self.commit_cache.hits} hits, "
+                f"{self.commit_cache.misses} misses"
+            )
+
+        metrics: dict = self.gh_sesh.limiter.metrics()
+        print(
+            f"{TAB}Requests in flight: window of {metrics['window']} "
+            f"(peak {metrics['peak_in_flight']}, max {metrics['max_window']}), "
+            f"{metrics['increases']} increases, {metrics['decreases']} decreases, "
+            f"{metrics['throttled']} throttled, "
+            f"{metrics['latency_spikes']} latency spikes"
+        )
+
+    def close(self) -> None:
+        """Close the commit cache, if one is open, once done mining."""
+        if self.commit_cache is not None:
+            self.commit_cache.close()
+            self.commit_cache = None
+
+    def get_issue_groups(self, issue, groups: list, pr_obj=None) -> records.IssueRecord:
+        """
+        Gather some field groups of a single issue, waiting out rate limits.
+
+        Used to update single issues outside of a run over the range,
+        e.g. from webhook deliveries. Groups gathered from repository-wide
+        listings, i.e. "events" and "review_comments", come out empty, as
+        those listings are only harvested by runs.
+
+        Args:
+            issue (github.Issue): issue to gather data about.
+            groups (list): field groups to gather, if configured.
+            pr_obj (github.PullRequest|None): PR behind the issue, if
+                already at hand; saves requesting it.
+
+        Returns:
+            records.IssueRecord: data gathered for the issue.
+        """
+        while True:
+            try:
+                return self.__get_issue_data(issue, groups, pr_obj)
+
+            except github.RateLimitExceededException:
+                self.__sleep_extractor()
+
+    def cache_commits(self, shas: list) -> int:
+        """
+        Mine commits into the commit cache ahead of the PRs that hold them.
+
+        Commits already in the cache are skipped, and nothing is done
+        without a commit cache or configured commit fields.
+
+        Args:
+            shas (list): SHAs of commits in the mined repository.
+
+        Returns:
+            int: amount of commits mined into the cache.
+        """
+        fields: list = self.cfg.get_cfg_val("commits")
+
+        if self.commit_cache is None or not fields:
+            return 0
+
+        urls: list = [
+            f"{self.repo.url}/commits/{sha}"
+            for sha in shas
+            if self.commit_cache.get(sha, fields) is None
+        ]
+
+        while True:
+            try:
+                with self.timer.phase("fetch:commit_detail"):
+                    commits: list = self.__fetch_commits(urls)
+
+            except github.RateLimitExceededException:
+                self.__sleep_extractor()
+
+            else:
+                break
+
+        for commit in commits:
+            self.__get_commit_datum(fields, self.cmd_tbl["commits"], commit)
+
+        return len(commits)
+
+    def __get_run_info(self) -> dict:
+        """
+        Get the settings that a checkpoint is only valid for.
+
+        The range is the one configured rather than the sanitized one, as
+        the end of a range like [1, -1] moves as issues are opened.
+
+        Returns:
+            dict: "repo", configured "range", and field group "tiers".
+        """
+        return {
+            "repo": self.cfg.get_cfg_val("repo"),
+            "range": self.__cfg_range,
+            "tiers": self.__get_group_tiers(),
+        }
+
+    def __get_group_tiers(self) -> list:
+        """
+        Get the configured field groups to mine in each pass over the range.
+
+        Returns:
+            list: lists of field groups. A run without a budget mines all
+            configured groups in a single pass.
+        """
+        configured = [group for group in schema.cmd_tbl if self.cfg.get_cfg_val(group)]
+
+        if not self.budget.is_capped:
+            return [configured]
+
+        tiers: list = [
+            [group for group in tier if group in configured] for tier in PRIORITY_TIERS
+        ]
+
+        return [tier for tier in tiers if tier]
+
+    def __mine_tier(self, groups: list, first_issue: int) -> int | None:
+        """
+        Mine some field groups of every issue in range, writing them out.
+
+        Args:
+            groups (list): field groups to mine.
+            first_issue (int): number of the issue to start at.
+
+        Returns:
+            int|None: number of the issue the budget ran out at, or None
+            if every issue was mined.
+        """
         out_data: dict = {}
         output_file: str = self.cfg.get_cfg_val("output_path")
-        issue_range: list = self.cfg.get_cfg_val("range")
+        compression: str = self.cfg.get_cfg_val("compression")
 
-        print(f"{TAB}Starting mining at #{issue_range[0]}...")
+        issues: list = [
+            issue for issue in self.paged_list if issue.number >= first_issue
+        ]
 
-        for cur_issue in self.paged_list:
-            print(cur_issue.number)
-            cur_issue_data: dict = {}
+        if not issues:
+            return None
 
-            try:
-                for key, func in func_schema:
-                    if self.cfg.get_cfg_val(key):
-                        cur_issue_data |= func(
-                            self.cfg.get_cfg_val(key),
-                            schema.cmd_tbl[key],
-                            cur_issue,
-                        )
+        if not self.__harvest_bulk_groups(groups):
+            return issues[0].number
+
+        print(f"{TAB}Starting mining at #{issues[0].number}...")
+
+        self.progress.start(len(issues))
+
+        stopped_at = None
+        issue_pos = 0
+
+        while issue_pos < len(issues):
+            cur_issue = issues[issue_pos]
 
-                cur_issue_entry: dict = {str(cur_issue.number): cur_issue_data}
+            if self.budget.is_spent():
+                stopped_at = cur_issue.number
+                break
+
+            try:
+                cur_issue_data = self.__get_issue_data(cur_issue, groups)
 
             except github.RateLimitExceededException:
-                utils.write_merged_dict_to_jsonfile(out_data, output_file)
+                self.__flush(out_data, output_file, compression)
 
                 # clear dictionary so that it isn't massive and holding
                 # onto data that we have already written to output
                 out_data.clear()
-                print()
+
+                if not self.budget.can_wait(
+                    self.gh_sesh.get_remaining_ratelimit_time()
+                ):
+                    stopped_at = cur_issue.number
+                    break
+
                 self.__sleep_extractor()
 
             except (
@@ -386,7 +949,8 @@ class Extractor:
             ):
 
                 print("\nWriting gathered data...")
-                utils.write_merged_dict_to_jsonfile(out_data, output_file)
+                self.__flush(out_data, output_file, compression)
+                self.__write_error_checkpoint(groups, cur_issue.number)
 
                 print(f"{TAB}Terminating at item #{cur_issue.number}\n")
                 print("---------------------------------------------\n\n")
@@ -394,14 +958,417 @@ class Extractor:
                 sys.exit(1)
 
             else:
-                out_data |= cur_issue_entry
+                out_data[str(cur_issue.number)] = cur_issue_data
+
+                calls_left, call_limit = self.gh_sesh.session.rate_limiting
+                self.budget.record(self.gh_sesh.limiter.requests)
+                self.progress.update(
+                    cur_issue.number,
+                    calls_left,
+                    call_limit,
+                    self.gh_sesh.get_remaining_ratelimit_time(),
+                    self.gh_sesh.limiter.metrics()["window"],
+                )
+
+                issue_pos += 1
 
-                print(f"{CLR}{TAB * 2}Issue: {cur_issue.number}, ", end="")
-                print(f"calls: {self.gh_sesh.get_remaining_calls()}", end="\r")
+        self.__flush(out_data, output_file, compression)
 
-        utils.write_merged_dict_to_jsonfile(out_data, output_file)
+        self.progress.finish()
 
-        print()
+        return stopped_at
+
+    def __write_error_checkpoint(self, groups: list, next_issue: int) -> None:
+        """
+        Leave a checkpoint for a run stopped by an error.
+
+        Args:
+            groups (list): field groups being mined when stopped.
+            next_issue (int): number of the issue the run stopped at.
+        """
+        run_info: dict = self.__get_run_info()
+
+        budget.write_checkpoint(
+            budget.get_checkpoint_path(self.cfg.get_cfg_val("output_path")),
+            run_info,
+            run_info["tiers"].index(groups),
+            next_issue,
+        )
+
+    def __flush(self, out_data: dict, output_file: str, compression: str) -> None:
+        """
+        Write gathered data to output, timed as the "flush" phase.
+
+        Args:
+            out_data (dict): {issue number: issue data} to write.
+            output_file (str): path to output file.
+            compression (str): compression option for the output.
+        """
+        with self.timer.phase("flush"):
+            writer.write_merged_dict_to_output(
+                out_data, output_file, compression, self.cfg.get_cfg_val("normalize")
+            )
+
+    def __get_bulk_listings(self, groups: list | None = None) -> dict:
+        """
+        Get the repository-wide listings of configured bulk groups.
+
+        Some groups are gathered from a listing covering the whole
+        repository rather than from a listing per issue, so that their
+        cost grows with the amount of pages in the listing instead of the
+        amount of issues mined.
+
+        Args:
+            groups (list|None): field groups to get listings for, if
+                configured, or None for all of them.
+
+        Returns:
+            dict: {group: listing spec}, where each spec holds
+
+                - "url": url of the listing
+                - "params": query parameters of the listing
+                - "item_type": PyGithub class of the listed items
+                - "record_type": type of record to hold items in
+                - "get_num": function getting the number of the issue an
+                  item belongs to, or None if it belongs to none
+                - "stop_before": for listings that are newest first, the
+                  time before which no item can belong to an issue in
+                  range, else None
+        """
+        listings: dict = {}
+
+        if not self.paged_list:
+            return listings
+
+        # items can only be made after the issue they belong to, and the
+        # first issue in range was the first one made
+        since = self.paged_list[0].created_at
+
+        def is_wanted(group: str) -> bool:
+            return bool(self.cfg.get_cfg_val(group)) and (
+                groups is None or group in groups
+            )
+
+        if is_wanted("review_comments"):
+            listings["review_comments"] = {
+                "url": f"{self.repo.url}/pulls/comments",
+                "params": {
+                    "sort": "created",
+                    "direction": "asc",
+                    "since": since.strftime(schema.TIME_FMT),
+                },
+                "item_type": github.PullRequestComment.PullRequestComment,
+                "record_type": records.ReviewCommentRecord,
+                "get_num": lambda comment: int(
+                    comment.pull_request_url.rsplit("/", 1)[-1]
+                ),
+                "stop_before": None,
+            }
+
+        if is_wanted("events"):
+            # the listing cannot be filtered by time and is newest first
+            listings["events"] = {
+                "url": f"{self.repo.url}/issues/events",
+                "params": {},
+                "item_type": github.IssueEvent.IssueEvent,
+                "record_type": records.EventRecord,
+                "get_num": lambda event: (
+                    event.issue.number if event.issue is not None else None
+                ),
+                "stop_before": since,
+            }
+
+        return listings
+
+    def __harvest_bulk_groups(self, groups: list) -> bool:
+        """
+        Page each configured repository-wide listing once, by issue.
+
+        Listings are paged within the run's budget. A listing cut short by
+        the budget is paged from the start again when the run resumes.
+
+        Args:
+            groups (list): field groups about to be mined.
+
+        Returns:
+            bool: False if the budget ran out before every listing was
+            paged to its end.
+        """
+        low, high = self.cfg.get_cfg_val("range")
+        self.__bulk_data = {}
+
+        for group, spec in self.__get_bulk_listings(groups).items():
+            print(f"{TAB}Gathering {group} of the repository...")
+
+            fields: list = self.cfg.get_cfg_val(group)
+            stop_before = spec["stop_before"]
+            items_by_num: dict = {}
+            page_num = 1
+
+            while True:
+                page = self.__get_listing_page(group, spec, page_num)
+
+                if page is None:
+                    return False
+
+                is_last_page = len(page) < self.gh_sesh.session.per_page
+
+                for item in page:
+                    if stop_before is not None and item.created_at < stop_before:
+                        is_last_page = True
+                        break
+
+                    item_num = spec["get_num"](item)
+
+                    if item_num is not None and low <= item_num <= high:
+                        items_by_num.setdefault(item_num, []).append(
+                            self.__get_item_record(
+                                spec["record_type"], fields, self.cmd_tbl[group], item
+                            )
+                        )
+
+                if is_last_page:
+                    break
+
+                page_num += 1
+
+            # issues' items are kept oldest first, whatever the listing order
+            if stop_before is not None:
+                for issue_items in items_by_num.values():
+                    issue_items.reverse()
+
+            self.__bulk_data[group] = items_by_num
+
+        return True
+
+    def __get_listing_page(self, name: str, spec: dict, page_num: int) -> list | None:
+        """
+        Get a page of a listing, sleeping through rate limits.
+
+        Pages are requested by number so that a rate limit interrupts a
+        listing without it having to be paged from the start again.
+
+        Items are created from the raw page as complete objects. Items of
+        a github.PaginatedList are not, and PyGithub requests the whole
+        item whenever a key that the listing left out is accessed, e.g.
+        the label of an event that is not about a label.
+
+        Args:
+            name (str): name to time requests for pages as "fetch:<name>".
+            spec (dict): listing spec from __get_bulk_listings.
+            page_num (int): number of the page, starting at 1.
+
+        Returns:
+            list|None: items of the page, or None if the run's budget ran
+            out, or would run out waiting for the rate limit to reset.
+        """
+        session = self.gh_sesh.session
+        params = {**spec["params"], "per_page": session.per_page, "page": page_num}
+
+        while True:
+            if self.budget.is_spent():
+                return None
+
+            try:
+                with self.timer.phase(f"fetch:{name}"):
+                    _, page = session.requester.requestJsonAndCheck(
+                        "GET", spec["url"], parameters=params
+                    )
+
+            except github.RateLimitExceededException:
+                if not self.budget.can_wait(
+                    self.gh_sesh.get_remaining_ratelimit_time()
+                ):
+                    return None
+
+                self.__sleep_extractor()
+
+            else:
+                self.budget.record(self.gh_sesh.limiter.requests)
+
+                return [
+                    session.create_from_raw_data(spec["item_type"], raw_item)
+                    for raw_item in page
+                ]
+
+    def __get_bulk_records(self, group: str, issue) -> dict:
+        """
+        Get the records gathered for an issue from a repository-wide listing.
+
+        Args:
+            group (str): group the records were gathered for.
+            issue (github.Issue): issue to get records for.
+
+        Returns:
+            dict: {group: records of the issue}
+        """
+        issue_items = self.__bulk_data.get(group, {}).get(issue.number, ())
+
+        return {group: records.RecordList(tuple(issue_items))}
+
+    def sample_run_cost(self, sample_len: int) -> dict:
+        """
+        Mine a sample of the configured range without writing output.
+
+        Items are chosen evenly across the range and mined with the
+        configured fields so that the cost of the whole run can be
+        extrapolated from them. See the estimate module.
+
+        Args:
+            sample_len (int): amount of items to mine.
+
+        Returns:
+            dict: measurements taken while mining the sample.
+        """
+        sample_items = estimate.pick_sample(self.paged_list, sample_len)
+        sample: dict = {
+            "items": len(sample_items),
+            "requests": 0,
+            "seconds": 0.0,
+            "bytes": 0,
+            "prs": 0,
+            "commits": 0,
+            "comments": 0,
+        }
+
+        print(f"{TAB}Sampling {len(sample_items)} items...")
+
+        for cur_issue in sample_items:
+            while True:
+                requests_before = self.gh_sesh.limiter.requests
+                start = time.perf_counter()
+
+                try:
+                    cur_issue_data = self.__get_issue_data(cur_issue)
+
+                except github.RateLimitExceededException:
+                    self.__sleep_extractor()
+
+                else:
+                    break
+
+            sample["seconds"] += time.perf_counter() - start
+            sample["requests"] += self.gh_sesh.limiter.requests - requests_before
+
+            sample["prs"] += int(cur_issue_data.get("is_pr", False))
+            sample["commits"] += len(cur_issue_data.get("commits", {}))
+            sample["comments"] += len(cur_issue_data.get("comments", {}))
+
+            cur_issue_entry = {str(cur_issue.number): cur_issue_data}
+            sample["bytes"] += len(
+                json.dumps(
+                    cur_issue_entry,
+                    default=records.to_output,
+                    ensure_ascii=False,
+                    indent=2,
+                ).encode()
+            )
+
+            self.progress.status(f"Sampled issue: #{cur_issue.number}")
+
+        self.progress.status(f"Sampled {len(sample_items)} items", done=True)
+
+        return sample
+
+    def estimate_run_cost(self, sample_len: int) -> dict:
+        """
+        Estimate the requests, time, and output size of a full run.
+
+        Args:
+            sample_len (int): amount of items to sample.
+
+        Returns:
+            dict: estimated totals; see estimate.extrapolate_run_cost.
+        """
+        sample = self.sample_run_cost(sample_len)
+
+        # repository-wide listings are paged once per run, not per item.
+        # Their total counts cost a request each, and are an upper bound
+        # for listings that stop early
+        session = self.gh_sesh.session
+        bulk_requests: int = sum(
+            math.ceil(
+                github.PaginatedList.PaginatedList(
+                    spec["item_type"], session.requester, spec["url"], spec["params"]
+                ).totalCount
+                / session.per_page
+            )
+            for spec in self.__get_bulk_listings().values()
+        )
+
+        # so is the listing, or search, of the issues in range. It was
+        # paged when the extractor was made, just as a run will page it
+        secs_per_request: float = sample["seconds"] / max(sample["requests"], 1)
+        listing_requests: int = bulk_requests + self.__paging_requests
+        listing_secs: float = bulk_requests * secs_per_request + self.__paging_secs
+
+        calls_left, call_limit = self.gh_sesh.session.rate_limiting
+
+        return estimate.extrapolate_run_cost(
+            sample,
+            len(self.paged_list),
+            calls_left,
+            call_limit,
+            self.gh_sesh.get_remaining_ratelimit_time(),
+            listing_requests,
+            listing_secs,
+        )
+
+    def __get_issue_data(
+        self, cur_issue, groups: list | None = None, pr_obj=None
+    ) -> records.IssueRecord:
+        """
+        Gather configured groups of fields for a single issue.
+
+        Args:
+            cur_issue (github.Issue): issue to gather data about.
+            groups (list|None): field groups to gather, if configured, or
+                None for all of them.
+            pr_obj (github.PullRequest|None): PR behind the issue, if
+                already at hand. Otherwise, the PR is requested if a group
+                needs it.
+
+        Returns:
+            records.IssueRecord: all data gathered for the issue.
+        """
+        func_schema = {
+            "issues": self.__get_item_data,
+            "commits": self.__get_pr_commits,
+            "files": self.__get_pr_files,
+            "reviews": self.__get_pr_reviews,
+            "review_comments": self.__get_review_comments,
+            "comments": self.__get_issue_comments,
+            "events": self.__get_issue_events,
+        }.items()
+
+        cur_issue_data: dict = {}
+
+        if pr_obj is not None:
+            cur_issue_data |= self.__get_pr_data(pr_obj)
+
+        for key, func in func_schema:
+            if not self.cfg.get_cfg_val(key) or (
+                groups is not None and key not in groups
+            ):
+                continue
+
+            item = cur_issue
+
+            # the PR behind the issue is fetched at most once per issue and
+            # only if a group asks for it
+            if key in _PR_GROUPS:
+                if "is_pr" not in cur_issue_data:
+                    pr_obj, pr_data = self.__get_kept_issue_pr(cur_issue)
+                    cur_issue_data |= pr_data
+
+                if pr_obj is None:
+                    continue
+
+                item = pr_obj
+
+            cur_issue_data |= func(self.cfg.get_cfg_val(key), self.cmd_tbl[key], item)
+
+        return records.IssueRecord.from_dict(cur_issue_data)
 
     def __get_issue_comments(self, fields: list, cmd_tbl: dict, issue) -> dict:
         """
@@ -413,96 +1380,287 @@ class Extractor:
             cmd_tbl (dict): dict of {field: function to get field}
 
         Returns:
-            dict: dictionary of {comment index: comment data}
+            dict: {"comments": records of comment data}
 
         """
         field_type = "comments"
 
-        # dict will hold data related to all comments for an
+        # list will hold data related to all comments for an
         # issue. Issue to comments is a one to many relationship
-        comment_index: int = 0
-        cur_comment_data: dict = {}
+        cur_comment_data: list = [
+            self.__get_item_record(records.CommentRecord, fields, cmd_tbl, comment)
+            for comment in self.timer.iterate("fetch:comments", issue.get_comments())
+        ]
 
-        for comment in issue.get_comments():
-            cur_entry = self.__get_item_data(fields, cmd_tbl, comment)
+        return {field_type: records.RecordList(tuple(cur_comment_data))}
 
-            cur_entry = {str(comment_index): cur_entry}
+    def __get_issue_events(self, fields: list, cmd_tbl: dict, issue) -> dict:
+        """
+        Get event data for the given issue.
 
-            cur_comment_data |= cur_entry
+        Events are gathered up front from the repository-wide listing of
+        issue events; see __harvest_bulk_groups.
 
-            comment_index += 1
+        Args:
+            fields (list): unused; fields were gathered while harvesting.
+            cmd_tbl (dict): unused; fields were gathered while harvesting.
+            issue (github.issue): issue to gather data about.
 
-        return {field_type: cur_comment_data}
+        Returns:
+            dict: {"events": records of event data, oldest first}
+        """
+        return self.__get_bulk_records("events", issue)
 
-    def __get_issue_commits(self, fields: list, cmd_tbl: dict, issue) -> dict:
+    def __get_review_comments(self, fields: list, cmd_tbl: dict, issue) -> dict:
         """
-        Get issue commit data for the given issue.
+        Get review comment data for the given issue, if it is a PR.
+
+        Review comments are gathered up front from the repository-wide
+        listing of review comments; see __harvest_bulk_groups.
 
         Args:
+            fields (list): unused; fields were gathered while harvesting.
+            cmd_tbl (dict): unused; fields were gathered while harvesting.
             issue (github.issue): issue to gather data about.
-            fields (list): a list of commit fields to gather from the issue.
+
+        Returns:
+            dict: {"review_comments": records of review comment data}, or
+            nothing if the issue is not a PR.
+        """
+        if not is_listed_pr(issue):
+            return {}
+
+        return self.__get_bulk_records("review_comments", issue)
+
+    def __get_kept_issue_pr(self, issue) -> tuple:
+        """
+        Get the PR behind an issue, reusing one kept by an earlier pass.
+
+        Kept PRs are lazy, holding only their url, so that keeping them
+        costs little memory; what later passes ask of them, e.g. their
+        commits, is requested by url anyway.
+
+        Args:
+            issue (github.Issue): issue to get the PR of.
+
+        Returns:
+            tuple: the PR or None if the issue is not a PR, and the data
+            from __get_pr_data.
+        """
+        kept = self.__issue_prs.get(issue.number)
+
+        if kept is not None:
+            pr_data, pr_url = kept
+
+            if pr_url is None:
+                return None, pr_data
+
+            pr_obj = github.PullRequest.PullRequest(
+                self.gh_sesh.session.requester,
+                {},
+                {"url": pr_url, "number": issue.number},
+                completed=False,
+            )
+
+            return pr_obj, pr_data
+
+        pr_obj = self.__get_issue_pr(issue)
+        pr_data: dict = self.__get_pr_data(pr_obj)
+
+        if self.__keep_prs:
+            self.__issue_prs[issue.number] = (
+                pr_data,
+                pr_obj.url if pr_obj is not None else None,
+            )
+
+        return pr_obj, pr_data
+
+    def __get_issue_pr(self, issue):
+        """
+        Get the PR behind an issue, if the issue is a PR.
+
+        Args:
+            issue (github.Issue): issue to get the PR of.
+
+        Returns:
+            github.PullRequest|None: the PR, or None if the issue is not
+            a PR.
+        """
+        # only PRs have a PR to fetch; asking for that of an issue would
+        # spend a request on an error
+        if not is_listed_pr(issue):
+            return None
+
+        try:
+            with self.timer.phase("fetch:pull_request"):
+                return issue.as_pull_request()
+
+        except github.UnknownObjectException:
+            # Not a PR, does not need to raise an error.
+            # Return up and keep going
+            return None
+
+    @staticmethod
+    def __get_pr_data(pr_obj) -> dict:
+        """
+        Get the PR data gathered for every issue that PR fields are mined for.
+
+        Args:
+            pr_obj (github.PullRequest|None): PR behind an issue, if any.
+
+        Returns:
+            dict: whether the issue is a PR and, if so, the PR's state,
+            merged status, and amount of review comments.
+        """
+        if pr_obj is None:
+            return {"is_pr": False}
+
+        return {
+            "is_pr": True,
+            "state": pr_obj.state,
+            "is_merged": pr_obj.merged,
+            "num_review_comments": pr_obj.comments,
+        }
+
+    def __get_pr_commits(self, fields: list, cmd_tbl: dict, pr_obj) -> dict:
+        """
+        Get commit data for the given PR.
+
+        Args:
+            fields (list): a list of commit fields to gather from the PR.
             cmd_tbl (dict): dict of {field: function to get field}
+            pr_obj (github.PullRequest): PR to gather data about.
 
         Returns:
-            dict: dictionary of {commit index: commit data}
+            dict: {"commits": records of commit data}
+        """
+        field_type: str = "commits"
+        commits: list = list(self.timer.iterate("fetch:commits", pr_obj.get_commits()))
+
+        cached_data: dict = {}
+        if self.commit_cache is not None:
+            for commit in commits:
+                cached_datum = self.commit_cache.get(commit.sha, fields)
+
+                if cached_datum is not None:
+                    cached_data[commit.sha] = cached_datum
+
+        # listed commits lack their files; the full commits are requested
+        with self.timer.phase("fetch:commit_detail"):
+            full_commits = iter(
+                self.__fetch_commits(
+                    [commit.url for commit in commits if commit.sha not in cached_data]
+                )
+            )
+
+        pr_commit_data: list = [
+            (
+                records.CommitRecord.from_dict(cached_data[commit.sha])
+                if commit.sha in cached_data
+                else self.__get_commit_datum(fields, cmd_tbl, next(full_commits))
+            )
+            for commit in commits
+        ]
 
+        return {field_type: records.RecordList(tuple(pr_commit_data))}
+
+    def __fetch_commits(self, urls: list) -> list:
         """
+        Request full commits, several at a time.
 
-        def as_pr(cur_issue):
-            try:
-                cur_pr = cur_issue.as_pull_request()
+        Only the requests are sent from other threads; see
+        GithubSession.get_many. The commits are made from the raw
+        responses here, so getters, the timer, and the commit cache stay
+        in the calling thread.
 
-            except github.UnknownObjectException:
-                # Not a PR, does not need to raise an error.
-                # Return up and keep going
-                return None
+        Args:
+            urls (list): API urls of the commits.
 
-            else:
-                return cur_pr
+        Raises:
+            github.GithubException: a request failed. Requests not yet
+                sent are dropped.
 
-        def __get_commit_data(pr_obj):
-            """
-            Return the last commit from a paginated list of commits from a PR.
+        Returns:
+            list of github.Commit: complete commits, in the order of urls.
+        """
+        session = self.gh_sesh.session
 
-            Args:
-                pr_obj (github.PullRequest): PR to gather data for.
+        return [
+            session.create_from_raw_data(github.Commit.Commit, data, headers)
+            for headers, data in self.gh_sesh.get_many(urls)
+        ]
 
-            Returns:
-                Github.Commit: last commit made in PR.
+    def __get_pr_reviews(self, fields: list, cmd_tbl: dict, pr_obj) -> dict:
+        """
+        Get review data for the given PR.
 
-            """
-            field_type: str = "commits"
-            commit_index: int = 0
-            pr_commit_data: dict = {}
+        The REST API has no repository-wide listing of reviews, so this
+        costs one request per page of reviews of each PR.
 
-            for commit in pr_obj.get_commits():
-                if commit.files:
-                    commit_datum = self.__get_item_data(fields, cmd_tbl, commit)
+        Args:
+            fields (list): a list of review fields to gather from the PR.
+            cmd_tbl (dict): dict of {field: function to get field}
+            pr_obj (github.PullRequest): PR to gather data about.
 
-                else:
-                    commit_datum = {}
+        Returns:
+            dict: {"reviews": records of review data}
+        """
+        pr_review_data: list = [
+            self.__get_item_record(records.ReviewRecord, fields, cmd_tbl, review)
+            for review in self.timer.iterate("fetch:reviews", pr_obj.get_reviews())
+        ]
 
-                pr_commit_data |= {str(commit_index): commit_datum}
+        return {"reviews": records.RecordList(tuple(pr_review_data))}
 
-                commit_index += 1
+    def __get_pr_files(self, fields: list, cmd_tbl: dict, pr_obj) -> dict:
+        """
+        Get data about the files changed by the given PR as a whole.
 
-            return {field_type: pr_commit_data}
+        Unlike the "files" field of commits, which costs a request per
+        commit, this costs at most one request per PR; see the diff module.
 
-        pr_data: dict
-        pr_obj = as_pr(issue)
+        Args:
+            fields (list): a list of file fields to gather from the PR.
+            cmd_tbl (dict): dict of {field: function to get field}
+            pr_obj (github.PullRequest): PR to gather data about.
 
-        if pr_obj is not None:
-            pr_data = {
-                "is_pr": True,
-                "state": pr_obj.state,
-                "is_merged": pr_obj.merged,
-                "num_review_comments": pr_obj.comments,
-            }
+        Returns:
+            dict: {"files": record of file data}
+        """
+        return {
+            "files": self.__get_item_record(
+                records.FilesRecord, fields, cmd_tbl, diff.PullFiles(pr_obj)
+            )
+        }
 
-            commit_data: dict = __get_commit_data(pr_obj)
-            pr_data |= commit_data
+    def __get_commit_datum(
+        self, fields: list, cmd_tbl: dict, commit
+    ) -> records.CommitRecord:
+        """
+        Get data for a single commit, storing it in the commit cache.
+
+        A PR's list of commits lacks their files, so the full commit is
+        requested for each commit not found in the cache; a cache hit
+        saves a request whether or not files were asked for.
+
+        Args:
+            fields (list): a list of commit fields to gather.
+            cmd_tbl (dict): dict of {field: function to get field}
+            commit (github.Commit): completed commit to gather data about.
+
+        Returns:
+            records.CommitRecord: data for the commit, empty if the
+            commit does not change any files.
+        """
+        if commit.files:
+            commit_datum = self.__get_item_record(
+                records.CommitRecord, fields, cmd_tbl, commit
+            )
 
         else:
-            pr_data = {"is_pr": False}
+            commit_datum = records.CommitRecord((), ())
+
+        if self.commit_cache is not None:
+            self.commit_cache.put(commit.sha, commit_datum.to_dict())
 
-        return pr_data
+        return commit_datum
@@ -0,0 +1,271 @@
+"""
+Per-phase timing and profiling of extractor runs.
+
+When a run is slow, the time may go to the network, to PyGithub lazily
+completing objects, to the getters in schema.cmd_tbl, or to writing
+output. The PhaseTimer here records the wall and CPU time spent in each
+named phase of a run so that a report can point at the culprit, and
+reports from different versions of the extractor can be compared.
+
+Phase names in use by the extractor:
+
+    - startup: authenticating and fetching the repository
+    - range: sanitizing the configured range
+    - paging: listing the issues in the range
+    - getter:<group>.<field>: a getter from schema.cmd_tbl
+    - fetch:<endpoint>: requests for an issue's child items, e.g. comments
+    - flush: merging and writing output
+    - sleep: waiting for the rate limit to lift
+
+Phases nest, e.g. a getter may trigger a fetch, and times are inclusive
+of nested phases.
+
+cProfile docs:
+    https://docs.python.org/3/library/profile.html
+"""
+
+import json
+import platform
+import pstats
+import time
+from importlib import metadata
+
+# amount of functions to list in reports from cProfile
+_TOP_FUNCS_LEN = 40
+
+
+class _Phase:
+    """Context manager adding the time spent inside it to a phase."""
+
+    __slots__ = ("__totals", "__wall", "__cpu")
+
+    def __init__(self, totals: list) -> None:
+        self.__totals = totals
+
+    def __enter__(self):
+        self.__wall = time.perf_counter()
+        self.__cpu = time.process_time()
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__totals[0] += 1
+        self.__totals[1] += time.perf_counter() - self.__wall
+        self.__totals[2] += time.process_time() - self.__cpu
+
+
+class _NullPhase:
+    """Context manager that does nothing, used when timing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class PhaseTimer:
+    """Accumulates wall and CPU time spent in named phases of a run."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+        Initialize a phase timer.
+
+        A disabled timer hands out phases that do nothing and leaves
+        wrapped functions untouched, so that it costs next to nothing
+        to leave timing calls in place.
+
+        Args:
+            enabled (bool): whether to record anything at all.
+
+        Attributes:
+            enabled (bool): whether to record anything at all.
+        """
+        self.enabled = enabled
+        self.__phases: dict = {}
+        self.__wall = time.perf_counter()
+        self.__cpu = time.process_time()
+
+    def phase(self, name: str):
+        """
+        Get a context manager that times its body as the named phase.
+
+        Args:
+            name (str): name of the phase.
+
+        Returns:
+            context manager timing its body.
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+
+        return _Phase(self.__phases.setdefault(name, [0, 0.0, 0.0]))
+
+    def wrap(self, name: str, func):
+        """
+        Wrap a function so that its calls are timed as the named phase.
+
+        Args:
+            name (str): name of the phase.
+            func (Callable): function to wrap.
+
+        Returns:
+            Callable: wrapped function, or func itself if disabled.
+        """
+        if not self.enabled:
+            return func
+
+        def timed(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return timed
+
+    def wrap_table(self, cmd_tbl: dict) -> dict:
+        """
+        Wrap every getter in a dispatch table like schema.cmd_tbl.
+
+        Args:
+            cmd_tbl (dict): {group: {field: getter}}
+
+        Returns:
+            dict: copy of the table with getters timed as
+            "getter:<group>.<field>", or cmd_tbl itself if disabled.
+        """
+        if not self.enabled:
+            return cmd_tbl
+
+        return {
+            group: {
+                field: self.wrap(f"getter:{group}.{field}", getter)
+                for field, getter in getters.items()
+            }
+            for group, getters in cmd_tbl.items()
+        }
+
+    def iterate(self, name: str, iterable):
+        """
+        Time the work of producing each item of an iterable.
+
+        Paginated lists request their next page from within the loop
+        that consumes them; only the time spent producing items, not the
+        time spent in the body of that loop, is attributed to the phase.
+
+        Args:
+            name (str): name of the phase.
+            iterable (Iterable): iterable to time.
+
+        Returns:
+            Iterable: timed iterable, or iterable itself if disabled.
+        """
+        if not self.enabled:
+            return iterable
+
+        return self.__iterate(name, iterable)
+
+    def __iterate(self, name: str, iterable):
+        iterator = iter(iterable)
+
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+
+                except StopIteration:
+                    return
+
+            yield item
+
+    def report(self) -> dict:
+        """
+        Summarize the time recorded so far.
+
+        Returns:
+            dict: totals for the run and for each phase, phases ordered
+            from most to least wall time.
+        """
+        phases = sorted(self.__phases.items(), key=lambda item: -item[1][1])
+
+        return {
+            "total": {
+                "wall_secs": time.perf_counter() - self.__wall,
+                "cpu_secs": time.process_time() - self.__cpu,
+            },
+            "phases": {
+                name: {"calls": calls, "wall_secs": wall, "cpu_secs": cpu}
+                for name, (calls, wall, cpu) in phases
+            },
+        }
+
+
+def write_report(out_path: str, timer: PhaseTimer, run_info: dict, profiler) -> None:
+    """
+    Write a profiling report as JSON.
+
+    If a cProfile profiler is given, its raw stats are also dumped next to
+    the report, at "<out_path>.prof", for use with pstats or snakeviz.
+
+    Args:
+        out_path (str): path to write report to.
+        timer (PhaseTimer): timer used during the run.
+        run_info (dict): details of the run to include, e.g. the repo.
+        profiler (cProfile.Profile|None): profiler used during the run.
+    """
+    try:
+        version = metadata.version("osl-repo-extractor")
+
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    report = {
+        "extractor_version": version,
+        "python_version": platform.python_version(),
+        "run": run_info,
+        **timer.report(),
+    }
+
+    if profiler is not None:
+        stats_path = f"{out_path}.prof"
+        profiler.dump_stats(stats_path)
+
+        report["profile"] = {
+            "stats_path": stats_path,
+            "top_cumulative": _get_top_funcs(pstats.Stats(profiler)),
+        }
+
+    with open(out_path, "w", encoding="UTF-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+def _get_top_funcs(stats: pstats.Stats) -> list:
+    """
+    List the functions with the most cumulative time in profiler stats.
+
+    Args:
+        stats (pstats.Stats): stats to summarize.
+
+    Returns:
+        list: dicts describing each function, most expensive first.
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+
+    return [
+        {
+            "function": f"{file_name}:{line_num}({func_name})",
+            "calls": num_calls,
+            "total_secs": total_time,
+            "cumulative_secs": cumulative_time,
+        }
+        for (file_name, line_num, func_name), (
+            _,
+            num_calls,
+            total_time,
+            cumulative_time,
+            _,
+        ) in rows[:_TOP_FUNCS_LEN]
+    ]
@@ -0,0 +1,260 @@
+"""
+Throttled progress reporting for extraction runs.
+
+Redrawing a status line for every issue mined, and every second while
+rate limited, floods logs and costs time on fast runs. The reporter here
+instead redraws at a fixed rate, showing throughput and an estimate of
+the time left that accounts for the remaining rate limit quota.
+
+Reporting modes:
+
+    - tty: a single status line, redrawn in place
+    - log: structured "key=value" lines at a much lower rate, for output
+      redirected to a file, e.g. in CI
+    - off: no progress output at all
+    - auto: "tty" if stdout is a terminal, else "log"
+"""
+
+import json
+import sys
+import time
+from repo_extractor import estimate
+
+# ANSI escape sequence for clearing a row in the console:
+# credit: https://stackoverflow.com/a/64245513
+CLR = "\x1b[K"
+TAB = " " * 4
+
+# seconds between redraws in each mode
+_INTERVALS: dict = {"tty": 0.5, "log": 30.0}
+
+PROGRESS_MODES: list = ["auto", "tty", "log", "off"]
+
+
+class ProgressReporter:
+    """Report mining progress at a fixed rate."""
+
+    def __init__(self, mode: str = "auto", stream=None) -> None:
+        """
+        Initialize a progress reporter.
+
+        Args:
+            mode (str): one of PROGRESS_MODES.
+            stream (io.TextIOBase|None): stream to report to. Defaults
+                to stdout.
+
+        Attributes:
+            mode (str): resolved reporting mode; "tty", "log", or "off".
+        """
+        self.__stream = stream if stream is not None else sys.stdout
+
+        if mode == "auto":
+            mode = "tty" if self.__stream.isatty() else "log"
+
+        self.mode = mode
+        self.__interval: float = _INTERVALS.get(mode, 0.0)
+
+        self.__total: int = 0
+        self.__done: int = 0
+        self.__requests: int = 0
+        self.__last_calls_left: int | None = None
+        self.__start: float = time.monotonic()
+        self.__last_draw: float = 0.0
+        self.__last_status: str = ""
+
+    def start(self, total: int) -> None:
+        """
+        Begin reporting on a run.
+
+        Args:
+            total (int): amount of items to mine in the run.
+        """
+        self.__total = total
+        self.__done = 0
+        self.__requests = 0
+        self.__last_calls_left = None
+        self.__start = time.monotonic()
+        self.__last_draw = 0.0
+
+    def update(
+        self,
+        item_num: int,
+        calls_left: int,
+        call_limit: int,
+        reset_secs: int,
+        window: int | None = None,
+    ) -> None:
+        """
+        Record that an item has been mined, redrawing if it is time to.
+
+        Args:
+            item_num (int): number of the item just mined.
+            calls_left (int): calls left in the current rate limit window.
+            call_limit (int): calls allotted per rate limit window.
+            reset_secs (int): seconds until the current window resets.
+            window (int|None): requests currently allowed in flight at
+                once, if known.
+        """
+        self.__done += 1
+
+        # a window that resets makes the difference negative; the calls
+        # spent across the reset are simply not counted
+        if self.__last_calls_left is not None:
+            self.__requests += max(self.__last_calls_left - calls_left, 0)
+
+        self.__last_calls_left = calls_left
+
+        now = time.monotonic()
+        if self.mode == "off" or now - self.__last_draw < self.__interval:
+            return
+
+        self.__last_draw = now
+        elapsed = max(now - self.__start, 1e-9)
+
+        fields = {
+            "issue": item_num,
+            "done": self.__done,
+            "total": self.__total,
+            "issues_per_sec": self.__done / elapsed,
+            "requests_per_sec": self.__requests / elapsed,
+            "calls_left": calls_left,
+            "eta_secs": self.__get_eta(elapsed, calls_left, call_limit, reset_secs),
+        }
+
+        if window is not None:
+            fields["window"] = window
+
+        if self.mode == "tty":
+            self.__stream.write(
+                f"{CLR}{TAB * 2}Issue: #{fields['issue']} "
+                f"({fields['done']}/{fields['total']}), "
+                f"{fields['issues_per_sec']:.1f} issues/s, "
+                f"{fields['requests_per_sec']:.1f} req/s, "
+                f"calls: {fields['calls_left']}, "
+                + (f"window: {window}, " if window is not None else "")
+                + f"ETA: {estimate.fmt_duration(fields['eta_secs'])}\r"
+            )
+
+        else:
+            self.__log("progress", fields)
+
+        self.__stream.flush()
+
+    def countdown(self, secs: int) -> None:
+        """
+        Sleep for a while, showing the time left on a terminal or logging it.
+
+        Args:
+            secs (int): seconds to sleep for.
+        """
+        if secs <= 0:
+            return
+
+        if self.mode == "log":
+            self.__log(
+                "sleeping",
+                {
+                    "secs": secs,
+                    "until": time.strftime(
+                        "%H:%M:%S", time.localtime(time.time() + secs)
+                    ),
+                },
+            )
+
+        if self.mode != "tty":
+            time.sleep(secs)
+            return
+
+        end = time.monotonic() + secs
+        while (left := end - time.monotonic()) > 0:
+            self.__stream.write(
+                f"{CLR}{TAB}Time until limit reset: {estimate.fmt_duration(left)}\r"
+            )
+            self.__stream.flush()
+
+            time.sleep(min(self.__interval, left))
+
+    def status(self, msg: str, done: bool = False) -> None:
+        """
+        Report a status message.
+
+        In log mode, a message that repeats the one before it is dropped.
+
+        Args:
+            msg (str): message to report.
+            done (bool): whether the message ends a status line on a
+                terminal rather than being overwritten by the next one.
+        """
+        if self.mode == "tty":
+            self.__stream.write(f"{CLR}{TAB}{msg}" + ("\n" if done else "\r"))
+            self.__stream.flush()
+
+        elif self.mode == "log" and msg != self.__last_status:
+            self.__log("status", {"msg": msg})
+
+        self.__last_status = msg
+
+    def finish(self) -> None:
+        """End reporting on a run, leaving the last status line in place."""
+        if self.mode == "tty":
+            self.__stream.write("\n")
+
+        elif self.mode == "log":
+            elapsed = max(time.monotonic() - self.__start, 1e-9)
+            self.__log(
+                "finished",
+                {
+                    "done": self.__done,
+                    "total": self.__total,
+                    "elapsed_secs": elapsed,
+                    "requests": self.__requests,
+                },
+            )
+
+        self.__stream.flush()
+
+    def __get_eta(
+        self, elapsed: float, calls_left: int, call_limit: int, reset_secs: int
+    ) -> float:
+        """
+        Estimate the time left by extrapolating the run so far.
+
+        Returns:
+            float: estimated seconds left, including rate limit waits.
+        """
+        run_so_far = {
+            "items": self.__done,
+            "requests": self.__requests,
+            "seconds": elapsed,
+            "bytes": 0,
+            "prs": 0,
+            "commits": 0,
+            "comments": 0,
+        }
+
+        return estimate.extrapolate_run_cost(
+            run_so_far,
+            self.__total - self.__done,
+            calls_left,
+            call_limit,
+            reset_secs,
+        )["wall_secs"]
+
+    def __log(self, event: str, fields: dict) -> None:
+        """Write a structured "key=value" log line."""
+        pairs = " ".join(f"{key}={_fmt_log_val(val)}" for key, val in fields.items())
+
+        self.__stream.write(
+            f"{time.strftime('%Y-%m-%dT%H:%M:%S')} event={event} {pairs}\n"
+        )
+
+
+def _fmt_log_val(val) -> str:
+    if isinstance(val, float):
+        return f"{val:.2f}"
+
+    # quote strings so that values with spaces stay parseable
+    if isinstance(val, str):
+        return json.dumps(val)
+
+    return str(val)
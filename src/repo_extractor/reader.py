@@ -0,0 +1,509 @@
+"""
+Stream records out of extractor output files.
+
+Output files can grow to many gigabytes, mostly because of patch text, so
+loading one whole with json.load is slow and may not fit in memory. The
+OutputReader here yields one issue at a time instead, and can look single
+issues up through a sidecar index of their byte offsets.
+
+Two output formats are understood:
+
+    1. nested JSON, i.e. {issue number: issue data}, as written by default
+    2. JSON Lines, written when the output path ends in ".jsonl". Each
+       line is an object of {issue number: issue data} appended by one
+       flush. An issue may appear on many lines, e.g. when mined across
+       several runs; later lines update earlier ones.
+
+Either format may be gzip or xz compressed; compression is detected from
+the contents of the file and undone as the file is streamed. Offsets in
+the sidecar index are offsets into the decompressed contents, so lookups
+in compressed files must decompress up to the issue looked up.
+
+Either format may also be normalized, i.e. refer to repeated strings by
+their position in sidecar dimension tables (see dimensions.Dimensions).
+The strings are restored as issues are read.
+
+json docs:
+    https://docs.python.org/3/library/json.html#json.JSONDecoder.raw_decode
+"""
+
+import codecs
+import json
+import os
+import re
+from repo_extractor import dimensions, utils
+
+INDEX_SUFFIX = ".idx"
+
+# field groups stored as {index: item} under an issue
+_INDEXED_GROUPS = ("commits", "comments", "reviews", "review_comments", "events")
+
+_CHUNK_LEN = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def is_append_only(path: str) -> bool:
+    """
+    Check whether an output path names an append-only JSON Lines file.
+
+    Args:
+        path (str): path to output file.
+
+    Returns:
+        bool: True if output to the path is appended as JSON Lines.
+    """
+    path_root, path_ext = os.path.splitext(path)
+
+    if path_ext in utils.COMPRESSION_EXTS:
+        path_ext = os.path.splitext(path_root)[1]
+
+    return path_ext == ".jsonl"
+
+
+class OutputReader:
+    """Iterate over, and look up, issues in an extractor output file."""
+
+    def __init__(
+        self, in_path: str, denormalize: bool = True, write_index: bool = True
+    ) -> None:
+        """
+        Initialize a reader for an output file.
+
+        Args:
+            in_path (str): path to output file.
+            denormalize (bool): whether to restore the strings of a
+                normalized output; False to read issues as stored.
+            write_index (bool): whether to write the sidecar index when
+                it is built; False to only keep it in memory, e.g. to
+                leave nothing behind. An existing index is read either
+                way.
+
+        Attributes:
+            in_path (str): path to output file.
+            index_path (str): path to sidecar index of byte offsets.
+            dims_path (str): path to sidecar dimension tables, which
+                only normalized outputs have.
+        """
+        self.in_path = in_path
+        self.index_path = in_path + INDEX_SUFFIX
+        self.dims_path = dimensions.get_dims_path(in_path)
+
+        self.__denormalize = denormalize
+        self.__write_index = write_index
+        self.__index: dict = {}
+        self.__dims = None
+        self.__dims_mtime_ns: int | None = None
+
+    def __iter__(self):
+        """
+        Yield each issue in the file, in file order.
+
+        In JSON Lines files, an issue is yielded once for each line that
+        it appears on. Use get() for the fully merged data of an issue.
+
+        Yields:
+            tuple[str, dict]: issue number and issue data.
+        """
+        dims = self.__load_dims()
+
+        for key, value, _, _ in self.__iter_spans():
+            yield key, value if dims is None else dims.denormalize(value)
+
+    def iter_merged(self):
+        """
+        Yield each issue in the file once, with its fully merged data.
+
+        The file is streamed once. Issues that only appear once are
+        yielded as they are met. Issues of JSON Lines files that appear on
+        several lines are merged as their lines are met and yielded at the
+        last of them, which the sidecar index tells.
+
+        Yields:
+            tuple[str, dict]: issue number and issue data.
+        """
+        if not is_append_only(self.in_path):
+            yield from self
+            return
+
+        offsets: dict = self.load_index()["offsets"]
+        dims = self.__load_dims()
+
+        # {issue number: {"data": data merged so far}} of issues whose last
+        # line has not been met yet
+        pending: dict = {}
+
+        for key, value, offset, _ in self.__iter_spans():
+            spans = offsets[key]
+
+            if len(spans) > 1:
+                issue_data = pending.setdefault(key, {"data": {}})
+                utils.merge_dicts_recursive(issue_data, {"data": value})
+
+                if offset != spans[-1][0]:
+                    continue
+
+                value = pending.pop(key)["data"]
+
+            yield key, value if dims is None else dims.denormalize(value)
+
+    def get(self, number) -> dict | None:
+        """
+        Look up a single issue using the sidecar index.
+
+        The index is built on first use and rebuilt whenever the output
+        file has changed since it was built.
+
+        Args:
+            number (int|str): issue number to look up.
+
+        Returns:
+            dict|None: data for the issue or None if it is not in the file.
+        """
+        spans = self.load_index()["offsets"].get(str(number))
+
+        if spans is None:
+            return None
+
+        issue_data: dict = {}
+
+        compression = utils.sniff_compression(self.in_path)
+
+        with utils.open_compressed(self.in_path, "rb", compression) as file_obj:
+            for offset, length in spans:
+                file_obj.seek(offset)
+                value = json.loads(file_obj.read(length))
+
+                if is_append_only(self.in_path):
+                    value = value[str(number)]
+
+                utils.merge_dicts_recursive(issue_data, {"data": value})
+
+        dims = self.__load_dims()
+
+        if dims is not None:
+            return dims.denormalize(issue_data["data"])
+
+        return issue_data["data"]
+
+    def summarize(self) -> dict:
+        """
+        Describe what the file holds, streaming it one issue at a time.
+
+        Returns:
+            dict: "format", "compression", "size" in bytes, amount of
+            "entries" of issues and of distinct "issues", "first_issue"
+            and "last_issue" numbers, whether it is "normalized", and, for
+            each field "group" found, the amount of issues holding it and
+            of items in it.
+        """
+        offsets: dict = self.load_index()["offsets"]
+        numbers: list = [int(number) for number in offsets]
+        groups: dict = {}
+
+        for _, issue_data in self.iter_merged():
+            for key, value in issue_data.items():
+                if not isinstance(value, dict):
+                    continue
+
+                group = groups.setdefault(key, {"issues": 0, "items": 0})
+                group["issues"] += 1
+
+                if key in _INDEXED_GROUPS:
+                    group["items"] += len(value)
+
+                else:
+                    group["items"] += len(value.get("file_list", []))
+
+        return {
+            "format": "jsonl" if is_append_only(self.in_path) else "json",
+            "compression": utils.sniff_compression(self.in_path),
+            "size": os.path.getsize(self.in_path),
+            "entries": sum(len(spans) for spans in offsets.values()),
+            "issues": len(numbers),
+            "first_issue": min(numbers, default=None),
+            "last_issue": max(numbers, default=None),
+            "normalized": os.path.exists(self.dims_path),
+            "groups": groups,
+        }
+
+    def load_index(self) -> dict:
+        """
+        Read the sidecar index, building it if it is missing or stale.
+
+        An index built by this reader that could not be written is kept
+        in memory instead.
+
+        Returns:
+            dict: index with "offsets" of {issue number: [[offset, length]]}
+        """
+        stat = os.stat(self.in_path)
+
+        if _is_index_of(self.__index, stat):
+            return self.__index
+
+        try:
+            with open(self.index_path, "r", encoding="UTF-8") as index_file:
+                index = json.load(index_file)
+
+        except (OSError, json.JSONDecodeError):
+            index = {}
+
+        if not _is_index_of(index, stat):
+            index = self.build_index()
+
+        return index
+
+    def build_index(self) -> dict:
+        """
+        Scan the output file and write a sidecar index of issue offsets.
+
+        The index is only kept in memory if it is not to be written or
+        cannot be, e.g. next to an output in a read-only directory.
+
+        Returns:
+            dict: index with "offsets" of {issue number: [[offset, length]]}
+        """
+        stat = os.stat(self.in_path)
+        offsets: dict = {}
+
+        for key, _, offset, length in self.__iter_spans():
+            offsets.setdefault(key, []).append([offset, length])
+
+        index = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "offsets": offsets,
+        }
+
+        self.__index = index
+
+        if not self.__write_index:
+            return index
+
+        try:
+            with open(self.index_path, "w", encoding="UTF-8") as index_file:
+                json.dump(index, index_file)
+
+        except OSError:
+            pass
+
+        return index
+
+    def __load_dims(self) -> dimensions.Dimensions | None:
+        """
+        Get the dimension tables to restore strings with, if any.
+
+        Tables are loaded on first use and again whenever they change.
+
+        Returns:
+            dimensions.Dimensions|None: tables of a normalized output, or
+            None if the output is plain or strings are not restored.
+        """
+        if not self.__denormalize:
+            return None
+
+        try:
+            mtime_ns = os.stat(self.dims_path).st_mtime_ns
+
+        except FileNotFoundError:
+            return None
+
+        if mtime_ns != self.__dims_mtime_ns:
+            self.__dims = dimensions.Dimensions(self.dims_path)
+            self.__dims_mtime_ns = mtime_ns
+
+        return self.__dims
+
+    def __iter_spans(self):
+        """
+        Yield each issue in the file with where it lies in the file.
+
+        For nested JSON, the span covers the issue data. For JSON Lines,
+        it covers the line that the issue is on.
+
+        Yields:
+            tuple[str, dict, int, int]: issue number, issue data, byte
+            offset, and byte length.
+        """
+        compression = utils.sniff_compression(self.in_path)
+
+        try:
+            file_obj = utils.open_compressed(self.in_path, "rb", compression)
+
+        except FileNotFoundError:
+            return
+
+        with file_obj:
+            if is_append_only(self.in_path):
+                offset = 0
+
+                for line in file_obj:
+                    if line.strip():
+                        for key, value in json.loads(line).items():
+                            yield key, value, offset, len(line)
+
+                    offset += len(line)
+
+            else:
+                yield from _ObjectStream(file_obj).members()
+
+
+def _is_index_of(index: dict, stat: os.stat_result) -> bool:
+    """
+    Check whether an index was built from an output as it is now.
+
+    Args:
+        index (dict): index, as from OutputReader.build_index.
+        stat (os.stat_result): status of the output file.
+
+    Returns:
+        bool: True if the output has not changed since the index was
+        built.
+    """
+    return index.get("size") == stat.st_size and (
+        index.get("mtime_ns") == stat.st_mtime_ns
+    )
+
+
+class _ObjectStream:
+    """Incremental parser for the members of a top-level JSON object."""
+
+    def __init__(self, file_obj) -> None:
+        """
+        Initialize a parser over a binary file object.
+
+        Args:
+            file_obj (io.BufferedReader): file positioned at the object.
+        """
+        self.__file = file_obj
+        self.__text: str = ""
+        self.__pos: int = 0
+        self.__byte_offset: int = 0
+        self.__eof: bool = False
+        self.__utf8 = codecs.getincrementaldecoder("UTF-8")()
+        self.__decoder = json.JSONDecoder()
+
+    def members(self):
+        """
+        Yield each member of the object.
+
+        Raises:
+            json.JSONDecodeError: the file is not a JSON object.
+
+        Yields:
+            tuple[str, object, int, int]: member key, member value, and
+            byte offset and byte length of the value.
+        """
+        # an empty file holds no issues
+        if self.__next_char() == "":
+            return
+
+        self.__expect("{")
+
+        while True:
+            char = self.__next_char()
+
+            if char == "}":
+                return
+
+            if char == ",":
+                self.__expect(",")
+
+            key, _, _ = self.__decode()
+            self.__expect(":")
+
+            value, offset, length = self.__decode()
+
+            yield key, value, offset, length
+
+    def __next_char(self) -> str:
+        """
+        Skip whitespace and return, without consuming, the next char.
+
+        Returns:
+            str: the next non-whitespace char, or "" at end of file.
+        """
+        while True:
+            end = _WHITESPACE.match(self.__text, self.__pos).end()
+
+            # JSON whitespace is ASCII; one char is one byte
+            self.__byte_offset += end - self.__pos
+            self.__pos = end
+
+            if self.__pos < len(self.__text):
+                return self.__text[self.__pos]
+
+            if not self.__fill():
+                return ""
+
+    def __expect(self, wanted: str) -> None:
+        """
+        Consume the next non-whitespace char, which must be the given one.
+
+        Args:
+            wanted (str): char that must come next.
+
+        Raises:
+            json.JSONDecodeError: a different char comes next.
+        """
+        if self.__next_char() != wanted:
+            raise json.JSONDecodeError(f"Expecting '{wanted}'", self.__text, self.__pos)
+
+        self.__pos += 1
+        self.__byte_offset += 1
+
+    def __decode(self) -> tuple:
+        """
+        Decode the next JSON value.
+
+        Returns:
+            tuple[object, int, int]: the value, its byte offset, and its
+            byte length.
+        """
+        self.__next_char()
+
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__text, self.__pos)
+
+            except json.JSONDecodeError:
+                if not self.__fill():
+                    raise
+
+                continue
+
+            # a value that runs to the end of the text, e.g. a number, may
+            # continue past it
+            if end == len(self.__text) and self.__fill():
+                continue
+
+            offset = self.__byte_offset
+            length = len(self.__text[self.__pos : end].encode("UTF-8"))
+
+            self.__pos = end
+            self.__byte_offset += length
+
+            return value, offset, length
+
+    def __fill(self) -> bool:
+        """
+        Read more of the file into the text buffer.
+
+        Reads grow with the buffer so that large values take a
+        logarithmic, rather than linear, amount of decoding attempts.
+
+        Returns:
+            bool: False if the end of the file has been reached.
+        """
+        if self.__eof:
+            return False
+
+        # drop text that has already been parsed
+        self.__text = self.__text[self.__pos :]
+        self.__pos = 0
+
+        chunk = self.__file.read(max(_CHUNK_LEN, len(self.__text)))
+        self.__eof = not chunk
+        self.__text += self.__utf8.decode(chunk, final=self.__eof)
+
+        return not self.__eof
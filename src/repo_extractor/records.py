@@ -0,0 +1,225 @@
+"""
+Compact record types for mined data held in memory between flushes.
+
+The extractor holds everything it mines in memory until it next writes
+to its output file. Plain dicts are a costly way to do that: every item
+carries its own hash table of the same few keys, and child items such as
+comments and commits are stored under stringified indices.
+
+The records here keep one shared tuple of keys per shape of item and a
+tuple of values per item, and child items are kept in a tuple without
+indices. Records convert themselves back to the dicts the output format
+is made of only when they are written, producing the exact same JSON.
+"""
+
+import sys
+
+# every record with the same keys in the same order shares one tuple
+_shared_keys: dict = {}
+
+
+class Record:
+    """Fields mined from a single API item, in output order."""
+
+    __slots__ = ("_keys", "_vals")
+
+    def __init__(self, keys: tuple, vals: tuple) -> None:
+        """
+        Initialize a record.
+
+        Args:
+            keys (tuple): field names, in output order.
+            vals (tuple): field values, parallel to keys.
+        """
+        self._keys = _shared_keys.setdefault(keys, keys)
+        self._vals = vals
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Create a record holding the contents of a dict.
+
+        Args:
+            data (dict): {field: value} to hold.
+
+        Returns:
+            Record: new record of the calling type.
+        """
+        return cls(tuple(data), tuple(data.values()))
+
+    def get(self, key: str, default=None):
+        """
+        Return the value of a field, or a default if it is not held.
+
+        Args:
+            key (str): name of the field.
+            default (): value to return if the field is not held.
+
+        Returns:
+            value of the field or the default.
+        """
+        try:
+            return self._vals[self._keys.index(key)]
+
+        except ValueError:
+            return default
+
+    def to_dict(self) -> dict:
+        """
+        Convert the record to its output format.
+
+        Only the top level is converted; child records are converted when
+        they are themselves written or merged.
+
+        Returns:
+            dict: {field: value} in output order.
+        """
+        return dict(zip(self._keys, self._vals))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class IssueRecord(Record):
+    """Fields mined from an issue, including its child items."""
+
+    __slots__ = ()
+
+
+class CommitRecord(Record):
+    """Fields mined from a commit."""
+
+    __slots__ = ()
+
+
+class CommentRecord(Record):
+    """Fields mined from a comment."""
+
+    __slots__ = ()
+
+
+class FilesRecord(Record):
+    """Fields describing the files changed by a PR."""
+
+    __slots__ = ()
+
+
+class EventRecord(Record):
+    """Fields mined from an issue event."""
+
+    __slots__ = ()
+
+
+class ReviewRecord(Record):
+    """Fields mined from a PR review."""
+
+    __slots__ = ()
+
+
+class ReviewCommentRecord(Record):
+    """Fields mined from a PR review comment."""
+
+    __slots__ = ()
+
+
+class RecordList:
+    """Child records of an item, written as {index: record}."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: tuple) -> None:
+        """
+        Initialize a list of child records.
+
+        Args:
+            items (tuple): child records, in output order.
+        """
+        self._items = items
+
+    def to_dict(self) -> dict:
+        """
+        Convert the list to its output format.
+
+        Returns:
+            dict: {stringified index: record}
+        """
+        return {str(index): item for index, item in enumerate(self._items)}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class FileChanges:
+    """Changes that a commit made to files."""
+
+    __slots__ = (
+        "additions",
+        "deletions",
+        "changes",
+        "file_list",
+        "status",
+        "patch_text",
+    )
+
+    def __init__(
+        self,
+        additions: int,
+        deletions: int,
+        changes: int,
+        file_list: tuple,
+        status: tuple,
+        patch_text: tuple,
+    ) -> None:
+        """
+        Initialize a record of file changes.
+
+        Args:
+            additions (int): total lines added.
+            deletions (int): total lines deleted.
+            changes (int): total lines changed.
+            file_list (tuple): names of changed files.
+            status (tuple): status of each changed file.
+            patch_text (tuple): patch of each changed file.
+        """
+        self.additions = additions
+        self.deletions = deletions
+        self.changes = changes
+
+        # the same paths and statuses recur across commits
+        self.file_list = tuple(map(sys.intern, file_list))
+        self.status = tuple(map(sys.intern, status))
+        self.patch_text = patch_text
+
+    def to_dict(self) -> dict:
+        """
+        Convert the record to its output format.
+
+        Returns:
+            dict: {field: value} in output order.
+        """
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+RECORD_TYPES = (Record, RecordList, FileChanges)
+
+
+def to_output(obj):
+    """
+    Convert a record to its output format.
+
+    Meant to be passed as the "default" argument of json.dump so that
+    records are written exactly as the dicts they stand in for.
+
+    Args:
+        obj (): object that json cannot serialize by itself.
+
+    Raises:
+        TypeError: the object is not a record.
+
+    Returns:
+        dict: output format of the record.
+    """
+    if isinstance(obj, RECORD_TYPES):
+        return obj.to_dict()
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -34,9 +34,16 @@ Resources:
         https://betterprogramming.pub/dispatch-tables-in-python-d37bcc443b0b
 """
 
+import datetime
+import sys
+from repo_extractor import records
+
 # 0000-00-00T00:00:00Z
 TIME_FMT = "%Y-%m-%dT%H:%M:%SZ"
 
+# 0000-00-00, as dates bounding searches are configured
+DATE_FMT = "%Y-%m-%d"
+
 
 def _get_body(api_obj) -> str:
     return api_obj.body
@@ -54,7 +61,7 @@ def _get_commit_date(commit_obj) -> str:
     return commit_obj.commit.author.date.strftime(TIME_FMT)
 
 
-def _get_commit_files(commit_obj) -> dict:
+def _get_commit_files(commit_obj) -> records.FileChanges:
     """
     For the list of files modified by a commit, return a list of qualities.
 
@@ -68,7 +75,7 @@ def _get_commit_files(commit_obj) -> dict:
         commit_obj (github.Commit): commit to get file change data from
 
     Returns:
-        dict: dict of data about file changes made by the given PR
+        records.FileChanges: data about file changes made by the given PR
     """
     file_list = commit_obj.files
 
@@ -87,14 +94,18 @@ def _get_commit_files(commit_obj) -> dict:
         commit_changes += int(file.changes)
         commit_deletions += int(file.deletions)
 
-    return {
-        "additions": commit_adds,
-        "deletions": commit_deletions,
-        "changes": commit_changes,
-        "file_list": commit_files,
-        "status": commit_statuses,
-        "patch_text": commit_patches,
-    }
+    return records.FileChanges(
+        additions=commit_adds,
+        deletions=commit_deletions,
+        changes=commit_changes,
+        file_list=tuple(commit_files),
+        status=tuple(commit_statuses),
+        patch_text=tuple(commit_patches),
+    )
+
+
+def _get_commit_id(api_obj) -> str:
+    return api_obj.commit_id
 
 
 def _get_commit_msg(commit_obj) -> str:
@@ -134,12 +145,107 @@ def _get_created_time(issue) -> str:
     return issue.created_at.strftime(TIME_FMT)
 
 
+def _get_diff_hunk(review_comment) -> str:
+    return review_comment.diff_hunk
+
+
+def _get_event_actor_id(event) -> str | None:
+    return _intern(str(event.actor.id)) if event.actor is not None else None
+
+
+def _get_event_actor_login(event) -> str | None:
+    return _intern(event.actor.login) if event.actor is not None else None
+
+
+def _get_event_assignee(event) -> str | None:
+    return _intern(event.assignee.login) if event.assignee is not None else None
+
+
+def _get_event_label(event) -> str | None:
+    return _intern(event.label.name) if event.label is not None else None
+
+
+def _get_event_milestone(event) -> str | None:
+    return event.milestone.title if event.milestone is not None else None
+
+
+def _get_event_rename(event) -> dict | None:
+    return event.rename
+
+
+def _get_event_reviewer(event) -> str | None:
+    if event.requested_reviewer is not None:
+        return _intern(event.requested_reviewer.login)
+
+    return None
+
+
+def _get_event_type(event) -> str:
+    return event.event
+
+
+def _get_in_reply_to(review_comment) -> int | None:
+    return review_comment.in_reply_to_id
+
+
 def _get_issue_comments_quant(issue_obj):
     return issue_obj.comments
 
 
 def __get_nameduser_name(api_obj_nameduser):
-    return api_obj_nameduser.name
+    return _intern(api_obj_nameduser.name)
+
+
+def _get_path(review_comment) -> str:
+    return _intern(review_comment.path)
+
+
+def _get_pr_additions(pull_files) -> int:
+    return pull_files.pr_obj.additions
+
+
+def _get_pr_changes(pull_files) -> int:
+    return pull_files.pr_obj.additions + pull_files.pr_obj.deletions
+
+
+def _get_pr_deletions(pull_files) -> int:
+    return pull_files.pr_obj.deletions
+
+
+def _get_pr_file_list(pull_files) -> tuple:
+    return pull_files.file_changes.file_list
+
+
+def _get_pr_patch_text(pull_files) -> tuple:
+    return pull_files.file_changes.patch_text
+
+
+def _get_pr_status(pull_files) -> tuple:
+    return pull_files.file_changes.status
+
+
+def _get_review_id(review_comment) -> int | None:
+    return review_comment.pull_request_review_id
+
+
+def _get_review_state(review) -> str:
+    return review.state
+
+
+def _get_submitted_time(review) -> str:
+    """
+    Get the datetime a review was submitted at, if submitted.
+
+    Args:
+        review (Github.PullRequestReview): review to get submitted time of
+
+    Returns:
+        str: datetime string of review submission or "NaN" if pending
+    """
+    if review.submitted_at is not None:
+        return review.submitted_at.strftime(TIME_FMT)
+
+    return "NaN"
 
 
 def _get_title(api_obj) -> str:
@@ -147,11 +253,27 @@ def _get_title(api_obj) -> str:
 
 
 def _get_userid(api_obj) -> str:
-    return str(api_obj.user.id)
+    return _intern(str(api_obj.user.id))
 
 
 def _get_userlogin(api_obj) -> str:
-    return api_obj.user.login
+    return _intern(api_obj.user.login)
+
+
+def _intern(string: str | None) -> str | None:
+    """
+    Keep a single copy of a string that recurs across items.
+
+    Logins, names, and paths repeat across the items mined between
+    flushes; interning them stores each once rather than once per item.
+
+    Args:
+        string (str|None): string to intern.
+
+    Returns:
+        str|None: the interned string, or None if given None.
+    """
+    return sys.intern(string) if string is not None else None
 
 
 # Initialize map of strings to function references; a
@@ -178,6 +300,47 @@ cmd_tbl: dict = {
         "message": _get_commit_msg,
         "sha": _get_commit_sha,
     },
+    # getters of PR-level file changes take a diff.PullFiles. Totals come
+    # from the PR payload; the rest costs one request per PR
+    "files": {
+        "additions": _get_pr_additions,
+        "deletions": _get_pr_deletions,
+        "changes": _get_pr_changes,
+        "file_list": _get_pr_file_list,
+        "status": _get_pr_status,
+        "patch_text": _get_pr_patch_text,
+    },
+    "review_comments": {
+        "body": _get_body,
+        "commit_id": _get_commit_id,
+        "created_at": _get_created_time,
+        "diff_hunk": _get_diff_hunk,
+        "in_reply_to": _get_in_reply_to,
+        "path": _get_path,
+        "review_id": _get_review_id,
+        "userid": _get_userid,
+        "userlogin": _get_userlogin,
+    },
+    "reviews": {
+        "body": _get_body,
+        "commit_id": _get_commit_id,
+        "state": _get_review_state,
+        "submitted_at": _get_submitted_time,
+        "userid": _get_userid,
+        "userlogin": _get_userlogin,
+    },
+    "events": {
+        "actor_id": _get_event_actor_id,
+        "actor_login": _get_event_actor_login,
+        "assignee": _get_event_assignee,
+        "commit_id": _get_commit_id,
+        "created_at": _get_created_time,
+        "event": _get_event_type,
+        "label": _get_event_label,
+        "milestone": _get_event_milestone,
+        "rename": _get_event_rename,
+        "requested_reviewer": _get_event_reviewer,
+    },
     "issues": {
         "body": _get_body,
         "closed_at": _get_closed_time,
@@ -193,6 +356,18 @@ cmd_tbl: dict = {
 _str_type = {"type": "string"}
 
 
+def _check_date(field: str, value: str | None, error) -> None:
+    """Check that a configured date is a real day, e.g. not 2020-13-45."""
+    if value is None:
+        return
+
+    try:
+        datetime.datetime.strptime(value, DATE_FMT)
+
+    except ValueError:
+        error(field, "must be a real date as YYYY-MM-DD")
+
+
 # TODO: expand comment explaining this.
 # Create dictionary out of each dict in the command
 # table which discusses what types of fields are
@@ -203,6 +378,7 @@ _str_type = {"type": "string"}
 issues_fields_schema = {
     key: {
         "allowed": [*_],
+        "default": [],
         "schema": _str_type,
         "type": "list",
     }
@@ -216,6 +392,11 @@ cfg_schema: dict = {
     "auth_path": _str_type,
     "repo": _str_type,
     "output_path": _str_type,
+    "compression": {
+        **_str_type,
+        "allowed": ["auto", "none", "gzip", "xz"],
+        "default": "auto",
+    },
     **issues_fields_schema,
     "state": {**_str_type, "allowed": ["open", "closed", "all"]},
     "labels": {
@@ -229,4 +410,31 @@ cfg_schema: dict = {
         "schema": {"type": "integer"},
         "type": "list",
     },
+    "cache_path": {**_str_type, "default": None, "nullable": True},
+    "cache_size_mb": {"default": 1024, "min": 1, "type": "integer"},
+    "max_requests": {"default": None, "min": 1, "nullable": True, "type": "integer"},
+    "deadline_mins": {"default": None, "min": 0, "nullable": True, "type": "number"},
+    "max_concurrency": {"default": 8, "max": 100, "min": 1, "type": "integer"},
+    "webhook_secret_path": {"default": None, "nullable": True, "type": "string"},
+    "normalize": {"default": False, "type": "boolean"},
+    "search_query": {"default": None, "nullable": True, "type": "string"},
+    "search_date_field": {
+        **_str_type,
+        "allowed": ["created", "updated", "closed", "merged"],
+        "default": "created",
+    },
+    "search_since": {
+        "check_with": _check_date,
+        "default": None,
+        "nullable": True,
+        "regex": r"\d{4}-\d\d-\d\d",
+        "type": "string",
+    },
+    "search_until": {
+        "check_with": _check_date,
+        "default": None,
+        "nullable": True,
+        "regex": r"\d{4}-\d\d-\d\d",
+        "type": "string",
+    },
 }
@@ -0,0 +1,316 @@
+"""
+Adaptive limit on the amount of requests in flight to the GitHub API.
+
+GitHub's secondary rate limits punish bursts of concurrent requests with
+403 or 429 responses and a "Retry-After" header. The level of concurrency
+that trips them is not published and varies by endpoint and token, so a
+fixed amount of workers is either slower than the API allows or throttled.
+
+The limiter here finds the level by itself, the way TCP finds the
+capacity of a link, by additive increase and multiplicative decrease:
+
+    - a request that completes while the window of requests allowed in
+      flight is full grows the window by 1/window, i.e. by one for each
+      window's worth of such requests
+    - a secondary rate limit, or a response much slower than usual, halves
+      the window at once. Requests already in flight when the window was
+      halved do not halve it again
+
+Requests are metered by wrapping the methods of a PyGithub Requester
+that send requests and hand back their raw status, i.e. requestJson,
+requestMultipart, and requestBlob, which the other request methods that
+the extractor uses, e.g. requestJsonAndCheck, send requests through.
+Streamed downloads and in-memory uploads are not metered; the extractor
+makes neither. When a secondary rate limit is hit, no requests are sent
+until it lifts, and the throttled request is then retried, so that
+callers only see such limits if they persist.
+
+Resources:
+
+    • secondary rate limits:
+        https://docs.github.com/en/rest/using-the-rest-api/rate-limits-for-the-rest-api#about-secondary-rate-limits
+
+    • handling rate limit errors:
+        https://docs.github.com/en/rest/using-the-rest-api/best-practices-for-using-the-rest-api#handle-rate-limit-errors-appropriately
+"""
+
+import functools
+import threading
+import time
+
+# statuses GitHub answers requests over a rate limit with
+_THROTTLE_STATUSES = (403, 429)
+
+# seconds GitHub asks to wait after a secondary rate limit that gives no
+# "Retry-After" header
+_DEFAULT_RETRY_AFTER_SECS = 60
+
+# methods of github.Requester.Requester that send a request and return
+# its (status, headers, body)
+_REQUEST_METHODS: tuple = ("requestJson", "requestMultipart", "requestBlob")
+
+# times a request is retried after secondary rate limits before its
+# response is handed back as it is
+_MAX_THROTTLED_RETRIES = 5
+
+# fraction of the window kept after congestion
+_DECREASE_FACTOR = 0.5
+
+# a response is a latency spike if it is both this many times slower than
+# the average and slower than _MIN_SPIKE_SECS; the floor keeps jitter in
+# fast responses from counting
+_SPIKE_RATIO = 3.0
+_MIN_SPIKE_SECS = 1.0
+
+# weight of each new response in the moving average of latency
+_LATENCY_WEIGHT = 0.1
+
+
+class AimdLimiter:
+    """Limit requests in flight, adapting the limit to how the API copes."""
+
+    def __init__(self, max_limit: int) -> None:
+        """
+        Initialize a limiter allowing one request in flight at first.
+
+        Args:
+            max_limit (int): most requests ever allowed in flight.
+
+        Attributes:
+            max_limit (int): most requests ever allowed in flight.
+            limit (float): size of the window; int(limit) requests are
+                allowed in flight.
+            requests (int): requests sent so far, including retries.
+            throttled (int): responses that were secondary rate limits.
+            latency_spikes (int): responses much slower than usual.
+            increases (int): times the window grew by a whole request.
+            decreases (int): times the window was cut.
+            peak_in_flight (int): most requests in flight at once so far.
+        """
+        self.max_limit = max_limit
+        self.limit: float = 1.0
+
+        self.requests: int = 0
+        self.throttled: int = 0
+        self.latency_spikes: int = 0
+        self.increases: int = 0
+        self.decreases: int = 0
+        self.peak_in_flight: int = 0
+
+        self.__in_flight: int = 0
+        self.__latency: float | None = None
+        self.__last_decrease: float = 0.0
+        self.__hold_until: float = 0.0
+        self.__cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """
+        Wait until a request may be sent, and count it as in flight.
+
+        Returns:
+            float: time the request was let through, to give to release.
+        """
+        with self.__cond:
+            while True:
+                hold_secs = self.__hold_until - time.monotonic()
+
+                if hold_secs > 0:
+                    self.__cond.wait(hold_secs)
+
+                elif self.__in_flight >= int(self.limit):
+                    self.__cond.wait()
+
+                else:
+                    break
+
+            self.__in_flight += 1
+            self.requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.__in_flight)
+
+        return time.monotonic()
+
+    def release(
+        self,
+        started: float,
+        throttle_secs: float | None = None,
+        failed: bool = False,
+    ) -> None:
+        """
+        Count a request as no longer in flight, adapting the window.
+
+        Args:
+            started (float): time the request was let through, as from
+                acquire.
+            throttle_secs (float|None): seconds the API asked to wait if
+                it answered with a secondary rate limit, else None.
+            failed (bool): whether the request got no response at all,
+                e.g. on a dropped connection. Says nothing of congestion,
+                so it leaves the window as it is.
+        """
+        now = time.monotonic()
+        latency = now - started
+
+        with self.__cond:
+            window_full = self.__in_flight >= int(self.limit)
+            self.__in_flight -= 1
+
+            if failed:
+                pass
+
+            elif throttle_secs is not None:
+                self.throttled += 1
+                self.__hold_until = max(self.__hold_until, now + throttle_secs)
+                self.__decrease(started)
+
+            else:
+                if self.__is_spike(latency):
+                    self.latency_spikes += 1
+                    self.__decrease(started)
+
+                # only grow a window that is in use; a caller sending one
+                # request at a time says nothing about how many the API
+                # would take at once
+                elif window_full and self.limit < self.max_limit:
+                    prev_limit = int(self.limit)
+                    self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+                    self.increases += int(self.limit) - prev_limit
+
+                if self.__latency is None:
+                    self.__latency = latency
+
+                else:
+                    self.__latency += _LATENCY_WEIGHT * (latency - self.__latency)
+
+            self.__cond.notify_all()
+
+    def metrics(self) -> dict:
+        """
+        Get the state of the limiter and the decisions it has made.
+
+        Returns:
+            dict: window size, requests in flight, and counts of requests,
+            throttles, latency spikes, increases, and decreases.
+        """
+        with self.__cond:
+            return {
+                "window": int(self.limit),
+                "max_window": self.max_limit,
+                "in_flight": self.__in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "latency_spikes": self.latency_spikes,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "latency_ms": (
+                    None if self.__latency is None else self.__latency * 1000
+                ),
+            }
+
+    def __is_spike(self, latency: float) -> bool:
+        """Check whether a latency is much worse than the average so far."""
+        if self.__latency is None:
+            return False
+
+        return latency > max(_SPIKE_RATIO * self.__latency, _MIN_SPIKE_SECS)
+
+    def __decrease(self, started: float) -> None:
+        """
+        Cut the window for congestion seen by a request.
+
+        Args:
+            started (float): time the request was let through.
+        """
+        # the window was already cut while this request was in flight,
+        # likely for the same congestion
+        if started < self.__last_decrease:
+            return
+
+        self.limit = max(1.0, self.limit * _DECREASE_FACTOR)
+        self.decreases += 1
+        self.__last_decrease = time.monotonic()
+
+
+def install_limiter(requester, limiter: AimdLimiter) -> None:
+    """
+    Send all requests of a PyGithub Requester through a limiter.
+
+    Args:
+        requester (github.Requester.Requester): requester to meter, e.g.
+            that of a session.
+        limiter (AimdLimiter): limiter to send requests through.
+    """
+    for name in _REQUEST_METHODS:
+        setattr(requester, name, _metered(getattr(requester, name), limiter))
+
+
+def _metered(send, limiter: AimdLimiter):
+    """
+    Wrap a request method of a Requester so that it goes through a limiter.
+
+    Args:
+        send (callable): bound request method returning (status, headers,
+            body), as in _REQUEST_METHODS.
+        limiter (AimdLimiter): limiter to send requests through.
+
+    Returns:
+        callable: method with the same signature, retrying requests that
+        hit a secondary rate limit.
+    """
+
+    @functools.wraps(send)
+    def send_metered(*args, **kwargs) -> tuple:
+        for _ in range(_MAX_THROTTLED_RETRIES + 1):
+            started = limiter.acquire()
+
+            try:
+                status, headers, body = send(*args, **kwargs)
+
+            except BaseException:
+                limiter.release(started, failed=True)
+                raise
+
+            throttle_secs = _get_throttle_secs(status, headers, body)
+            limiter.release(started, throttle_secs)
+
+            if throttle_secs is None:
+                break
+
+        return status, headers, body
+
+    return send_metered
+
+
+def _get_throttle_secs(status: int, headers: dict, body: str) -> float | None:
+    """
+    Tell whether a response is a secondary rate limit, and for how long.
+
+    Responses over the primary rate limit are not; the extractor sleeps
+    until the rate limit window resets for those.
+
+    Args:
+        status (int): status of the response.
+        headers (dict): headers of the response, with lowercase names.
+        body (str): body of the response.
+
+    Returns:
+        float|None: seconds to wait before sending more requests, or None
+        if the response is not a secondary rate limit.
+    """
+    if status not in _THROTTLE_STATUSES:
+        return None
+
+    if headers.get("x-ratelimit-remaining") == "0":
+        return None
+
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+
+        except ValueError:
+            return _DEFAULT_RETRY_AFTER_SECS
+
+    if "secondary rate limit" in body.lower():
+        return _DEFAULT_RETRY_AFTER_SECS
+
+    return None
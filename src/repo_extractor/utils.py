@@ -3,40 +3,97 @@ Common utilites for the repository extractor.
 
 Includes:
     - dictionary handling
-    - file io
+    - file io, including transparently compressed files
 
 json docs:
     https://docs.python.org/3/library/json.html
+
+gzip and lzma docs:
+    https://docs.python.org/3/library/gzip.html
+    https://docs.python.org/3/library/lzma.html
 """
 
+import gzip
 import json
 from json.decoder import JSONDecodeError
+import lzma
 import os
 import sys
+from repo_extractor import records
+
+# file extensions and leading "magic" bytes of each compression format
+COMPRESSION_EXTS: dict = {".gz": "gzip", ".xz": "xz"}
+_COMPRESSION_MAGIC: dict = {b"\x1f\x8b": "gzip", b"\xfd7zXZ\x00": "xz"}
 
 
-def write_merged_dict_to_jsonfile(out_dict: dict, out_path: str) -> None:
+def get_compression(path: str, compression: str = "auto") -> str:
+    """
+    Resolve which compression format to write a file with.
+
+    Args:
+        path (str): path to the file.
+        compression (str): "none", "gzip", "xz", or "auto" to choose by
+            the extension of the path.
+
+    Returns:
+        str: "none", "gzip", or "xz".
     """
-    Recursively merge dictionaries and write them to an output JSON file.
+    if compression != "auto":
+        return compression
 
-    Get the desired output path, open and read any JSON data that may
-    already be there, and recursively merge in param data from the
-    most recent round of API calls.
+    return COMPRESSION_EXTS.get(os.path.splitext(path)[1], "none")
+
+
+def sniff_compression(path: str) -> str:
+    """
+    Detect the compression format of an existing file by its contents.
 
     Args:
-        out_dict (dict): dict of data from round of API calls
-            to merge and write.
-        out_path (str): path to output file.
+        path (str): path to the file.
+
+    Returns:
+        str: "none", "gzip", or "xz". Missing and empty files are "none".
     """
-    # attempt to read JSON out of output file. Will return
-    # empty dict if no valid json is found
-    json_dict = read_jsonfile_into_dict(out_path)
+    try:
+        with open(path, "rb") as file_obj:
+            head = file_obj.read(6)
 
-    # recursively merge all dicts and nested dicts in both dictionaries
-    _merge_dicts_recursive(json_dict, out_dict)
+    except FileNotFoundError:
+        return "none"
+
+    for magic, compression in _COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+
+    return "none"
+
+
+def open_compressed(path: str, mode: str, compression: str):
+    """
+    Open a file, compressing or decompressing its contents as a stream.
+
+    Data is compressed and decompressed as it is written and read, so a
+    whole compressed file is never held in memory. Appending to gzip and
+    xz files adds a new compressed member, which readers handle
+    transparently.
+
+    Args:
+        path (str): path to the file.
+        mode (str): mode to open the file in, as for open().
+        compression (str): "none", "gzip", or "xz".
+
+    Returns:
+        file object for the path.
+    """
+    encoding = None if "b" in mode else "UTF-8"
 
-    # write JSON content back to file
-    _write_dict_to_jsonfile(json_dict, out_path)
+    if compression == "gzip":
+        return gzip.open(path, mode, compresslevel=6, encoding=encoding)
+
+    if compression == "xz":
+        return lzma.open(path, mode, encoding=encoding)
+
+    return open(path, mode, encoding=encoding)
 
 
 def read_jsonfile_into_dict(in_path: str) -> dict:
@@ -65,7 +122,7 @@ def read_jsonfile_into_dict(in_path: str) -> dict:
     return json_dict
 
 
-def _merge_dicts_recursive(base_dict: dict, add_dict: dict) -> None:
+def merge_dicts_recursive(base_dict: dict, add_dict: dict) -> None:
     """
     Recursively merge two dictionaries.
 
@@ -73,48 +130,43 @@ def _merge_dicts_recursive(base_dict: dict, add_dict: dict) -> None:
         Credit to Paul Durivage
             https://gist.github.com/angstwad/bf22d1822c38a92ec0a9
 
+    Records from the records module are merged as the dicts that they
+    stand in for, but are only converted to dicts when there is something
+    to merge them with.
+
     Args:
         base_dict (dict): dict to be merged into
         add_dict (dict): dict of data to be merged
     """
     # for each key in the dict that we created with the round of API calls
-    for key in add_dict:
+    for key, add_val in add_dict.items():
+        if (
+            key in base_dict
+            and isinstance(base_dict[key], records.RECORD_TYPES)
+            and isinstance(add_val, (dict, *records.RECORD_TYPES))
+        ):
+            base_dict[key] = base_dict[key].to_dict()
+
+        if (
+            key in base_dict
+            and isinstance(base_dict[key], dict)
+            and isinstance(add_val, records.RECORD_TYPES)
+        ):
+            add_val = add_val.to_dict()
 
         # if that key is in the dict in the existing JSON file and the val at
         # the key is a dict in both dictionaries
         if (
             key in base_dict
             and isinstance(base_dict[key], dict)
-            and isinstance(add_dict[key], dict)
+            and isinstance(add_val, dict)
         ):
-            _merge_dicts_recursive(base_dict[key], add_dict[key])
+            merge_dicts_recursive(base_dict[key], add_val)
 
         else:
             # assign the new value from the last round of calls to the existing
             # key
-            base_dict[key] = add_dict[key]
-
-
-def _write_dict_to_jsonfile(out_dict: dict, out_path: str) -> None:
-    """
-    Ensure output file exists and write Python dictionary to it as JSON.
-
-    Args:
-        out_dict (dict): dictionary to write as JSON.
-        out_path (str): path to write output to.
-
-    Raises:
-        FileNotFoundError: no file found at given path.
-    """
-    mk_json_outpath(out_path)
-
-    try:
-        with open(out_path, "w", encoding="UTF-8") as json_outfile:
-            json.dump(out_dict, json_outfile, ensure_ascii=False, indent=2)
-
-    except FileNotFoundError:
-        print(f"\nFile at {out_path} not found!")
-        sys.exit(1)
+            base_dict[key] = add_val
 
 
 def mk_json_outpath(out_path: str):
@@ -136,8 +188,10 @@ def mk_json_outpath(out_path: str):
     Returns:
         str: path to output file
     """
-    # ensures that path exists, no exception handling required
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    # ensures that path exists, no exception handling required. A bare
+    # file name has no directory to create
+    if os.path.dirname(out_path):
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
 
     # Using open() instead of mknode() allows this program to be portable;
     # mknode appears to be *nix specific. We can use "x" mode to ensure that
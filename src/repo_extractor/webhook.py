@@ -0,0 +1,400 @@
+"""
+Keep an output up to date from GitHub webhook deliveries.
+
+Re-mining a range to pick up changes spends requests on issues that did
+not change and leaves the output stale between runs. For repositories
+tracked continuously, GitHub can instead deliver an event to a receiver
+whenever an issue, PR, comment, or branch changes. The receiver here
+listens for such deliveries over HTTP and merges the issues they touch
+into the configured output, much as a run would.
+
+Objects in deliveries have the shape of their REST API counterparts, so
+they are turned into PyGithub objects and mined with the getters of
+schema.cmd_tbl. Requests are only made for what a delivery does not
+carry:
+
+    - issues: the "issues" fields of the issue. No requests
+    - issue_comment: the "issues" fields of the issue and its comments,
+      mined again. A delivery only tells the comment's id, not its index
+      among the comments of the issue, which shifts when earlier ones are
+      deleted
+    - pull_request: the "issues" fields and PR data of the PR. If the PR
+      was opened, reopened, or pushed to, its "commits" and "files" are
+      mined again
+    - push: the pushed commits, mined into the commit cache, if there is
+      one, so that the PRs holding them cost no commit requests
+
+Other events, and deliveries for other repositories or for issues out of
+the configured range, are acknowledged and ignored. Like runs, deliveries
+only ever merge into the output: data deleted on GitHub, e.g. a deleted
+comment, is not removed from it.
+
+Deliveries are verified against the webhook's secret, if one is
+configured, and answered at once; they are mined in the background, and
+everything mined from the deliveries waiting at the time is written to
+the output in one flush. Append-only (".jsonl") outputs are best suited,
+as each flush to them is an append rather than a rewrite.
+
+Deliveries may be recorded to a JSON Lines file as they are received and
+replayed from it later, without listening, e.g. to test changes locally.
+
+Resources:
+
+    • webhook events and payloads:
+        https://docs.github.com/en/webhooks/webhook-events-and-payloads
+
+    • validating deliveries:
+        https://docs.github.com/en/webhooks/using-webhooks/validating-webhook-deliveries
+"""
+
+import hashlib
+import hmac
+import http.server
+import json
+import queue
+import socket
+import threading
+import traceback
+import github
+from repo_extractor import extractor, utils, writer
+
+SUPPORTED_EVENTS: tuple = ("issues", "issue_comment", "pull_request", "push")
+
+EVENT_HEADER = "X-GitHub-Event"
+DELIVERY_HEADER = "X-GitHub-Delivery"
+SIGNATURE_HEADER = "X-Hub-Signature-256"
+
+# actions of pull_request events after which a PR's commits and files
+# may have changed
+_PR_CONTENT_ACTIONS = ("opened", "reopened", "synchronize")
+
+# most deliveries mined between flushes to the output
+_MAX_BATCH_LEN = 100
+
+# seconds between checks for interrupts while waiting for deliveries
+_POLL_SECS = 1.0
+
+
+def verify_signature(secret: bytes, body: bytes, signature: str | None) -> bool:
+    """
+    Check that a delivery was signed with the webhook's secret.
+
+    Args:
+        secret (bytes): secret of the webhook.
+        body (bytes): body of the delivery, as received.
+        signature (str|None): value of its X-Hub-Signature-256 header.
+
+    Returns:
+        bool: True if the signature matches the body.
+    """
+    if signature is None:
+        return False
+
+    expected = "sha256=" + hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+    return hmac.compare_digest(expected, signature)
+
+
+class DeliveryHandler:
+    """Mine webhook deliveries and merge them into the output."""
+
+    def __init__(self, gh_ext: extractor.Extractor) -> None:
+        """
+        Initialize a handler of deliveries.
+
+        Args:
+            gh_ext (extractor.Extractor): extractor to mine with, made
+                without mining its range.
+
+        Attributes:
+            gh_ext (extractor.Extractor): extractor to mine with.
+        """
+        self.gh_ext = gh_ext
+
+        self.__repo: str = gh_ext.cfg.get_cfg_val("repo").lower()
+        self.__range: list = gh_ext.cfg.get_cfg_val("range")
+
+    def handle(self, event: str, payload: dict) -> dict:
+        """
+        Mine the issue touched by a delivery.
+
+        Args:
+            event (str): name of the event, from its X-GitHub-Event header.
+            payload (dict): body of the delivery.
+
+        Returns:
+            dict: {issue number: issue data} to merge into the output;
+            empty if the delivery touches no issue that is mined.
+        """
+        repo = payload.get("repository", {}).get("full_name", "")
+
+        if event not in SUPPORTED_EVENTS or repo.lower() != self.__repo:
+            return {}
+
+        if event == "push":
+            self.__handle_push(payload)
+            return {}
+
+        issue_raw: dict = payload.get(
+            "pull_request" if event == "pull_request" else "issue", {}
+        )
+
+        if not self.__is_in_range(issue_raw.get("number", 0)):
+            return {}
+
+        session = self.gh_ext.gh_sesh.session
+
+        # a PR has the fields of an issue that the "issues" getters use
+        issue = session.create_from_raw_data(github.Issue.Issue, issue_raw)
+
+        if event == "issues":
+            issue_data = self.gh_ext.get_issue_groups(issue, ["issues"])
+
+        elif event == "issue_comment":
+            issue_data = self.gh_ext.get_issue_groups(issue, ["issues", "comments"])
+
+        else:
+            groups = ["issues"]
+
+            if payload.get("action") in _PR_CONTENT_ACTIONS:
+                groups += ["commits", "files"]
+
+            issue_data = self.gh_ext.get_issue_groups(
+                issue,
+                groups,
+                session.create_from_raw_data(github.PullRequest.PullRequest, issue_raw),
+            )
+
+        return {str(issue.number): issue_data}
+
+    def __handle_push(self, payload: dict) -> None:
+        """
+        Mine the commits of a push into the commit cache.
+
+        Args:
+            payload (dict): body of the delivery.
+        """
+        # commits already on another branch were mined, or will be, there
+        shas: list = [
+            commit["id"]
+            for commit in payload.get("commits", [])
+            if commit.get("distinct", True)
+        ]
+
+        self.gh_ext.cache_commits(shas)
+
+    def __is_in_range(self, number: int) -> bool:
+        """Check whether an issue number is in the configured range."""
+        return number >= self.__range[0] and (
+            self.__range[-1] == -1 or number <= self.__range[-1]
+        )
+
+
+def serve(
+    handler: DeliveryHandler,
+    address: tuple,
+    secret: bytes | None = None,
+    record_path: str | None = None,
+) -> None:
+    """
+    Receive deliveries over HTTP until interrupted, mining each of them.
+
+    Args:
+        handler (DeliveryHandler): handler to mine deliveries with.
+        address (tuple): (host, port) to listen on.
+        secret (bytes|None): secret of the webhook, to verify deliveries
+            with; None to accept them unverified.
+        record_path (str|None): path to a JSON Lines file to append each
+            accepted delivery to, to replay later.
+    """
+    deliveries: queue.Queue = queue.Queue()
+
+    class _RequestHandler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            if secret is not None and not verify_signature(
+                secret, body, self.headers.get(SIGNATURE_HEADER)
+            ):
+                self.send_error(401, "Bad signature")
+                return
+
+            try:
+                delivery = {
+                    "event": self.headers.get(EVENT_HEADER, ""),
+                    "delivery": self.headers.get(DELIVERY_HEADER, ""),
+                    "payload": json.loads(body),
+                }
+
+            except json.JSONDecodeError:
+                self.send_error(400, "Body is not JSON")
+                return
+
+            if not isinstance(delivery["payload"], dict):
+                self.send_error(400, "Body is not a JSON object")
+                return
+
+            if record_path is not None:
+                _record_delivery(record_path, delivery)
+
+            deliveries.put(delivery)
+
+            self.send_response(202)
+            self.end_headers()
+
+        def log_message(self, format: str, *args) -> None:
+            return
+
+    server = http.server.HTTPServer(address, _RequestHandler)
+    listener = threading.Thread(target=server.serve_forever, daemon=True)
+    listener.start()
+
+    print(f"{extractor.TAB}Listening for deliveries on {address[0]}:{address[1]}...")
+
+    # deliveries are mined here rather than by the listener, as the
+    # commit cache may only be used by the thread that opened it
+    try:
+        _mine_deliveries(handler, deliveries)
+
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def replay(handler: DeliveryHandler, record_path: str) -> int:
+    """
+    Mine deliveries recorded by serve, in the order they were received.
+
+    Args:
+        handler (DeliveryHandler): handler to mine deliveries with.
+        record_path (str): path to JSON Lines file of recorded deliveries.
+
+    Returns:
+        int: amount of deliveries handled.
+    """
+    deliveries: queue.Queue = queue.Queue()
+
+    with utils.open_compressed(
+        record_path, "rt", utils.sniff_compression(record_path)
+    ) as record_file:
+        for line in record_file:
+            if line.strip():
+                deliveries.put(json.loads(line))
+
+    deliveries.put(None)
+
+    return _mine_deliveries(handler, deliveries)
+
+
+def _mine_deliveries(handler: DeliveryHandler, deliveries: queue.Queue) -> int:
+    """
+    Mine deliveries as they are queued, flushing after each batch.
+
+    API and connection errors in mining a delivery are reported and the
+    delivery skipped, so that one bad delivery does not stop the
+    receiver. Mining stops at a None in the queue, when interrupted, or
+    on any other error; what was mined of the batch at hand is written
+    either way.
+
+    Args:
+        handler (DeliveryHandler): handler to mine deliveries with.
+        deliveries (queue.Queue): queue of recorded deliveries.
+
+    Returns:
+        int: amount of deliveries handled.
+    """
+    output_file: str = handler.gh_ext.cfg.get_cfg_val("output_path")
+    compression: str = handler.gh_ext.cfg.get_cfg_val("compression")
+    normalize: bool = handler.gh_ext.cfg.get_cfg_val("normalize")
+
+    handled: int = 0
+    done = False
+
+    while not done:
+        out_data: dict = {}
+
+        try:
+            batch: list = [_wait_for_delivery(deliveries)]
+
+            while len(batch) < _MAX_BATCH_LEN and not deliveries.empty():
+                batch.append(deliveries.get())
+
+            for delivery in batch:
+                if delivery is None:
+                    done = True
+                    break
+
+                try:
+                    issue_data = handler.handle(delivery["event"], delivery["payload"])
+
+                except (github.GithubException, socket.error):
+                    print(
+                        f"{extractor.TAB}Skipping delivery {delivery['delivery']} "
+                        f"({delivery['event']}):"
+                    )
+                    traceback.print_exc()
+
+                except Exception:
+                    print(
+                        f"{extractor.TAB}Stopped at delivery {delivery['delivery']} "
+                        f"({delivery['event']}):"
+                    )
+                    raise
+
+                else:
+                    utils.merge_dicts_recursive(out_data, issue_data)
+
+                handled += 1
+
+        except KeyboardInterrupt:
+            print(f"\n{extractor.TAB}Interrupted! Writing what was mined...")
+            done = True
+
+        # deliveries mined before an unexpected error are written before
+        # it is raised, rather than lost with it
+        finally:
+            if out_data:
+                writer.write_merged_dict_to_output(
+                    out_data, output_file, compression, normalize
+                )
+                print(
+                    f"{extractor.TAB}Updated items: "
+                    f"{', '.join(f'#{number}' for number in out_data)}"
+                )
+
+    return handled
+
+
+def _wait_for_delivery(deliveries: queue.Queue):
+    """
+    Wait for the next delivery in a queue.
+
+    Waits in short spells so that interrupts are seen on every platform;
+    on some, a wait without a timeout cannot be interrupted.
+
+    Args:
+        deliveries (queue.Queue): queue of recorded deliveries.
+
+    Returns:
+        dict|None: the next delivery.
+    """
+    while True:
+        try:
+            return deliveries.get(timeout=_POLL_SECS)
+
+        except queue.Empty:
+            continue
+
+
+def _record_delivery(record_path: str, delivery: dict) -> None:
+    """
+    Append a delivery to a JSON Lines file of recorded deliveries.
+
+    Args:
+        record_path (str): path to JSON Lines file.
+        delivery (dict): "event", "delivery", and "payload" of a delivery.
+    """
+    utils.mk_json_outpath(record_path)
+
+    with open(record_path, "a", encoding="UTF-8") as record_file:
+        record_file.write(json.dumps(delivery, ensure_ascii=False) + "\n")
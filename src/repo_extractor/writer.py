@@ -0,0 +1,280 @@
+"""
+Write mined data to extractor output files.
+
+Every flush of mined data is merged into whatever the output file already
+holds. Rather than loading the whole existing output to do so, the output
+is streamed one issue at a time with reader.OutputReader, merged with the
+new data, and written to a temporary file which then replaces the output.
+Memory use is thereby bound by the largest issue instead of the file, and
+an interrupted write cannot corrupt the existing output.
+
+JSON Lines outputs (see reader.is_append_only) are simply appended to.
+Since an issue mined more than once then appears on several lines, such
+outputs may be compacted to hold one line per issue.
+
+Outputs may be compressed with gzip or xz as they are written; see
+utils.open_compressed. They may also be normalized, with repeated strings
+moved into dimension tables; see dimensions.Dimensions.
+"""
+
+import gzip
+import json
+import lzma
+import os
+import sys
+from repo_extractor import dimensions, reader, records, utils
+
+
+def write_merged_dict_to_output(
+    out_dict: dict, out_path: str, compression: str = "auto", normalize: bool = False
+) -> None:
+    """
+    Recursively merge dictionaries and write them to an output file.
+
+    An output file that already holds data stays in the form it was
+    started in, normalized or not, since mixing forms within one file
+    would make it unreadable.
+
+    Args:
+        out_dict (dict): dict of data from round of API calls
+            to merge and write.
+        out_path (str): path to output file.
+        compression (str): "none", "gzip", "xz", or "auto" to choose
+            by the extension of the output path.
+        normalize (bool): whether to start a new output normalized.
+
+    Raises:
+        FileNotFoundError: no file found at given path.
+    """
+    utils.mk_json_outpath(out_path)
+    compression = utils.get_compression(out_path, compression)
+    dims_path = dimensions.get_dims_path(out_path)
+
+    if os.path.getsize(out_path) > 0:
+        normalize = os.path.exists(dims_path)
+
+    # tables left next to a removed output would be applied to a new one
+    elif not normalize and os.path.exists(dims_path):
+        os.remove(dims_path)
+
+    if normalize:
+        dims = dimensions.Dimensions(dims_path)
+        out_dict = {key: dims.normalize(value) for key, value in out_dict.items()}
+
+        # the tables are written first so that the output never refers
+        # to strings that are not in them
+        dims.save()
+
+    try:
+        if reader.is_append_only(out_path):
+            _append_dict_to_jsonlines(out_dict, out_path, compression)
+
+        else:
+            _merge_dict_into_jsonfile(out_dict, out_path, compression)
+
+    except FileNotFoundError:
+        print(f"\nFile at {out_path} not found!")
+        sys.exit(1)
+
+
+def _append_dict_to_jsonlines(out_dict: dict, out_path: str, compression: str) -> None:
+    """
+    Append each issue in a dict to a JSON Lines file as its own line.
+
+    A file that already holds data keeps the compression it was written
+    with, since mixing formats within one file would make it unreadable.
+
+    Args:
+        out_dict (dict): {issue number: issue data} to append.
+        out_path (str): path to output file.
+        compression (str): "none", "gzip", or "xz".
+    """
+    if os.path.getsize(out_path) > 0:
+        compression = utils.sniff_compression(out_path)
+
+    with utils.open_compressed(out_path, "at", compression) as out_file:
+        _write_lines(out_file, out_dict.items())
+
+
+def compact_output(out_path: str) -> tuple[int, int]:
+    """
+    Rewrite an output file so that it holds each issue once, fully merged.
+
+    Only JSON Lines outputs can hold an issue more than once; a nested
+    JSON output is rewritten as it is. The file keeps its compression.
+
+    Args:
+        out_path (str): path to output file.
+
+    Returns:
+        tuple[int, int]: amount of entries of issues before compacting,
+        one for each line an issue is on in a JSON Lines output, and
+        amount of issues after.
+    """
+    output_reader = reader.OutputReader(out_path, denormalize=False)
+    compression = utils.sniff_compression(out_path)
+
+    offsets: dict = output_reader.load_index()["offsets"]
+    entries: int = sum(len(spans) for spans in offsets.values())
+
+    tmp_path = f"{out_path}.tmp"
+
+    with utils.open_compressed(tmp_path, "wt", compression) as tmp_file:
+        if reader.is_append_only(out_path):
+            _write_lines(tmp_file, output_reader.iter_merged())
+
+        else:
+            _write_members(tmp_file, output_reader.iter_merged())
+
+    os.replace(tmp_path, out_path)
+
+    return entries, len(offsets)
+
+
+def denormalize_output(in_path: str, out_path: str, compression: str = "auto") -> int:
+    """
+    Write a copy of an output file with the strings of its items restored.
+
+    Each issue is written once, fully merged, in the format and with the
+    compression that the path of the copy asks for. The copy may replace
+    the output itself.
+
+    Args:
+        in_path (str): path to normalized output file.
+        out_path (str): path to write the copy to; replaced if present.
+        compression (str): "none", "gzip", "xz", or "auto" to choose
+            by the extension of the copy's path.
+
+    Returns:
+        int: amount of issues written.
+    """
+    output_reader = reader.OutputReader(in_path)
+    compression = utils.get_compression(out_path, compression)
+    issues: int = len(output_reader.load_index()["offsets"])
+
+    utils.mk_json_outpath(out_path)
+    tmp_path = f"{out_path}.tmp"
+
+    with utils.open_compressed(tmp_path, "wt", compression) as tmp_file:
+        if reader.is_append_only(out_path):
+            _write_lines(tmp_file, output_reader.iter_merged())
+
+        else:
+            _write_members(tmp_file, output_reader.iter_merged())
+
+    os.replace(tmp_path, out_path)
+
+    # the copy is plain, so tables kept for its path no longer apply
+    dims_path = dimensions.get_dims_path(out_path)
+
+    if os.path.exists(dims_path):
+        os.remove(dims_path)
+
+    return issues
+
+
+def _merge_dict_into_jsonfile(out_dict: dict, out_path: str, compression: str) -> None:
+    """
+    Merge a dict into a nested JSON output file, one issue at a time.
+
+    The result is identical to loading the file, merging the dict into it
+    with utils.merge_dicts_recursive, and dumping it with an indent of 2.
+
+    Args:
+        out_dict (dict): {issue number: issue data} to merge.
+        out_path (str): path to output file.
+        compression (str): "none", "gzip", or "xz".
+    """
+    tmp_path = f"{out_path}.tmp"
+
+    try:
+        with utils.open_compressed(tmp_path, "wt", compression) as tmp_file:
+            _write_members(tmp_file, _merged_members(out_dict, out_path))
+
+    except (json.JSONDecodeError, EOFError, gzip.BadGzipFile, lzma.LZMAError):
+        # the existing output is not valid JSON, or is a truncated or
+        # corrupt compressed file; it is replaced by the new data rather
+        # than merged with
+        with utils.open_compressed(tmp_path, "wt", compression) as tmp_file:
+            _write_members(tmp_file, out_dict.items())
+
+    os.replace(tmp_path, out_path)
+
+
+def _merged_members(out_dict: dict, out_path: str):
+    """
+    Yield the issues of an output file merged with those of a dict.
+
+    Issues keep the order they have in the file; issues only in the dict
+    follow in the order they have in it.
+
+    Args:
+        out_dict (dict): {issue number: issue data} to merge.
+        out_path (str): path to output file.
+
+    Yields:
+        tuple[str, object]: issue number and merged issue data.
+    """
+    in_file: set = set()
+
+    for key, value in reader.OutputReader(out_path, denormalize=False):
+        in_file.add(key)
+
+        if key in out_dict:
+            merged = {key: value}
+            utils.merge_dicts_recursive(merged, {key: out_dict[key]})
+            value = merged[key]
+
+        yield key, value
+
+    for key, value in out_dict.items():
+        if key not in in_file:
+            yield key, value
+
+
+def _write_lines(out_file, members) -> None:
+    """
+    Write members as JSON Lines, each as an object on its own line.
+
+    Args:
+        out_file (io.TextIOWrapper): file to write to.
+        members (Iterable[tuple[str, object]]): keys and values to write.
+    """
+    for key, value in members:
+        out_file.write(
+            json.dumps(
+                {key: value},
+                default=records.to_output,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        )
+        out_file.write("\n")
+
+
+def _write_members(out_file, members) -> None:
+    """
+    Write members as a JSON object, formatted as json.dump(indent=2) would.
+
+    Args:
+        out_file (io.TextIOWrapper): file to write to.
+        members (Iterable[tuple[str, object]]): keys and values to write.
+    """
+    separator = "\n  "
+    out_file.write("{")
+
+    for key, value in members:
+        value_text = json.dumps(
+            value, default=records.to_output, ensure_ascii=False, indent=2
+        )
+
+        # JSON strings cannot hold raw newlines, so every newline in the
+        # text is a line break that must be indented one level deeper
+        out_file.write(separator)
+        out_file.write(json.dumps(key, ensure_ascii=False))
+        out_file.write(": ")
+        out_file.write(value_text.replace("\n", "\n  "))
+
+        separator = ",\n  "
+
+    out_file.write("}" if separator == "\n  " else "\n}")
@@ -0,0 +1,95 @@
+"""Run budgets and the checkpoints that runs resume from."""
+
+import json
+import os
+import pytest
+from repo_extractor import budget
+
+RUN_INFO: dict = {
+    "repo": "octocat/hello-world",
+    "range": [1, -1],
+    "tiers": [["issues", "events"], ["comments"], ["commits"]],
+}
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path) -> str:
+    return budget.get_checkpoint_path(os.path.join(tmp_path, "out.jsonl"))
+
+
+def test_round_trip(checkpoint_path):
+    budget.write_checkpoint(checkpoint_path, RUN_INFO, 1, 42)
+
+    assert budget.read_checkpoint(checkpoint_path, RUN_INFO) == (1, 42)
+
+    budget.remove_checkpoint(checkpoint_path)
+
+    assert not os.path.exists(checkpoint_path)
+    assert budget.read_checkpoint(checkpoint_path, RUN_INFO) == (0, 0)
+
+    # removing a missing checkpoint is fine
+    budget.remove_checkpoint(checkpoint_path)
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        {"repo": "octocat/spoon-knife"},
+        # the range as configured, not as it was sanitized to
+        {"range": [1, 120]},
+        {"tiers": [["issues", "events", "comments", "commits"]]},
+    ],
+)
+def test_mismatch_ignored(checkpoint_path, changed, capsys):
+    budget.write_checkpoint(checkpoint_path, {**RUN_INFO, **changed}, 2, 7)
+
+    assert budget.read_checkpoint(checkpoint_path, RUN_INFO) == (0, 0)
+    assert "different run" in capsys.readouterr().out
+
+    # the checkpoint is left for the run it belongs to
+    assert os.path.exists(checkpoint_path)
+
+
+def test_partial_checkpoint_ignored(checkpoint_path):
+    with open(checkpoint_path, "w", encoding="UTF-8") as checkpoint_file:
+        json.dump(
+            {"repo": RUN_INFO["repo"], "tier": 1, "next_issue": 3}, checkpoint_file
+        )
+
+    assert budget.read_checkpoint(checkpoint_path, RUN_INFO) == (0, 0)
+
+
+def test_uncapped():
+    run_budget = budget.RunBudget()
+    run_budget.record(10)
+    run_budget.record(10_000)
+
+    assert not run_budget.is_capped
+    assert not run_budget.is_spent()
+    assert run_budget.can_wait(10**9)
+
+
+def test_requests_counted_from_first_record():
+    run_budget = budget.RunBudget(max_requests=5)
+
+    # requests sent before the run, e.g. to set it up, do not count
+    run_budget.record(3)
+    run_budget.record(7)
+
+    assert run_budget.is_capped
+    assert run_budget.requests == 4
+    assert not run_budget.is_spent()
+
+    run_budget.record(8)
+
+    assert run_budget.is_spent()
+
+
+def test_deadline():
+    assert budget.RunBudget(deadline_mins=0).is_spent()
+
+    run_budget = budget.RunBudget(deadline_mins=1)
+
+    assert not run_budget.is_spent()
+    assert run_budget.can_wait(30)
+    assert not run_budget.can_wait(90)
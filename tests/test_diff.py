@@ -0,0 +1,154 @@
+"""Parsing of diffs in git's format, as GitHub serves them for PRs."""
+
+from repo_extractor import diff
+
+
+def _parse(*lines: str):
+    """Parse a diff given as its lines."""
+    return diff.parse_diff("\n".join(lines) + "\n")
+
+
+def test_modified():
+    changes = _parse(
+        "diff --git a/keep.txt b/keep.txt",
+        "index 4cb29ea..ea14db2 100644",
+        "--- a/keep.txt",
+        "+++ b/keep.txt",
+        "@@ -1,3 +1,4 @@",
+        " one",
+        "-two",
+        "+2",
+        " three",
+        "+four",
+    )
+
+    assert changes.file_list == ("keep.txt",)
+    assert changes.status == ("modified",)
+    assert changes.patch_text == ("@@ -1,3 +1,4 @@\n one\n-two\n+2\n three\n+four",)
+    assert (changes.additions, changes.deletions, changes.changes) == (2, 1, 3)
+
+
+def test_added_and_removed():
+    changes = _parse(
+        "diff --git a/added.txt b/added.txt",
+        "new file mode 100644",
+        "index 0000000..3e75765",
+        "--- /dev/null",
+        "+++ b/added.txt",
+        "@@ -0,0 +1 @@",
+        "+new",
+        "\\ No newline at end of file",
+        "diff --git a/gone.txt b/gone.txt",
+        "deleted file mode 100644",
+        "index 3367afd..0000000",
+        "--- a/gone.txt",
+        "+++ /dev/null",
+        "@@ -1 +0,0 @@",
+        "-old",
+    )
+
+    assert changes.file_list == ("added.txt", "gone.txt")
+    assert changes.status == ("added", "removed")
+    assert (changes.additions, changes.deletions) == (1, 1)
+
+
+def test_renamed_and_copied():
+    changes = _parse(
+        "diff --git a/move.txt b/moved.txt",
+        "similarity index 100%",
+        "rename from move.txt",
+        "rename to moved.txt",
+        "diff --git a/move.txt b/copied.txt",
+        "similarity index 100%",
+        "copy from move.txt",
+        "copy to copied.txt",
+        "diff --git a/old name.txt b/new name.txt",
+        "similarity index 80%",
+        "rename from old name.txt",
+        "rename to new name.txt",
+        "index 587be6b..975fbec 100644",
+        "--- a/old name.txt\t",
+        "+++ b/new name.txt\t",
+        "@@ -1 +1 @@",
+        "-x",
+        "+y",
+    )
+
+    assert changes.file_list == ("moved.txt", "copied.txt", "new name.txt")
+    assert changes.status == ("renamed", "copied", "renamed")
+    assert changes.patch_text == (None, None, "@@ -1 +1 @@\n-x\n+y")
+
+
+def test_mode_changed():
+    changes = _parse(
+        "diff --git a/run.sh b/run.sh",
+        "old mode 100644",
+        "new mode 100755",
+        "diff --git a/tool.sh b/tool.sh",
+        "old mode 100644",
+        "new mode 100755",
+        "index 587be6b..975fbec",
+        "--- a/tool.sh",
+        "+++ b/tool.sh",
+        "@@ -1 +1 @@",
+        "-x",
+        "+y",
+    )
+
+    # a file whose contents changed too is modified
+    assert changes.file_list == ("run.sh", "tool.sh")
+    assert changes.status == ("changed", "modified")
+    assert changes.patch_text[0] is None
+
+
+def test_binary():
+    changes = _parse(
+        "diff --git a/bin.dat b/bin.dat",
+        "index bdc955b..8835708 100644",
+        "Binary files a/bin.dat and b/bin.dat differ",
+        "diff --git a/b dir/a b.dat b/b dir/a b.dat",
+        "index bdc955b..8835708 100644",
+        "Binary files a/b dir/a b.dat and b/b dir/a b.dat differ",
+        'diff --git "a/\\303\\274.bin" "b/\\303\\274.bin"',
+        "new file mode 100644",
+        "index 0000000..8835708",
+        'Binary files /dev/null and "b/\\303\\274.bin" differ',
+    )
+
+    assert changes.file_list == ("bin.dat", "b dir/a b.dat", "ü.bin")
+    assert changes.status == ("modified", "modified", "added")
+    assert changes.patch_text == (None, None, None)
+    assert changes.changes == 0
+
+
+def test_quoted_paths():
+    changes = _parse(
+        'diff --git "a/\\303\\274.txt" "b/\\303\\274.txt"',
+        "index bca70f3..4286f42 100644",
+        '--- "a/\\303\\274.txt"',
+        '+++ "b/\\303\\274.txt"',
+        "@@ -1 +1 @@",
+        "-q",
+        "+r",
+        'diff --git "a/tab\\there" "b/quote\\"d"',
+        "similarity index 100%",
+        'rename from "tab\\there"',
+        'rename to "quote\\"d"',
+    )
+
+    assert changes.file_list == ("ü.txt", 'quote"d')
+    assert changes.status == ("modified", "renamed")
+
+
+def test_unquote():
+    assert diff._unquote("plain.txt") == "plain.txt"
+    assert diff._unquote('"a\\\\b\\nc"') == "a\\b\nc"
+    assert diff._unquote('"\\346\\227\\245.txt"') == "日.txt"
+    assert diff._unquote('"') == '"'
+
+
+def test_empty():
+    changes = diff.parse_diff("")
+
+    assert changes.file_list == ()
+    assert (changes.additions, changes.deletions, changes.changes) == (0, 0, 0)
@@ -0,0 +1,77 @@
+"""Round trips of mined data through dimension tables."""
+
+import copy
+import os
+from repo_extractor import dimensions
+
+ISSUE_DATA: dict = {
+    "issues": {"title": "Crash on start", "userlogin": "octocat", "userid": 1},
+    "comments": {
+        "0": {"body": "Seen it too", "userlogin": "hubot", "userid": 2},
+        "1": {"body": "Me too", "userlogin": "octocat", "userid": None},
+    },
+    "commits": {
+        "0": {
+            "author_name": "Mona",
+            "committer": "GitHub",
+            "files": {"file_list": ["README.md", "src/main.py"]},
+        },
+        "1": {
+            "author_name": "Mona",
+            "committer": None,
+            "files": {"file_list": ["README.md"]},
+        },
+    },
+    "review_comments": {"0": {"path": "src/main.py", "userlogin": "hubot"}},
+    "events": {
+        "0": {
+            "event": "assigned",
+            "actor_login": "octocat",
+            "actor_id": 1,
+            "assignee": "hubot",
+            "requested_reviewer": None,
+        }
+    },
+}
+
+
+def test_round_trip(tmp_path):
+    dims = dimensions.Dimensions(os.path.join(tmp_path, "out.json.dims.json"))
+    normalized = dims.normalize(copy.deepcopy(ISSUE_DATA))
+
+    assert dims.denormalize(normalized) == ISSUE_DATA
+
+    # repeated strings are stored once each
+    assert normalized["commits"]["0"]["author_name"] == 0
+    assert normalized["commits"]["1"]["author_name"] == 0
+    assert dims.strings["names"] == ["Mona", "GitHub"]
+    assert dims.strings["paths"] == ["README.md", "src/main.py"]
+    assert normalized["commits"]["1"]["committer"] is None
+
+
+def test_users(tmp_path):
+    dims = dimensions.Dimensions(os.path.join(tmp_path, "out.json.dims.json"))
+    normalized = dims.normalize(copy.deepcopy(ISSUE_DATA))
+
+    # a login and id of one item refer to one row, which items knowing
+    # only the login share
+    assert normalized["issues"]["userlogin"] == normalized["issues"]["userid"]
+    assert normalized["comments"]["1"]["userlogin"] == normalized["issues"]["userid"]
+    assert normalized["events"]["0"]["actor_id"] == normalized["issues"]["userid"]
+    assert {"login": "octocat", "id": 1} in dims.users
+    assert len(dims.users) == 2
+
+
+def test_saved_tables(tmp_path):
+    dims_path = os.path.join(tmp_path, "out.json.dims.json")
+    dims = dimensions.Dimensions(dims_path)
+    normalized = dims.normalize(copy.deepcopy(ISSUE_DATA))
+    dims.save()
+
+    # tables only grow, so data normalized earlier stays readable
+    loaded = dimensions.Dimensions(dims_path)
+    renormalized = loaded.normalize({"0": {"author_name": "Hubot"}})
+
+    assert loaded.denormalize(normalized) == ISSUE_DATA
+    assert renormalized == {"0": {"author_name": 2}}
+    assert loaded.denormalize(renormalized) == {"0": {"author_name": "Hubot"}}
@@ -0,0 +1,117 @@
+"""Extrapolating the cost of a run from a sample of it."""
+
+import pytest
+from repo_extractor import estimate
+
+
+def _get_sample(**measured) -> dict:
+    """Get sample measurements, with the given ones changed."""
+    sample: dict = {
+        "items": 10,
+        "requests": 20,
+        "seconds": 10.0,
+        "bytes": 1000,
+        "prs": 5,
+        "commits": 30,
+        "comments": 40,
+    }
+
+    return sample | measured
+
+
+def test_within_rate_limit():
+    cost = estimate.extrapolate_run_cost(
+        _get_sample(),
+        num_items=100,
+        calls_left=5000,
+        call_limit=5000,
+        reset_secs=600,
+        fixed_requests=5,
+        fixed_secs=2.0,
+    )
+
+    assert cost == {
+        "items": 100,
+        "sampled": 10,
+        "prs": 50,
+        "commits": 300,
+        "comments": 400,
+        "requests": 205,
+        "requests_per_item": 2.0,
+        "rate_limit_windows": 1,
+        "wall_secs": 102.0,
+        "sleep_secs": 0.0,
+        "output_bytes": 10000,
+    }
+
+
+def test_over_rate_limit():
+    # 10000 requests at 10 per second, with 1000 calls left for the next
+    # 600 seconds and 5000 in each window after
+    cost = estimate.extrapolate_run_cost(
+        _get_sample(requests=100, seconds=10.0),
+        num_items=1000,
+        calls_left=1000,
+        call_limit=5000,
+        reset_secs=600,
+    )
+
+    assert cost["requests"] == 10000
+    assert cost["rate_limit_windows"] == 3
+
+    # the rest of the current window, then all of the next but the 500
+    # seconds spent working in it
+    assert cost["sleep_secs"] == pytest.approx(500 + 3100)
+    assert cost["wall_secs"] == pytest.approx(1000 + 3600)
+
+
+def test_slow_run_never_sleeps():
+    # a run slower than the rate limit never exhausts a window early
+    cost = estimate.extrapolate_run_cost(
+        _get_sample(requests=100, seconds=1000.0),
+        num_items=1000,
+        calls_left=1000,
+        call_limit=5000,
+        reset_secs=600,
+    )
+
+    assert cost["rate_limit_windows"] == 3
+    assert cost["sleep_secs"] == 0.0
+
+
+def test_fixed_requests_only():
+    cost = estimate.extrapolate_run_cost(
+        _get_sample(items=0, requests=0, seconds=0.0),
+        num_items=0,
+        calls_left=5000,
+        call_limit=5000,
+        reset_secs=600,
+        fixed_requests=3,
+        fixed_secs=1.5,
+    )
+
+    assert (cost["requests"], cost["wall_secs"]) == (3, 1.5)
+
+
+@pytest.mark.parametrize(
+    "sample_len, expected",
+    [(0, []), (3, [0, 3, 6]), (10, list(range(10))), (20, list(range(10)))],
+)
+def test_pick_sample(sample_len, expected):
+    assert estimate.pick_sample(list(range(10)), sample_len) == expected
+
+
+def test_format_cost_report():
+    cost = estimate.extrapolate_run_cost(
+        _get_sample(), num_items=100, calls_left=5000, call_limit=5000, reset_secs=0
+    )
+    report = estimate.format_cost_report(cost, "  ").split("\n")
+
+    assert report[0] == "  Items in range: 100 (10 sampled)"
+    assert "  API requests: ~200 (2.0 per item)" in report
+    assert "  Wall-clock time: ~0:01:40 (~0:00:00 rate limited)" in report
+    assert "  Output size: ~9.8 KiB" in report
+
+
+def test_fmt_duration():
+    assert estimate.fmt_duration(3725.9) == "1:02:05"
@@ -0,0 +1,143 @@
+"""Round trips of mined data through the writer and the output reader."""
+
+import copy
+import os
+import pytest
+from repo_extractor import reader, utils, writer
+
+# two flushes of mined data; issue 1 is mined in both, as across passes
+# or runs, and its comments are added to in the second
+FIRST_FLUSH: dict = {
+    "1": {
+        "issues": {"title": "Crash on start", "userlogin": "octocat"},
+        "comments": {"0": {"body": "Seen it too", "userlogin": "hubot"}},
+    },
+    "2": {
+        "issues": {"title": "Docs typo", "userlogin": "hubot"},
+        "commits": {
+            "0": {
+                "author_name": "Mona",
+                "files": {"file_list": ["README.md", "docs/index.md"]},
+            }
+        },
+    },
+}
+
+SECOND_FLUSH: dict = {
+    "1": {
+        "comments": {"1": {"body": "Fixed by #2", "userlogin": "octocat"}},
+        "events": {"0": {"event": "closed", "actor_login": "octocat"}},
+    },
+    "3": {"issues": {"title": "Ünïcode title", "userlogin": "mona"}},
+}
+
+COMPRESSIONS: dict = {"none": "", "gzip": ".gz", "xz": ".xz"}
+
+
+def _get_merged() -> dict:
+    """Get the data that both flushes make up together."""
+    merged: dict = copy.deepcopy(FIRST_FLUSH)
+    utils.merge_dicts_recursive(merged, copy.deepcopy(SECOND_FLUSH))
+
+    return merged
+
+
+@pytest.fixture(
+    params=[
+        (ext, compression, normalize)
+        for ext in (".json", ".jsonl")
+        for compression in COMPRESSIONS
+        for normalize in (False, True)
+    ],
+    ids=lambda param: f"{param[0]}-{param[1]}{'-normalized' * param[2]}",
+)
+def output_path(request, tmp_path) -> str:
+    """Write both flushes to an output of each format and compression."""
+    ext, compression, normalize = request.param
+    out_path = os.path.join(tmp_path, f"out{ext}{COMPRESSIONS[compression]}")
+
+    for flush in (FIRST_FLUSH, SECOND_FLUSH):
+        writer.write_merged_dict_to_output(
+            copy.deepcopy(flush), out_path, "auto", normalize
+        )
+
+    return out_path
+
+
+def test_get(output_path):
+    output_reader = reader.OutputReader(output_path)
+
+    for number, issue_data in _get_merged().items():
+        assert output_reader.get(number) == issue_data
+        assert output_reader.get(int(number)) == issue_data
+
+    assert output_reader.get(4) is None
+
+
+def test_iter_merged(output_path):
+    output_reader = reader.OutputReader(output_path)
+    issues: list = list(output_reader.iter_merged())
+
+    assert len(issues) == len(_get_merged())
+    assert dict(issues) == _get_merged()
+
+
+def test_index(output_path):
+    output_reader = reader.OutputReader(output_path)
+    offsets: dict = output_reader.build_index()["offsets"]
+
+    # an issue mined twice is on two lines of a JSON Lines output, but
+    # merged into one entry of a nested JSON one
+    assert len(offsets["1"]) == (2 if reader.is_append_only(output_path) else 1)
+    assert output_reader.load_index()["offsets"] == offsets
+
+    # changes to the output make the index stale
+    writer.write_merged_dict_to_output({"4": {"issues": {"title": "New"}}}, output_path)
+
+    assert "4" in output_reader.load_index()["offsets"]
+    assert output_reader.get(4) == {"issues": {"title": "New"}}
+
+
+def test_compression(output_path):
+    compression = utils.get_compression(output_path)
+
+    assert utils.sniff_compression(output_path) == compression
+
+
+def test_compact(output_path):
+    entries, issues = writer.compact_output(output_path)
+    output_reader = reader.OutputReader(output_path)
+
+    assert issues == len(_get_merged())
+    assert entries == issues + reader.is_append_only(output_path)
+    assert dict(output_reader) == _get_merged()
+
+
+def test_empty_output(tmp_path):
+    out_path = os.path.join(tmp_path, "out.jsonl.gz")
+    utils.mk_json_outpath(out_path)
+    output_reader = reader.OutputReader(out_path)
+
+    assert not list(output_reader.iter_merged())
+    assert output_reader.get(1) is None
+
+
+def test_unwritable_index(output_path, tmp_path):
+    output_reader = reader.OutputReader(output_path)
+
+    # as next to an output in a read-only directory
+    output_reader.index_path = os.path.join(tmp_path, "missing", "out.idx")
+
+    for number, issue_data in _get_merged().items():
+        assert output_reader.get(number) == issue_data
+
+    assert dict(output_reader.iter_merged()) == _get_merged()
+    assert not os.path.exists(output_reader.index_path)
+
+
+def test_unwritten_index(output_path):
+    output_reader = reader.OutputReader(output_path, write_index=False)
+
+    assert output_reader.summarize()["issues"] == len(_get_merged())
+    assert output_reader.get(1) == _get_merged()["1"]
+    assert not os.path.exists(output_reader.index_path)
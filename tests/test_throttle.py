@@ -0,0 +1,239 @@
+"""Adapting the window of requests in flight to how the API copes."""
+
+import types
+import pytest
+from repo_extractor import throttle
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now: float = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(
+        throttle, "time", types.SimpleNamespace(monotonic=fake_clock.monotonic)
+    )
+
+    return fake_clock
+
+
+def _send(limiter: throttle.AimdLimiter, clock: FakeClock, secs: float = 0.1, **kwargs):
+    """Send one request through a limiter, taking a while."""
+    started = limiter.acquire()
+    clock.now += secs
+    limiter.release(started, **kwargs)
+
+
+def test_grows_only_full_window(clock):
+    limiter = throttle.AimdLimiter(max_limit=4)
+
+    # one request at a time fills a window of one
+    _send(limiter, clock)
+    assert limiter.limit == 2.0
+
+    # but not a window of two
+    _send(limiter, clock)
+    assert limiter.limit == 2.0
+
+    # a full window of two grows by half a request for each response
+    # that finds it full
+    first = limiter.acquire()
+    second = limiter.acquire()
+    limiter.release(first)
+    limiter.release(second)
+
+    assert limiter.limit == 2.5
+    assert limiter.increases == 1
+    assert limiter.peak_in_flight == 2
+
+
+def test_growth_capped(clock):
+    limiter = throttle.AimdLimiter(max_limit=2)
+
+    for _ in range(5):
+        started = [limiter.acquire() for _ in range(int(limiter.limit))]
+
+        for start in started:
+            limiter.release(start)
+
+    assert limiter.limit == 2.0
+    assert limiter.metrics()["window"] == 2
+
+
+def test_throttle_halves_window(clock):
+    limiter = throttle.AimdLimiter(max_limit=8)
+    limiter.limit = 6.0
+
+    _send(limiter, clock, throttle_secs=0.0)
+
+    assert limiter.limit == 3.0
+    assert (limiter.throttled, limiter.decreases) == (1, 1)
+
+    # never below one request
+    for _ in range(3):
+        clock.now += 1
+        _send(limiter, clock, throttle_secs=0.0)
+
+    assert limiter.limit == 1.0
+
+
+def test_one_cut_per_congestion(clock):
+    limiter = throttle.AimdLimiter(max_limit=8)
+    limiter.limit = 8.0
+
+    # requests in flight together are throttled by the same congestion
+    started = [limiter.acquire() for _ in range(3)]
+    clock.now += 0.1
+
+    for start in started:
+        limiter.release(start, throttle_secs=0.0)
+
+    assert limiter.limit == 4.0
+    assert (limiter.throttled, limiter.decreases) == (3, 1)
+
+    # a request sent after the cut cuts again
+    clock.now += 0.1
+    _send(limiter, clock, throttle_secs=0.0)
+
+    assert limiter.limit == 2.0
+    assert limiter.decreases == 2
+
+
+def test_latency_spike_cuts_window(clock):
+    limiter = throttle.AimdLimiter(max_limit=8)
+    limiter.limit = 4.0
+
+    _send(limiter, clock, secs=0.5)
+
+    # slower than the average, but under the floor for spikes
+    _send(limiter, clock, secs=1.0)
+    assert limiter.latency_spikes == 0
+
+    _send(limiter, clock, secs=5.0)
+    assert limiter.latency_spikes == 1
+    assert limiter.limit == 2.0
+
+
+def test_failure_leaves_window(clock):
+    limiter = throttle.AimdLimiter(max_limit=8)
+
+    _send(limiter, clock, failed=True)
+
+    assert limiter.limit == 1.0
+    assert limiter.metrics()["in_flight"] == 0
+    assert limiter.metrics()["latency_ms"] is None
+
+
+def test_throttle_holds_requests(clock, monkeypatch):
+    limiter = throttle.AimdLimiter(max_limit=8)
+    waits: list = []
+
+    # the held request is let through once the clock passes the hold
+    def wait(timeout=None) -> None:
+        waits.append(timeout)
+        clock.now += timeout
+
+    _send(limiter, clock, throttle_secs=30.0)
+    monkeypatch.setattr(limiter._AimdLimiter__cond, "wait", wait)
+    limiter.acquire()
+
+    assert waits == [pytest.approx(30.0)]
+
+
+@pytest.mark.parametrize(
+    "status, headers, body, expected",
+    [
+        (200, {}, "", None),
+        (404, {}, "Not Found", None),
+        # over the primary rate limit
+        (403, {"x-ratelimit-remaining": "0", "retry-after": "60"}, "", None),
+        (403, {"x-ratelimit-remaining": "0"}, "API rate limit exceeded", None),
+        # secondary rate limits
+        (403, {"x-ratelimit-remaining": "4000", "retry-after": "12"}, "", 12.0),
+        (429, {"retry-after": "5"}, "", 5.0),
+        (429, {"retry-after": "soon"}, "", 60),
+        (403, {}, "You have exceeded a secondary rate limit.", 60),
+        # forbidden for other reasons
+        (403, {}, "Resource not accessible by integration", None),
+    ],
+)
+def test_get_throttle_secs(status, headers, body, expected):
+    assert throttle._get_throttle_secs(status, headers, body) == expected
+
+
+class FakeRequester:
+    """Requester answering requests from a script of responses."""
+
+    def __init__(self, responses: list) -> None:
+        self.responses = responses
+        self.sent: int = 0
+
+    def requestJson(self, verb: str, url: str, *args, **kwargs) -> tuple:
+        self.sent += 1
+        response = self.responses.pop(0)
+
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+    def requestMultipart(self, *args, **kwargs) -> tuple:
+        return 200, {}, ""
+
+    def requestBlob(self, *args, **kwargs) -> tuple:
+        return 200, {}, ""
+
+
+def test_install_limiter_retries_secondary_limits(clock):
+    requester = FakeRequester(
+        [
+            (403, {"retry-after": "0"}, "secondary rate limit"),
+            (200, {}, '{"ok": true}'),
+        ]
+    )
+    limiter = throttle.AimdLimiter(max_limit=8)
+    throttle.install_limiter(requester, limiter)
+
+    assert requester.requestJson("GET", "/repos/a/b") == (200, {}, '{"ok": true}')
+    assert requester.sent == 2
+    assert (limiter.requests, limiter.throttled) == (2, 1)
+
+
+def test_install_limiter_passes_primary_limits(clock):
+    over_limit = (403, {"x-ratelimit-remaining": "0"}, "API rate limit exceeded")
+    requester = FakeRequester([over_limit])
+    limiter = throttle.AimdLimiter(max_limit=8)
+    throttle.install_limiter(requester, limiter)
+
+    assert requester.requestJson("GET", "/repos/a/b") == over_limit
+    assert (requester.sent, limiter.throttled) == (1, 0)
+
+
+def test_install_limiter_gives_up_retrying(clock):
+    throttled = (429, {"retry-after": "0"}, "")
+    requester = FakeRequester([throttled] * (throttle._MAX_THROTTLED_RETRIES + 1))
+    limiter = throttle.AimdLimiter(max_limit=8)
+    throttle.install_limiter(requester, limiter)
+
+    assert requester.requestJson("GET", "/repos/a/b") == throttled
+    assert requester.sent == throttle._MAX_THROTTLED_RETRIES + 1
+
+
+def test_install_limiter_releases_on_errors(clock):
+    requester = FakeRequester([ConnectionError("reset")])
+    limiter = throttle.AimdLimiter(max_limit=8)
+    throttle.install_limiter(requester, limiter)
+
+    with pytest.raises(ConnectionError):
+        requester.requestJson("GET", "/repos/a/b")
+
+    assert limiter.metrics()["in_flight"] == 0
+    assert limiter.limit == 1.0
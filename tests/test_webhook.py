@@ -0,0 +1,80 @@
+"""Mining of recorded webhook deliveries into the output."""
+
+import hashlib
+import hmac
+import json
+import os
+import types
+import pytest
+from repo_extractor import reader, webhook
+
+
+class FakeHandler:
+    """Handler mining each issue delivery into its title, without requests."""
+
+    def __init__(self, out_path: str) -> None:
+        cfg = {"output_path": out_path, "compression": "auto", "normalize": False}
+        self.gh_ext = types.SimpleNamespace(
+            cfg=types.SimpleNamespace(get_cfg_val=cfg.get)
+        )
+
+    def handle(self, event: str, payload: dict) -> dict:
+        issue = payload["issue"]
+
+        return {str(issue["number"]): {"issues": {"title": issue["title"]}}}
+
+
+def _record(record_path: str, payloads: list) -> None:
+    """Record deliveries of issues events as serve would."""
+    for delivery_id, payload in enumerate(payloads):
+        webhook._record_delivery(
+            record_path,
+            {"event": "issues", "delivery": str(delivery_id), "payload": payload},
+        )
+
+
+def test_replay(tmp_path):
+    out_path = os.path.join(tmp_path, "out.jsonl")
+    record_path = os.path.join(tmp_path, "deliveries.jsonl")
+    _record(
+        record_path,
+        [
+            {"issue": {"number": 1, "title": "Old"}},
+            {"issue": {"number": 2, "title": "Other"}},
+            {"issue": {"number": 1, "title": "New"}},
+        ],
+    )
+
+    assert webhook.replay(FakeHandler(out_path), record_path) == 3
+    assert dict(reader.OutputReader(out_path).iter_merged()) == {
+        "1": {"issues": {"title": "New"}},
+        "2": {"issues": {"title": "Other"}},
+    }
+
+
+def test_replay_error_keeps_mined(tmp_path):
+    out_path = os.path.join(tmp_path, "out.jsonl")
+    record_path = os.path.join(tmp_path, "deliveries.jsonl")
+
+    # the second delivery is malformed, which only API and connection
+    # errors are skipped for
+    _record(
+        record_path,
+        [{"issue": {"number": 1, "title": "Mined"}}, {"pull_request": {}}],
+    )
+
+    with pytest.raises(KeyError):
+        webhook.replay(FakeHandler(out_path), record_path)
+
+    assert dict(reader.OutputReader(out_path).iter_merged()) == {
+        "1": {"issues": {"title": "Mined"}}
+    }
+
+
+def test_verify_signature():
+    body = json.dumps({"zen": "Keep it logically awesome."}).encode()
+    signature = "sha256=" + hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+
+    assert webhook.verify_signature(b"secret", body, signature)
+    assert not webhook.verify_signature(b"other", body, signature)
+    assert not webhook.verify_signature(b"secret", body, None)